@@ -0,0 +1,130 @@
+"""
+Per-frame benchmark of the generate-dataset threshold and prediction icon overlay.
+
+Compares the previous implementation (new arrays for every step, icon read
+from disk and alpha-blended every frame) with ThresholdSegmenter's
+preallocated buffers and icons blended once, and reports the time and
+memory allocated per frame.
+
+Usage (from the repository root):
+    python benchmarks/capture_threshold.py
+    python benchmarks/capture_threshold.py --roi 150 300 600 --frames 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from roi_threshold import ThresholdSegmenter, load_prediction_icon
+
+BACKGROUND_COLOR = (200, 200, 200)
+PREDICTION_COLOR = (255, 0, 125)
+ICON_SIZE = (50, 50)
+
+
+def legacy_threshold(roi, roi_background, threshold_amount):
+    """Threshold step of the main loop before the rework."""
+    roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+    bkg_gray = cv2.cvtColor(roi_background, cv2.COLOR_BGR2GRAY)
+    diff = cv2.absdiff(roi_gray, bkg_gray)
+    _, mask = cv2.threshold(diff, threshold_amount, 255, cv2.THRESH_BINARY)
+    mask = cv2.GaussianBlur(mask, (1, 1), 0)
+    mask = cv2.erode(mask, np.ones((2, 2), np.uint8), iterations=1)
+    mask = cv2.dilate(mask, np.ones((5, 5), np.uint8), iterations=1)
+    mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+    new_bkg = np.ones_like(roi) * BACKGROUND_COLOR
+    threshold_roi = roi.copy()
+    threshold_roi[:, :] = np.where(mask > 10, roi, new_bkg)
+    return threshold_roi
+
+
+def legacy_icon(path):
+    """Prediction icon step of the main loop before the rework."""
+    foreground = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    alpha_channel = foreground[:, :, 3]
+    rgb_channels = foreground[:, :, :3]
+    background = np.ones_like(rgb_channels, dtype=np.uint8) * PREDICTION_COLOR
+    alpha_factor = alpha_channel[:, :, np.newaxis].astype(np.float32) / 255.0
+    alpha_factor = np.concatenate((alpha_factor, alpha_factor, alpha_factor), axis=2)
+    base = rgb_channels.astype(np.float32) * alpha_factor
+    white = background.astype(np.float32) * (1 - alpha_factor)
+    final_image = (base + white).astype(np.uint8)
+    return cv2.resize(final_image, ICON_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def make_frames(roi_size, count=8):
+    """Camera-like 720p frames with a moving bright blob in the ROI, and the empty background."""
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8), (31, 31), 0)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        center = (10 + roi_size // 4 + i * roi_size // (2 * count), 10 + roi_size // 2)
+        cv2.circle(frame, center, roi_size // 5, (90, 140, 220), -1)
+        frames.append(frame)
+    return frames, background
+
+
+def per_frame(step, frames, count):
+    """
+    Time a per-frame step and measure the memory it allocates.
+
+    Returns:
+        tuple: (microseconds per frame, bytes allocated per frame)
+    """
+    for frame in frames:
+        step(frame)  # Warm up and allocate persistent buffers
+    start = time.perf_counter()
+    for i in range(count):
+        step(frames[i % len(frames)])
+    elapsed = (time.perf_counter() - start) / count
+
+    tracemalloc.start()
+    for i in range(len(frames)):
+        step(frames[i])
+    allocated = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed * 1e6, allocated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the per-frame cost of the generate-dataset overlays.")
+    parser.add_argument('--roi', type=int, nargs='+', default=[150, 300, 600], help="ROI sizes in pixels")
+    parser.add_argument('--frames', type=int, default=1000, help="Frames timed per case")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        icon_path = os.path.join(tmp, 'rock.png')
+        icon = np.zeros((256, 256, 4), np.uint8)
+        cv2.circle(icon, (128, 128), 100, (255, 255, 255, 255), -1)
+        cv2.imwrite(icon_path, icon)
+        cached_icons = {icon_path: load_prediction_icon(icon_path, PREDICTION_COLOR, ICON_SIZE)}
+
+        print(f"{'case':<28} {'before us':>10} {'after us':>10} {'before peak KB':>15} {'after peak KB':>14}")
+        for size in args.roi:
+            frames, background = make_frames(size)
+            roi_background = background[10:10 + size, 10:10 + size].copy()
+            segmenter = ThresholdSegmenter(BACKGROUND_COLOR)
+            before = per_frame(lambda f: legacy_threshold(f[10:10 + size, 10:10 + size], roi_background, 20),
+                               frames, args.frames)
+            after = per_frame(lambda f: segmenter.segment(f[10:10 + size, 10:10 + size], roi_background, 20),
+                              frames, args.frames)
+            print(f"{f'threshold roi={size}':<28} {before[0]:>10.1f} {after[0]:>10.1f} "
+                  f"{before[1] / 1024:>15.1f} {after[1] / 1024:>14.1f}")
+
+        before = per_frame(lambda f: legacy_icon(icon_path), frames, args.frames)
+        after = per_frame(lambda f: cached_icons.get(icon_path), frames, args.frames)
+        print(f"{'prediction icon':<28} {before[0]:>10.1f} {after[0]:>10.1f} "
+              f"{before[1] / 1024:>15.1f} {after[1] / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
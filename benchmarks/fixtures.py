@@ -0,0 +1,103 @@
+"""
+Benchmark fixtures.
+Provides recorded or synthetic frames and canned YOLO tracking results.
+Requires src/rps-game on sys.path (set up by run_benchmarks.py).
+"""
+import os
+import cv2
+import numpy as np
+from detection.recording import RecordedBoxes, RecordedResult
+
+# Frame sizes (width, height) used by the rendering benchmarks
+FRAME_SIZES = [(640, 480), (1280, 720), (1920, 1080)]
+
+# Number of tracked hands per frame used by the detection and logic benchmarks
+DETECTION_COUNTS = [1, 4, 16, 64]
+
+
+def make_result(count, frame_w, frame_h, class_ids, seed=0):
+    """
+    Build a canned tracking result with evenly spread boxes.
+
+    Args:
+        count: Number of detections
+        frame_w: Frame width in pixels
+        frame_h: Frame height in pixels
+        class_ids: Class index for each detection (cycled if shorter than count)
+        seed: Random seed for box jitter
+
+    Returns:
+        RecordedResult: Result with track IDs 1..count
+    """
+    rng = np.random.default_rng(seed)
+    box_w = frame_w / max(4, count)
+    box_h = frame_h / 4
+    x1 = (np.arange(count) * box_w) % (frame_w - box_w) + rng.uniform(0, 5, count)
+    y1 = frame_h / 3 + rng.uniform(0, 20, count)
+    xyxy = np.stack([x1, y1, x1 + box_w, y1 + box_h], axis=1).astype(np.float32)
+    conf = rng.uniform(0.5, 0.99, count).astype(np.float16)
+    cls = np.resize(np.asarray(class_ids, dtype=np.uint8), count)
+    track_id = np.arange(1, count + 1, dtype=np.int32)
+    return RecordedResult(RecordedBoxes(xyxy, conf, cls, track_id), (frame_h, frame_w), 0.0)
+
+
+def make_signs_by_id(count, signs):
+    """
+    Build a signs_by_id dictionary as returned by process_detections.
+
+    Args:
+        count: Number of tracked hands
+        signs: Signs to assign (cycled if shorter than count)
+
+    Returns:
+        dict: Mapping of track_id -> sign
+    """
+    return {i + 1: signs[i % len(signs)] for i in range(count)}
+
+
+def synthetic_frame(width, height, seed=0):
+    """
+    Generate a camera-like frame with smooth gradients and sensor noise.
+
+    Args:
+        width: Frame width
+        height: Frame height
+        seed: Random seed
+
+    Returns:
+        np.ndarray: BGR uint8 frame
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([np.broadcast_to(x, (height, width)),
+                     np.broadcast_to(y, (height, width)),
+                     np.full((height, width), 128, np.float32)], axis=2)
+    noise = rng.normal(0, 8, base.shape).astype(np.float32)
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+def load_frames(width, height, frames_dir=None, count=8):
+    """
+    Load recorded frames resized to the given size, or synthesize them.
+
+    Args:
+        width: Frame width
+        height: Frame height
+        frames_dir: Optional directory of recorded images
+        count: Number of frames to return
+
+    Returns:
+        list: BGR uint8 frames
+    """
+    frames = []
+    if frames_dir:
+        names = sorted(n for n in os.listdir(frames_dir)
+                       if n.lower().endswith(('.png', '.jpg', '.jpeg')))
+        for name in names[:count]:
+            img = cv2.imread(os.path.join(frames_dir, name))
+            if img is not None:
+                frames.append(cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA))
+    while len(frames) < count:
+        frames.append(synthetic_frame(width, height, seed=len(frames)))
+    return frames
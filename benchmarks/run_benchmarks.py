@@ -0,0 +1,351 @@
+"""
+Standalone benchmark runner for the detection, game logic and rendering stages.
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py                      # run and store results
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<sha>.json
+    python benchmarks/run_benchmarks.py --filter draw_ --quick
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src" / "rps-game"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+from config import CLASS_NAMES, PAPER, ROCK, SCISSOR, THUMB_UP
+from detection.yolo_handler import process_detections
+from detection.hand_tracking import update_player_detection
+from game.phases import update_game_phase
+from game.rules import DEFAULT_RULE_SET, get_rps_winner
+from game_state import GameState, Player
+from frame_view import build_frame_view
+from ui.bounding_boxes import draw_custom_bounding_boxes
+from ui.display import fit_to_window
+from ui.hud import draw_hud
+from instrumentation.log_queue import start_queued_logging
+from fixtures import (DETECTION_COUNTS, FRAME_SIZES, load_frames, make_result,
+                      make_signs_by_id)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register a benchmark case generator under the given name."""
+    def decorator(func):
+        BENCHMARKS.append((name, func))
+        return func
+    return decorator
+
+
+def detection_state(count):
+    """Game state in detection phase with `count` pending hands."""
+    game_state = GameState()
+    update_player_detection(make_signs_by_id(count, [ROCK, PAPER, SCISSOR]), game_state)
+    return game_state
+
+
+def game_phase_state(count):
+    """Game state in game phase with players on track IDs 1 and 2."""
+    game_state = GameState()
+    players = []
+    for track_id in (1, 2):
+        player = Player()
+        player.id = track_id
+        player.last_seen = time.time()
+        players.append(player)
+    game_state.create_match(*players)
+    # Keep the lock from completing so every call measures the steady state
+    game_state.lock_duration = float('inf')
+    return game_state
+
+
+@benchmark('process_detections')
+def bench_process_detections(options):
+    for count in DETECTION_COUNTS:
+        result = make_result(count, 1280, 720, list(range(len(CLASS_NAMES))))
+        yield {'detections': count}, lambda r=result: process_detections(r, 1280)
+
+
+@benchmark('update_player_detection')
+def bench_update_player_detection(options):
+    for count in DETECTION_COUNTS:
+        signs_by_id = make_signs_by_id(count, [ROCK, PAPER, SCISSOR])
+        game_state = detection_state(count)
+        yield {'detections': count}, lambda s=signs_by_id, g=game_state: update_player_detection(s, g)
+
+
+@benchmark('update_player_detection_absent')
+def bench_update_player_detection_absent(options):
+    # Pending hands that left the view wait on timers and cost nothing per frame
+    visible = make_signs_by_id(4, [ROCK, PAPER, SCISSOR])
+    for count in [c for c in DETECTION_COUNTS if c > 4]:
+        game_state = detection_state(count)
+        update_player_detection(visible, game_state)
+        yield {'tracked': count, 'visible': 4}, lambda s=visible, g=game_state: update_player_detection(s, g)
+
+
+@benchmark('update_game_phase')
+def bench_update_game_phase(options):
+    # Both players (track IDs 1 and 2) are always part of the detections
+    for count in [c for c in DETECTION_COUNTS if c >= 2]:
+        signs_by_id = make_signs_by_id(count, [ROCK, PAPER])
+        game_state = game_phase_state(count)
+        yield ({'detections': count},
+               lambda s=signs_by_id, g=game_state: update_game_phase(s, g))
+
+
+@benchmark('get_rps_winner')
+def bench_get_rps_winner(options):
+    yield {}, lambda: get_rps_winner(ROCK, PAPER)
+
+
+@benchmark('evaluate_rules')
+def bench_evaluate_rules(options):
+    # Per call for the whole batch, compare with get_rps_winner times the batch size
+    rng = np.random.default_rng(0)
+    size = len(DEFAULT_RULE_SET.signs)
+    for pairs in (1000, 1000000):
+        codes1 = rng.integers(0, size, pairs).astype(np.int8)
+        codes2 = rng.integers(0, size, pairs).astype(np.int8)
+        yield {'pairs': pairs}, lambda a=codes1, b=codes2: DEFAULT_RULE_SET.evaluate(a, b)
+
+
+@benchmark('build_frame_view')
+def bench_build_frame_view(options):
+    for count in DETECTION_COUNTS:
+        game_state = detection_state(count)
+        yield {'detections': count}, lambda g=game_state: build_frame_view(g, time.time())
+
+
+@benchmark('draw_custom_bounding_boxes')
+def bench_draw_custom_bounding_boxes(options):
+    thumb_up = CLASS_NAMES.index(THUMB_UP)
+    for width, height in FRAME_SIZES:
+        img = load_frames(width, height, options.frames, count=1)[0]
+        for count in DETECTION_COUNTS:
+            result = make_result(count, width, height, [thumb_up])
+            view = build_frame_view(detection_state(count), time.time())
+            yield ({'frame': f"{width}x{height}", 'detections': count},
+                   lambda i=img, r=result, v=view: draw_custom_bounding_boxes(i, r, v, 0))
+
+
+@benchmark('draw_hud')
+def bench_draw_hud(options):
+    for width, height in FRAME_SIZES:
+        img = load_frames(width, height, options.frames, count=1)[0]
+        for phase, game_state in (('detection', detection_state(4)), ('game', game_phase_state(2))):
+            view = build_frame_view(game_state, time.time())
+            yield ({'frame': f"{width}x{height}", 'phase': phase},
+                   lambda i=img, v=view: draw_hud(i, v))
+
+
+class SlowStreamHandler(logging.StreamHandler):
+    """Stream handler that stalls on every write, like a blocked terminal or a busy disk."""
+
+    def emit(self, record):
+        time.sleep(0.001)
+        super().emit(record)
+
+
+@benchmark('log_record')
+def bench_log_record(options):
+    # Time the frame loop spends on one INFO record
+    log_dir = tempfile.mkdtemp(prefix='rps-bench-log-')
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    cases = (('file', False, None), ('file, queued, rate limited', False, 5),
+             ('slow stream', True, None), ('slow stream, queued', True, 10 ** 12))
+    for index, (handler, slow, burst) in enumerate(cases):
+        logger = logging.getLogger(f"bench.log_record.{index}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        if slow:
+            target = SlowStreamHandler(open(os.devnull, 'w'))
+        else:
+            target = logging.FileHandler(os.path.join(log_dir, f"{index}.log"))
+        target.setFormatter(formatter)
+        logger.addHandler(target)
+        if burst is not None:
+            start_queued_logging(logger, burst=burst)
+        yield {'handler': handler}, lambda l=logger: l.info("Round result: %s", 'Player 1 Wins')
+
+
+@benchmark('resize_to_window')
+def bench_resize_to_window(options):
+    # Measures fit_to_window, the part of resize_to_window that does not need a GUI window
+    win_w, win_h = 1600, 900
+    for width, height in FRAME_SIZES:
+        img = load_frames(width, height, options.frames, count=1)[0]
+        yield ({'frame': f"{width}x{height}", 'window': f"{win_w}x{win_h}"},
+               lambda i=img, w=width, h=height: fit_to_window(i, win_w, win_h, w, h))
+
+
+@benchmark('import_time')
+def bench_import_time(options):
+    # One fresh interpreter per call, compare with the empty interpreter
+    game_dir = REPO_ROOT / "src" / "rps-game"
+    env = {**os.environ, 'PYTHONPATH': str(game_dir)}
+    commands = (('python', ['-c', 'pass']),
+                ('config', ['-c', 'import config']),
+                ('game.simulation', ['-c', 'import game.simulation']),
+                ('main', ['-c', 'import main']),
+                ('main --help', [str(game_dir / 'main.py'), '--help']))
+    for name, command in commands:
+        yield ({'command': name},
+               lambda c=command: subprocess.run([sys.executable, *c], env=env, check=True,
+                                                stdout=subprocess.DEVNULL))
+
+
+def measure(func, min_time, repeats):
+    """
+    Time a callable.
+
+    Args:
+        func: Zero-argument callable to time
+        min_time: Minimum duration of one timing round in seconds
+        repeats: Number of timing rounds
+
+    Returns:
+        dict: Per-call statistics in microseconds
+    """
+    # Calibrate the number of calls per round
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+
+    return {
+        'min_us': min(samples),
+        'median_us': statistics.median(samples),
+        'mean_us': statistics.fmean(samples),
+        'calls_per_round': number,
+        'rounds': repeats,
+    }
+
+
+def case_key(name, params):
+    """Build a stable identifier for a benchmark case."""
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def git_commit():
+    """Return the current git commit hash, or 'unknown'."""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(options):
+    """Run all selected benchmarks and return the results document."""
+    results = {}
+    for name, factory in BENCHMARKS:
+        if options.filter and options.filter not in name:
+            continue
+        for params, func in factory(options):
+            key = case_key(name, params)
+            stats = measure(func, options.min_time, options.repeats)
+            results[key] = stats
+            print(f"{key:<70} {stats['median_us']:>12.2f} us")
+
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """
+    Print a comparison table against a baseline results document.
+
+    Returns:
+        int: Number of cases slower than the baseline by more than `threshold`
+    """
+    regressions = 0
+    print(f"\nComparison against {baseline['commit']} ({baseline['timestamp']})")
+    for key, stats in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            print(f"{key:<70} {'new':>12}")
+            continue
+        ratio = stats['median_us'] / base['median_us']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '  improved'
+        print(f"{key:<70} {ratio:>11.2f}x{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this text")
+    parser.add_argument('--frames', help="Directory of recorded frames (synthetic frames if omitted)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Minimum seconds per timing round")
+    parser.add_argument('--repeats', type=int, default=5, help="Number of timing rounds per case")
+    parser.add_argument('--quick', action='store_true', help="Short rounds for a fast smoke run")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', metavar='BASELINE', help="Results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.min_time, args.repeats = 0.02, 3
+    return args
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    # Game logic logs every new hand; keep the console out of the measurements
+    logging.getLogger('myapp').setLevel(logging.WARNING)
+
+    current = run(options)
+
+    output = Path(options.output) if options.output else RESULTS_DIR / f"{current['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, indent=2))
+    print(f"\nResults written to {output}")
+
+    if options.compare:
+        baseline = json.loads(Path(options.compare).read_text())
+        if compare(current, baseline, options.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Memory benchmark for the game state representation.
+
+Compares the memory held by the pending-hand table and players with the
+previous representation (one dict per pending hand, players with an instance
+__dict__), and measures the memory allocated and time taken per frame by the
+detection phase update.
+
+Usage (from the repository root):
+    python benchmarks/state_memory.py
+    python benchmarks/state_memory.py --hands 16 64 256
+"""
+import argparse
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "rps-game"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from config import log, PAPER, ROCK, SCISSOR, SIGN_CODES
+from detection.hand_tracking import update_player_detection
+from game_state import GameState, Player
+from fixtures import make_signs_by_id
+
+
+class DictPlayer:
+    """Player with an instance __dict__, as stored before __slots__."""
+
+    def __init__(self):
+        self.id = None
+        self.sign = None
+        self.last_seen = None
+        self.ready = False
+        self.score = 0
+        self.locked = None
+        self.lock_start_time = None
+        self.center = None
+
+
+def retained_bytes(build):
+    """
+    Measure the memory retained by the object returned from build().
+
+    Args:
+        build: Zero-argument callable creating the objects to measure
+
+    Returns:
+        int: Bytes allocated and still referenced after the call
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def build_pending_dicts(signs_by_id, now):
+    """Pending hands as one dict per hand."""
+    return {
+        track_id: {'sign': sign, 'locked': sign, 'lock_start_time': now,
+                   'last_seen': now, 'center': (float(track_id), 0.0)}
+        for track_id, sign in signs_by_id.items()
+    }
+
+
+def build_pending_table(signs_by_id, now):
+    """Pending hands in the PendingHands table."""
+    game_state = GameState(now)
+    pending_hands = game_state.pending_hands
+    for track_id, sign in signs_by_id.items():
+        row = pending_hands.add(track_id, SIGN_CODES[sign], now, (float(track_id), 0.0))
+        pending_hands.locked[row] = SIGN_CODES[sign]
+        pending_hands.lock_start_time[row] = now
+    return pending_hands
+
+
+def build_players(player_class, count, now):
+    """Registered players of the given class."""
+    players = []
+    for track_id in range(count):
+        player = player_class()
+        player.id = track_id
+        player.sign = ROCK
+        player.last_seen = now
+        player.center = (float(track_id), 0.0)
+        players.append(player)
+    return players
+
+
+def frame_cost(hands, frames):
+    """
+    Measure the steady-state cost of one detection phase frame.
+
+    Args:
+        hands: Number of pending hands in view
+        frames: Number of frames to time
+
+    Returns:
+        tuple: (peak bytes allocated during one frame, microseconds per frame)
+    """
+    signs_by_id = make_signs_by_id(hands, [ROCK, PAPER, SCISSOR])
+    game_state = GameState(0.0)
+    now = 0.0
+    for _ in range(3):
+        now += 1 / 30
+        update_player_detection(signs_by_id, game_state, now)
+
+    gc.collect()
+    tracemalloc.start()
+    now += 1 / 30
+    update_player_detection(signs_by_id, game_state, now)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        now += 1 / 30
+        update_player_detection(signs_by_id, game_state, now)
+    elapsed = time.perf_counter() - start
+    return peak, elapsed / frames * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure memory and per-frame cost of the game state.")
+    parser.add_argument('--hands', type=int, nargs='+', default=[4, 16, 64, 256],
+                        help="Numbers of hands in view")
+    parser.add_argument('--frames', type=int, default=2000, help="Frames timed per hand count")
+    args = parser.parse_args(argv)
+    log.setLevel(logging.ERROR)
+
+    print(f"{'hands':>6} {'dict rows':>11} {'table':>9} {'dict players':>13} {'slot players':>13} "
+          f"{'frame alloc':>12} {'frame time':>11}")
+    for hands in args.hands:
+        signs_by_id = make_signs_by_id(hands, [ROCK, PAPER, SCISSOR])
+        now = time.time()
+        dict_rows = retained_bytes(lambda: build_pending_dicts(signs_by_id, now))
+        table = retained_bytes(lambda: build_pending_table(signs_by_id, now))
+        dict_players = retained_bytes(lambda: build_players(DictPlayer, hands, now))
+        slot_players = retained_bytes(lambda: build_players(Player, hands, now))
+        peak, frame_us = frame_cost(hands, args.frames)
+        print(f"{hands:>6} {dict_rows:>10}B {table:>8}B {dict_players:>12}B {slot_players:>12}B "
+              f"{peak:>11}B {frame_us:>9.2f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# Write captured images and their labels from a pool of background threads
+
+import logging
+import os
+import queue
+import threading
+import cv2
+from yolo_labels import write_label
+
+logger = logging.getLogger(__name__)
+
+
+def encode_params(extension, compression):
+    """
+    Get the cv2.imwrite parameters of an image format.
+
+    Args:
+        extension: 'png', 'jpg', 'jpeg' or 'webp'
+        compression: PNG compression level (0-9), or JPEG/WebP quality (0-100),
+            None for the OpenCV default (for PNG a fast level 1 RLE encoding)
+
+    Returns:
+        list: Parameters for cv2.imwrite
+    """
+    if compression is None:
+        return []
+    extension = extension.lower().lstrip('.')
+    if extension == 'png':
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(compression)]
+    if extension in ('jpg', 'jpeg'):
+        return [cv2.IMWRITE_JPEG_QUALITY, int(compression)]
+    if extension == 'webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, int(compression)]
+    return []
+
+
+class AsyncImageWriter:
+    """
+    Pool of threads encoding and writing images, fed by a bounded queue.
+
+    cv2.imwrite releases the GIL while encoding, so several writers keep up
+    with the camera while the capture loop only copies the frame. When the
+    queue is full `submit` waits for a free slot, so memory stays bounded
+    and no capture is lost.
+    """
+
+    def __init__(self, workers=4, queue_size=64, params=None):
+        """
+        Start the writer threads.
+
+        Args:
+            workers: Number of writer threads
+            queue_size: Maximum number of images waiting to be written
+            params: cv2.imwrite parameters, see encode_params
+        """
+        self.params = params or []
+        self.written = 0
+        self.failed = 0
+        self._queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, name=f'image-writer-{i}', daemon=True)
+                         for i in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def __str__(self):
+        return f"AsyncImageWriter(workers={len(self._threads)}, pending={self.pending}, written={self.written}, failed={self.failed})"
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def pending(self):
+        """Number of images waiting to be written."""
+        return self._queue.qsize()
+
+    def submit(self, path, image, label_path=None, label_lines=()):
+        """
+        Queue an image, and optionally its label file, for writing.
+
+        The image must not be modified afterwards, pass a copy of a frame
+        that is still drawn on.
+
+        Args:
+            path: Image file, its extension selects the format
+            image: Image array
+            label_path: Optional label file written after the image
+            label_lines: Lines of the label file
+        """
+        self._queue.put((path, image, label_path, tuple(label_lines)))
+
+    def close(self):
+        """Write the queued images and stop the threads."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        logger.info("Wrote %d images (%d failed).", self.written, self.failed)
+
+    def _run(self):
+        """Writer thread: write queued images until a None item is received."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, image, label_path, label_lines = item
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                if not cv2.imwrite(path, image, self.params):
+                    raise OSError(f"cv2.imwrite could not write {path}")
+                if label_path is not None:
+                    write_label(label_path, label_lines)
+                with self._lock:
+                    self.written += 1
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                logger.error("Failed to write %s: %s", path, e)
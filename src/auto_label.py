@@ -0,0 +1,241 @@
+# Label captured images with the trained detector, flagging uncertain ones for review
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+from yolo_labels import box_to_yolo, format_label_line, write_label
+
+# Model and class names of the game
+GAME_DIR = Path(__file__).parent / 'rps-game'
+sys.path.insert(0, str(GAME_DIR))
+from config import CLASS_NAMES, MODEL_PATH
+
+SIDECAR_SUFFIX = '.conf.json'  # Confidence sidecar next to each label file
+REVIEW_FILE = 'review.txt'  # Images flagged for review, one path per line, next to the label folder
+IMAGE_EXTENSIONS = {'.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp'}
+
+_worker_model = None  # YOLO model of a worker process
+
+
+def default_label_dir(image_dir):
+    """Label folder of an image folder, following the YOLO layout (.../images -> .../labels)."""
+    image_dir = os.path.normpath(image_dir)
+    parent, name = os.path.split(image_dir)
+    return os.path.join(parent, 'labels') if name == 'images' else image_dir
+
+
+def sidecar_path(label_dir, stem):
+    """Confidence sidecar of an image."""
+    return os.path.join(label_dir, stem + SIDECAR_SUFFIX)
+
+
+def review_list_path(label_dir):
+    """Review list of a label folder, kept out of it so it is not read as a label file."""
+    return os.path.join(os.path.dirname(os.path.normpath(label_dir)), REVIEW_FILE)
+
+
+def pending_images(image_dir, label_dir, overwrite=False):
+    """
+    List the images that still need labels.
+
+    An image is done when its sidecar and its label file exist. The sidecar is
+    written first, so an interrupted image is labelled again. Label files
+    without a sidecar were not written by this tool (e.g. drawn by hand or
+    captured with their ROI) and are kept unless overwrite is set.
+
+    Args:
+        image_dir: Folder of images
+        label_dir: Folder of label files and sidecars
+        overwrite: True to relabel images that have a label without sidecar
+
+    Returns:
+        tuple: (pending image paths, number of images already done), sorted by path
+    """
+    pending = []
+    done = 0
+    for path in sorted(Path(image_dir).iterdir()):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        has_label = os.path.exists(os.path.join(label_dir, path.stem + '.txt'))
+        if os.path.exists(sidecar_path(label_dir, path.stem)):
+            if has_label:
+                done += 1
+                continue
+        elif has_label and not overwrite:
+            continue
+        pending.append(str(path))
+    return pending, done
+
+
+def result_labels(result, min_conf=0.0):
+    """
+    Convert a YOLO result to label lines and per box confidences.
+
+    Args:
+        result: YOLO (or recorded) result with boxes and orig_shape
+        min_conf: Boxes below this confidence are left out
+
+    Returns:
+        tuple: (label lines, list of {'class', 'name', 'conf'} dicts)
+    """
+    lines = []
+    detections = []
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return lines, detections
+    img_h, img_w = result.orig_shape[:2]
+    xyxy = boxes.xyxy.cpu().numpy()
+    confs = boxes.conf.cpu().numpy()
+    classes = boxes.cls.cpu().numpy()
+    for (x1, y1, x2, y2), conf, cls in zip(xyxy, confs, classes):
+        if conf < min_conf:
+            continue
+        cls = int(cls)
+        lines.append(format_label_line(cls, box_to_yolo(x1, y1, x2 - x1, y2 - y1, img_w, img_h)))
+        detections.append({'class': cls, 'name': CLASS_NAMES[cls], 'conf': round(float(conf), 4)})
+    return lines, detections
+
+
+def needs_review(detections, review_conf):
+    """An image needs review when nothing was detected or any box is below review_conf."""
+    return not detections or min(d['conf'] for d in detections) < review_conf
+
+
+def label_batch(model, paths, label_dir, min_conf=0.25, review_conf=0.6, imgsz=640, device=None):
+    """
+    Run the detector on a batch of images and write their labels and sidecars.
+
+    Args:
+        model: YOLO model (anything with a compatible predict method)
+        paths: Image paths of the batch
+        label_dir: Output folder
+        min_conf: Boxes below this confidence are left out of the labels
+        review_conf: Images with a box below this confidence are flagged
+        imgsz: Inference size
+        device: Optional inference device, e.g. 'cpu' or '0'
+
+    Returns:
+        list: (image path, flagged for review) tuples
+    """
+    kwargs = {'imgsz': imgsz, 'conf': min_conf, 'verbose': False}
+    if device is not None:
+        kwargs['device'] = device
+    results = model.predict(list(paths), **kwargs)
+
+    flagged = []
+    for path, result in zip(paths, results):
+        stem = Path(path).stem
+        lines, detections = result_labels(result, min_conf)
+        review = needs_review(detections, review_conf)
+        sidecar = {'image': os.path.abspath(path), 'detections': detections, 'review': review}
+        tmp_path = sidecar_path(label_dir, stem) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(sidecar, f)
+        os.replace(tmp_path, sidecar_path(label_dir, stem))
+        write_label(os.path.join(label_dir, stem + '.txt'), lines)
+        flagged.append((path, review))
+    return flagged
+
+
+def _init_worker(model_path, threads):
+    """Process pool initializer: load the model once per worker."""
+    global _worker_model
+    import torch
+    torch.set_num_threads(threads)
+    from ultralytics import YOLO
+    _worker_model = YOLO(model_path)
+
+
+def _label_batch_in_worker(paths, label_dir, min_conf, review_conf, imgsz, device):
+    """Process pool task: label one batch with the worker's model."""
+    return label_batch(_worker_model, paths, label_dir, min_conf, review_conf, imgsz, device)
+
+
+def write_review_list(label_dir):
+    """
+    Collect the images flagged by all sidecars, including earlier runs, into
+    review.txt next to the label folder.
+
+    Args:
+        label_dir: Folder of label files and sidecars
+
+    Returns:
+        int: Number of flagged images
+    """
+    flagged = []
+    for path in sorted(Path(label_dir).glob('*' + SIDECAR_SUFFIX)):
+        with open(path) as f:
+            sidecar = json.load(f)
+        if sidecar['review']:
+            flagged.append(sidecar['image'])
+    with open(review_list_path(label_dir), 'w') as f:
+        f.writelines(f'{image}\n' for image in flagged)
+    return len(flagged)
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', required=True, help='Folder of captured images')
+    parser.add_argument('--labels', default=None,
+                        help='Output folder (defaults to the labels folder next to an images folder)')
+    parser.add_argument('--model', default=str(GAME_DIR / MODEL_PATH), help='Detector weights')
+    parser.add_argument('--batch', type=int, default=16, help='Images per inference batch')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes running the model, CPU threads are shared between them')
+    parser.add_argument('--imgsz', type=int, default=640, help='Inference size')
+    parser.add_argument('--device', default=None, help="Inference device, e.g. 'cpu' or '0'")
+    parser.add_argument('--conf', type=float, default=0.25, help='Minimum confidence of a labelled box')
+    parser.add_argument('--review-conf', type=float, default=0.6,
+                        help='Images with no box or a box below this confidence are listed for review')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Also relabel images that already have a label file not written by this tool')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    label_dir = args.labels or default_label_dir(args.images)
+    os.makedirs(label_dir, exist_ok=True)
+    pending, done = pending_images(args.images, label_dir, args.overwrite)
+    print(f'{len(pending)} images to label, {done} already labelled.')
+
+    batches = [pending[i:i + args.batch] for i in range(0, len(pending), args.batch)]
+    task_args = (label_dir, args.conf, args.review_conf, args.imgsz, args.device)
+    threads = max(1, (os.cpu_count() or 1) // max(1, args.workers))
+    start = time.perf_counter()
+    labelled = 0
+    if batches:
+        if args.workers > 1:
+            with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                     initargs=(args.model, threads)) as executor:
+                futures = [executor.submit(_label_batch_in_worker, batch, *task_args) for batch in batches]
+                for future in futures:
+                    labelled += len(future.result())
+                    print(f'Labelled {labelled}/{len(pending)} images', end='\r')
+        else:
+            _init_worker(args.model, threads)
+            for batch in batches:
+                labelled += len(_label_batch_in_worker(batch, *task_args))
+                print(f'Labelled {labelled}/{len(pending)} images', end='\r')
+        elapsed = time.perf_counter() - start
+        print(f'\nLabelled {labelled} images in {elapsed:.1f} s ({labelled / elapsed:.1f} images/s).')
+
+    flagged = write_review_list(label_dir)
+    print(f'{flagged} images flagged for review in {review_list_path(label_dir)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+# Inspect a YOLO dataset: class balance, box size/aspect distributions and malformed labels
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import os
+import pickle
+import sys
+
+# Class names of the game, so reports use the same names as the HUD
+sys.path.insert(0, str(Path(__file__).parent / 'rps-game'))
+from config import CLASS_NAMES
+
+INDEX_VERSION = 1
+INDEX_FILE = '.label_index.pkl'
+POOL_THRESHOLD = 256  # Fewer changed files are parsed inline, a pool costs more to start
+CHUNK_SIZE = 64
+EPSILON = 1e-6  # Tolerance of the normalized coordinate checks
+IMAGE_EXTENSIONS = {'.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp'}
+
+
+def parse_label_file(path, num_classes=len(CLASS_NAMES)):
+    """
+    Parse a YOLO label file and check every line.
+
+    Args:
+        path: Label file
+        num_classes: Number of valid class indices
+
+    Returns:
+        tuple: (boxes, errors), boxes as (class, x, y, w, h) tuples and
+        errors as 'line N: problem' strings
+    """
+    boxes = []
+    errors = []
+    seen = set()
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) != 5:
+                errors.append(f'line {number}: {len(fields)} fields instead of 5')
+                continue
+            try:
+                cls = int(fields[0])
+                x, y, w, h = (float(value) for value in fields[1:])
+            except ValueError:
+                errors.append(f'line {number}: not a number')
+                continue
+            if not 0 <= cls < num_classes:
+                errors.append(f'line {number}: unknown class {cls}')
+                continue
+            if w <= 0 or h <= 0:
+                errors.append(f'line {number}: empty box')
+                continue
+            if (x - w / 2 < -EPSILON or x + w / 2 > 1 + EPSILON
+                    or y - h / 2 < -EPSILON or y + h / 2 > 1 + EPSILON):
+                errors.append(f'line {number}: box outside the image')
+                continue
+            box = (cls, x, y, w, h)
+            if box in seen:
+                errors.append(f'line {number}: duplicate box')
+                continue
+            seen.add(box)
+            boxes.append(box)
+    return tuple(boxes), tuple(errors)
+
+
+def _parse_chunk(paths):
+    """Process pool task: parse a chunk of label files."""
+    return [parse_label_file(path) for path in paths]
+
+
+def scan_files(directory, extensions=None):
+    """
+    Stat every file below a directory.
+
+    Args:
+        directory: Folder to scan recursively
+        extensions: Optional set of lower case suffixes to keep
+
+    Returns:
+        dict: Path relative to directory -> (mtime_ns, size)
+    """
+    files = {}
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                elif entry.is_file() and not entry.name.startswith('.'):
+                    if extensions is None or os.path.splitext(entry.name)[1].lower() in extensions:
+                        stat = entry.stat()
+                        files[os.path.relpath(entry.path, directory)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def load_index(index_path):
+    """
+    Load a label index, or an empty one if it is missing or from another version.
+
+    Args:
+        index_path: Index file
+
+    Returns:
+        dict: Relative path -> (mtime_ns, size, boxes, errors)
+    """
+    try:
+        with open(index_path, 'rb') as f:
+            index = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    if not isinstance(index, dict):
+        return {}
+    if index.get('version') != INDEX_VERSION or index.get('classes') != len(CLASS_NAMES):
+        return {}
+    return index['entries']
+
+
+def save_index(index_path, entries):
+    """
+    Atomically write a label index.
+
+    Args:
+        index_path: Index file
+        entries: Relative path -> (mtime_ns, size, boxes, errors)
+    """
+    tmp_path = f'{index_path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'version': INDEX_VERSION, 'classes': len(CLASS_NAMES), 'entries': entries}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, index_path)
+
+
+def build_index(label_dir, index_path=None, workers=None):
+    """
+    Parse the label files of a dataset, reusing the index for unchanged files.
+
+    A file is reparsed when its modification time or size changed. Large
+    numbers of changed files are parsed in a process pool.
+
+    Args:
+        label_dir: Folder containing the YOLO label files
+        index_path: Index file (defaults to .label_index.pkl in label_dir)
+        workers: Processes of the pool (defaults to the CPU count)
+
+    Returns:
+        tuple: (entries, number of reparsed files)
+    """
+    index_path = index_path or os.path.join(label_dir, INDEX_FILE)
+    cached = load_index(index_path)
+    files = scan_files(label_dir, {'.txt'})
+
+    entries = {}
+    changed = []
+    for rel_path, (mtime, size) in files.items():
+        entry = cached.get(rel_path)
+        if entry is not None and entry[0] == mtime and entry[1] == size:
+            entries[rel_path] = entry
+        else:
+            changed.append(rel_path)
+
+    paths = [os.path.join(label_dir, rel_path) for rel_path in changed]
+    if len(paths) >= POOL_THRESHOLD and workers != 1:
+        chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = [result for chunk in executor.map(_parse_chunk, chunks) for result in chunk]
+    else:
+        parsed = _parse_chunk(paths)
+    for rel_path, (boxes, errors) in zip(changed, parsed):
+        entries[rel_path] = (*files[rel_path], boxes, errors)
+
+    if changed or len(entries) != len(cached):
+        save_index(index_path, entries)
+    return entries, len(changed)
+
+
+def percentiles(values, points=(5, 50, 95)):
+    """
+    Nearest-rank percentiles of a list of numbers.
+
+    Args:
+        values: Numbers
+        points: Percentiles to compute
+
+    Returns:
+        dict: Percentile -> value, empty if there are no values
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] for p in points}
+
+
+def summarize(entries, image_files=None, class_names=CLASS_NAMES):
+    """
+    Compute the per class report of a label index.
+
+    Widths, heights and aspect ratios are in normalized image coordinates.
+
+    Args:
+        entries: Label index from build_index
+        image_files: Optional relative image paths, to find images without labels and labels without images
+        class_names: Name of each class index
+
+    Returns:
+        dict: Report with 'files', 'classes' and 'errors' sections
+    """
+    per_class = defaultdict(lambda: {'boxes': 0, 'images': 0, 'w': [], 'h': [], 'area': [], 'aspect': []})
+    errors = {}
+    empty = 0
+    for rel_path, (_, _, boxes, file_errors) in entries.items():
+        if file_errors:
+            errors[rel_path] = list(file_errors)
+        if not boxes:
+            empty += 1
+        for cls in {box[0] for box in boxes}:
+            per_class[cls]['images'] += 1
+        for cls, _, _, w, h in boxes:
+            stats = per_class[cls]
+            stats['boxes'] += 1
+            stats['w'].append(w)
+            stats['h'].append(h)
+            stats['area'].append(w * h)
+            stats['aspect'].append(w / h)
+
+    total_boxes = sum(stats['boxes'] for stats in per_class.values())
+    classes = {}
+    for cls, name in enumerate(class_names):
+        stats = per_class.get(cls)
+        if stats is None:
+            classes[name] = {'boxes': 0, 'images': 0, 'share': 0.0}
+            continue
+        classes[name] = {
+            'boxes': stats['boxes'],
+            'images': stats['images'],
+            'share': stats['boxes'] / total_boxes,
+            **{key: percentiles(stats[key]) for key in ('w', 'h', 'area', 'aspect')},
+        }
+
+    report = {
+        'files': {'labels': len(entries), 'empty_labels': empty, 'boxes': total_boxes,
+                  'malformed_files': len(errors)},
+        'classes': classes,
+        'errors': errors,
+    }
+    if image_files is not None:
+        label_stems = {os.path.splitext(rel_path)[0] for rel_path in entries}
+        image_stems = {os.path.splitext(rel_path)[0] for rel_path in image_files}
+        report['files']['images'] = len(image_files)
+        report['files']['images_without_labels'] = len(image_stems - label_stems)
+        report['files']['labels_without_images'] = sorted(label_stems - image_stems)
+    return report
+
+
+def print_report(report, max_errors=20):
+    """
+    Print a report as text.
+
+    Args:
+        report: Report from summarize
+        max_errors: Number of malformed files listed
+    """
+    for key, value in report['files'].items():
+        if isinstance(value, list):
+            value = f"{len(value)} {value[:5]}" if value else 0
+        print(f'{key}: {value}')
+    print()
+    print(f"{'class':<12} {'boxes':>7} {'images':>7} {'share':>6}   w p5/p50/p95        h p5/p50/p95        aspect p50")
+    for name, stats in report['classes'].items():
+        line = f"{name:<12} {stats['boxes']:>7} {stats['images']:>7} {stats['share']:>6.1%}"
+        if stats['boxes']:
+            w, h = stats['w'], stats['h']
+            line += (f"   {w[5]:.3f}/{w[50]:.3f}/{w[95]:.3f}   {h[5]:.3f}/{h[50]:.3f}/{h[95]:.3f}"
+                     f"   {stats['aspect'][50]:.2f}")
+        print(line)
+    if report['errors']:
+        print()
+        print(f"Malformed label files ({len(report['errors'])}):")
+        for rel_path, file_errors in list(report['errors'].items())[:max_errors]:
+            print(f"  {rel_path}: {'; '.join(file_errors)}")
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--datapath', required=True,
+                        help='Path to data folder containing images and labels folders')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to parse label files (defaults to the CPU count)')
+    parser.add_argument('--index', default=None,
+                        help=f'Label index file (defaults to labels/{INDEX_FILE})')
+    parser.add_argument('--json', metavar='FILE', default=None,
+                        help='Also write the full report as JSON to FILE')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    label_dir = os.path.join(args.datapath, 'labels')
+    image_dir = os.path.join(args.datapath, 'images')
+    if not os.path.isdir(label_dir):
+        print(f'Directory \"{label_dir}\" not found. Verify the path is correct and try again.')
+        sys.exit(1)
+
+    entries, reparsed = build_index(label_dir, args.index, args.workers)
+    print(f'Parsed {reparsed} changed label files, {len(entries) - reparsed} from the index.')
+    image_files = scan_files(image_dir, IMAGE_EXTENSIONS) if os.path.isdir(image_dir) else None
+    report = summarize(entries, image_files)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if report['errors']:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
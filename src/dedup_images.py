@@ -0,0 +1,342 @@
+# Find near-duplicate images of a captured dataset with perceptual hashes
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import pickle
+import sys
+import cv2
+import numpy as np
+from yolo_labels import label_path_for
+
+INDEX_VERSION = 1
+INDEX_FILE = '.phash_index.pkl'
+IMAGE_EXTENSIONS = {'.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp'}
+DEFAULT_DISTANCE = 6  # Hamming distance (out of 64 bits) below which two images are duplicates
+CHUNK_SIZE = 32
+
+
+def phash(image):
+    """
+    64-bit perceptual hash of an image.
+
+    The image is reduced to 32x32 grayscale and each bit of the hash tells
+    whether one of the 8x8 lowest frequency DCT coefficients is above their
+    median. Small changes of noise, exposure or compression change few bits.
+
+    Args:
+        image: BGR or grayscale image
+
+    Returns:
+        int: Hash
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])  # The DC term only measures brightness
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a, b):
+    """Number of differing bits of two hashes."""
+    return bin(a ^ b).count('1')
+
+
+def _hash_chunk(paths):
+    """Process pool task: hash a chunk of image files, None for unreadable ones."""
+    hashes = []
+    for path in paths:
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        hashes.append(None if image is None else phash(image))
+    return hashes
+
+
+class MultiIndexHash:
+    """
+    Hash table lookup of 64-bit hashes within a Hamming distance.
+
+    The hashes are cut into max_distance + 1 bands, each with its own table.
+    Two hashes that differ in at most max_distance bits cannot differ in
+    every band, so the matches of a query are among the hashes sharing at
+    least one band with it. Only those candidates are compared, instead of
+    every indexed hash.
+    """
+
+    def __init__(self, max_distance=DEFAULT_DISTANCE):
+        """
+        Initialize an empty index.
+
+        Args:
+            max_distance: Largest distance queries may use
+        """
+        self.max_distance = max_distance
+        count = max_distance + 1
+        width = 64 // count
+        # (shift, mask) of each band, the last band takes the remaining bits
+        self._bands = [(i * width, (1 << (64 - i * width if i == count - 1 else width)) - 1) for i in range(count)]
+        self._tables = [{} for _ in self._bands]
+        self._values = []  # (hash, item) by insertion order
+
+    def __str__(self):
+        return f"MultiIndexHash(max_distance={self.max_distance}, size={len(self._values)})"
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, value, item):
+        """
+        Insert a hash.
+
+        Args:
+            value: Hash
+            item: Object returned by queries, e.g. the image name
+        """
+        position = len(self._values)
+        self._values.append((value, item))
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault((value >> shift) & mask, []).append(position)
+
+    def query(self, value, max_distance=None):
+        """
+        Find the hashes within a distance.
+
+        Args:
+            value: Hash to look up
+            max_distance: Maximum Hamming distance, at most the index's max_distance
+
+        Returns:
+            list: (distance, item) tuples, closest first
+        """
+        max_distance = self.max_distance if max_distance is None else max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(f"max_distance {max_distance} exceeds the index's {self.max_distance}")
+        found = []
+        seen = set()
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for position in table.get((value >> shift) & mask, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                other, item = self._values[position]
+                distance = hamming(value, other)
+                if distance <= max_distance:
+                    found.append((distance, item))
+        found.sort(key=lambda match: match[0])
+        return found
+
+
+class HashIndex:
+    """
+    Perceptual hashes of the images of a folder, kept on disk between runs.
+
+    Each entry stores the file's modification time and size, so only new or
+    changed images are decoded and hashed again.
+    """
+
+    def __init__(self, image_dir, index_path=None):
+        """
+        Load the index of a folder.
+
+        Args:
+            image_dir: Folder of images
+            index_path: Index file (defaults to .phash_index.pkl in image_dir)
+        """
+        self.image_dir = image_dir
+        self.index_path = index_path or os.path.join(image_dir, INDEX_FILE)
+        self.entries = {}  # file name -> (mtime_ns, size, hash)
+        try:
+            with open(self.index_path, 'rb') as f:
+                index = pickle.load(f)
+            if isinstance(index, dict) and index.get('version') == INDEX_VERSION:
+                self.entries = index['entries']
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+    def __str__(self):
+        return f"HashIndex(image_dir={self.image_dir}, entries={len(self.entries)})"
+    def __repr__(self):
+        return self.__str__()
+
+    def update(self, workers=None):
+        """
+        Hash new and changed images in a process pool and forget deleted ones.
+
+        Args:
+            workers: Processes of the pool (defaults to the CPU count, 1 hashes inline)
+
+        Returns:
+            int: Number of images hashed
+        """
+        files = {}
+        with os.scandir(self.image_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    stat = entry.stat()
+                    files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = [name for name, stat in files.items()
+                   if name not in self.entries or self.entries[name][:2] != stat]
+        paths = [os.path.join(self.image_dir, name) for name in changed]
+        chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+        if workers == 1 or len(chunks) <= 1:
+            hashes = [value for chunk in chunks for value in _hash_chunk(chunk)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                hashes = [value for chunk in executor.map(_hash_chunk, chunks) for value in chunk]
+
+        entries = {name: entry for name, entry in self.entries.items() if name in files}
+        for name, value in zip(changed, hashes):
+            if value is not None:
+                entries[name] = (*files[name], value)
+        if changed or len(entries) != len(self.entries):
+            self.entries = entries
+            self.save()
+        return len(changed)
+
+    def save(self):
+        """Atomically write the index."""
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': INDEX_VERSION, 'entries': self.entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, max_distance=DEFAULT_DISTANCE, exclude=()):
+        """
+        Build a multi-index hash table of the indexed hashes.
+
+        Args:
+            max_distance: Largest distance of the queries
+            exclude: File names left out of the table
+
+        Returns:
+            MultiIndexHash: Table whose items are file names
+        """
+        table = MultiIndexHash(max_distance)
+        for name in sorted(self.entries):
+            if name not in exclude:
+                table.add(self.entries[name][2], name)
+        return table
+
+
+def find_duplicates(index, max_distance=DEFAULT_DISTANCE):
+    """
+    Group near-duplicate images, keeping the oldest image of each group.
+
+    Images are visited by modification time (then name), so the first frame
+    of a run of similar captures is kept and the following ones are reported
+    against it.
+
+    Args:
+        index: Updated HashIndex
+        max_distance: Maximum Hamming distance of duplicates
+
+    Returns:
+        list: (duplicate name, kept name, distance) tuples
+    """
+    kept = MultiIndexHash(max_distance)
+    duplicates = []
+    for name in sorted(index.entries, key=lambda name: (index.entries[name][0], name)):
+        value = index.entries[name][2]
+        matches = kept.query(value, max_distance)
+        if matches:
+            distance, original = matches[0]
+            duplicates.append((name, original, distance))
+        else:
+            kept.add(value, name)
+    return duplicates
+
+
+def remove_duplicates(index, duplicates):
+    """
+    Delete duplicate images and their label files.
+
+    Args:
+        index: HashIndex the duplicates were found in
+        duplicates: Result of find_duplicates
+    """
+    for name, _, _ in duplicates:
+        path = os.path.join(index.image_dir, name)
+        os.remove(path)
+        label_path = label_path_for(path)
+        if os.path.exists(label_path):
+            os.remove(label_path)
+        del index.entries[name]
+    index.save()
+
+
+def check_images(index, paths, max_distance=DEFAULT_DISTANCE):
+    """
+    Look up new images against the index without adding them.
+
+    Checked images that are already in the indexed folder, e.g. new captures
+    written there, are left out of the lookup so they do not match themselves.
+
+    Args:
+        index: Updated HashIndex
+        paths: Image files to check
+        max_distance: Maximum Hamming distance of duplicates
+
+    Returns:
+        list: (path, closest indexed name or None, distance or None) tuples
+    """
+    image_dir = os.path.realpath(index.image_dir)
+    own = {os.path.basename(path) for path in map(os.path.realpath, paths) if os.path.dirname(path) == image_dir}
+    table = index.lookup(max_distance, exclude=own)
+    checked = []
+    for path, value in zip(paths, _hash_chunk(paths)):
+        matches = table.query(value) if value is not None else []
+        checked.append((path, *matches[0][::-1]) if matches else (path, None, None))
+    return checked
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', required=True, help='Folder of captured images')
+    parser.add_argument('--distance', type=int, default=DEFAULT_DISTANCE,
+                        help='Maximum Hamming distance (out of 64 bits) of near-duplicates')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to hash images (defaults to the CPU count)')
+    parser.add_argument('--remove', action='store_true',
+                        help='Delete the near-duplicates and their label files')
+    parser.add_argument('--check', nargs='+', metavar='IMAGE', default=None,
+                        help='Only report whether these new images duplicate an indexed image')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.isdir(args.images):
+        print(f'Directory \"{args.images}\" not found. Verify the path is correct and try again.')
+        sys.exit(1)
+    index = HashIndex(args.images)
+    hashed = index.update(args.workers)
+    print(f'Hashed {hashed} new images, {len(index.entries)} images indexed.')
+
+    if args.check:
+        for path, name, distance in check_images(index, args.check, args.distance):
+            print(f'{path}: duplicate of {name} (distance {distance})' if name else f'{path}: new')
+        return
+
+    duplicates = find_duplicates(index, args.distance)
+    for name, original, distance in duplicates:
+        print(f'{name}: duplicate of {original} (distance {distance})')
+    print(f'{len(duplicates)} near-duplicates of {len(index.entries)} images.')
+    if args.remove and duplicates:
+        remove_duplicates(index, duplicates)
+        print(f'Removed {len(duplicates)} images and their labels.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,449 @@
+# Evaluate a detector on a dataset split, reusing cached predictions of unchanged images
+
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+import numpy as np
+from dataset_stats import build_index
+from yolo_labels import label_path_for
+
+GAME_DIR = Path(__file__).parent / 'rps-game'
+sys.path.insert(0, str(GAME_DIR))
+from config import CLASS_NAMES, MODEL_PATH
+
+STORE_VERSION = 1
+IMAGE_EXTENSIONS = {'.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp'}
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)  # mAP50-95 thresholds, the first one gives mAP50
+PREDICT_CONF = 0.001  # Cached predictions keep low confidence boxes, needed for the full precision-recall curve
+EPSILON = 1e-9
+
+
+def file_digest(path):
+    """Content hash of a file."""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+def settings_key(weights_digest, imgsz, iou, max_det):
+    """Store key of the predictions of one model with one set of inference settings."""
+    return f'{weights_digest}:imgsz={imgsz}:conf={PREDICT_CONF}:iou={iou}:max_det={max_det}'
+
+
+class PredictionStore:
+    """
+    Raw predictions keyed by (model and inference settings, image content hash).
+
+    Image hashes are cached by path with the file's modification time and
+    size, so unchanged images are not read again. Predictions are kept per
+    content hash, so renamed, moved or copied images are not inferred again
+    either.
+    """
+
+    def __init__(self, path):
+        """
+        Load a store, or start an empty one if it is missing or from another version.
+
+        Args:
+            path: Store file
+        """
+        self.path = path
+        self.hashes = {}  # absolute image path -> (mtime_ns, size, digest)
+        self.predictions = {}  # settings key -> {image digest -> (N, 6) float32 array}
+        try:
+            with open(path, 'rb') as f:
+                store = pickle.load(f)
+            if isinstance(store, dict) and store.get('version') == STORE_VERSION:
+                self.hashes = store['hashes']
+                self.predictions = store['predictions']
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+    def __str__(self):
+        return f"PredictionStore(path={self.path}, images={len(self.hashes)}, models={len(self.predictions)})"
+    def __repr__(self):
+        return self.__str__()
+
+    def digests(self, paths):
+        """
+        Content hashes of images, hashing only new or changed files.
+
+        Args:
+            paths: Image files
+
+        Returns:
+            tuple: (list of digests, number of files hashed)
+        """
+        digests = []
+        hashed = 0
+        for path in paths:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            entry = self.hashes.get(path)
+            if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+                entry = (stat.st_mtime_ns, stat.st_size, file_digest(path))
+                self.hashes[path] = entry
+                hashed += 1
+            digests.append(entry[2])
+        return digests, hashed
+
+    def get(self, key, digest):
+        """Cached predictions of an image, or None."""
+        return self.predictions.get(key, {}).get(digest)
+
+    def put(self, key, digest, predictions):
+        """Cache the predictions of an image."""
+        self.predictions.setdefault(key, {})[digest] = predictions
+
+    def save(self):
+        """Atomically write the store."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': STORE_VERSION, 'hashes': self.hashes, 'predictions': self.predictions}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+
+def result_predictions(result):
+    """
+    Convert a YOLO (or recorded) result to a prediction array.
+
+    Args:
+        result: Result with boxes and orig_shape
+
+    Returns:
+        np.ndarray: (N, 6) float32 rows of x1, y1, x2, y2 (normalized), conf, class
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((0, 6), np.float32)
+    img_h, img_w = result.orig_shape[:2]
+    predictions = np.empty((len(boxes), 6), np.float32)
+    predictions[:, :4] = boxes.xyxy.cpu().numpy() / np.array([img_w, img_h, img_w, img_h], np.float32)
+    predictions[:, 4] = boxes.conf.cpu().numpy()
+    predictions[:, 5] = boxes.cls.cpu().numpy()
+    return predictions
+
+
+def infer_missing(model, store, key, paths, digests, batch=16, imgsz=640, iou=0.7, max_det=300, device=None):
+    """
+    Run the detector on the images without cached predictions.
+
+    Args:
+        model: YOLO model (anything with a compatible predict method)
+        store: PredictionStore
+        key: Settings key of the model
+        paths: Image files
+        digests: Content hashes of the images
+        batch: Images per inference batch
+        imgsz: Inference size
+        iou: NMS IoU threshold
+        max_det: Maximum boxes per image
+        device: Optional inference device, e.g. 'cpu' or '0'
+
+    Returns:
+        int: Number of images inferred
+    """
+    pending = {}
+    for path, digest in zip(paths, digests):
+        if store.get(key, digest) is None:
+            pending.setdefault(digest, path)  # Copies of an image are inferred once
+    pending = list(pending.items())
+
+    kwargs = {'imgsz': imgsz, 'conf': PREDICT_CONF, 'iou': iou, 'max_det': max_det, 'verbose': False}
+    if device is not None:
+        kwargs['device'] = device
+    for start in range(0, len(pending), batch):
+        chunk = pending[start:start + batch]
+        results = model.predict([path for _, path in chunk], **kwargs)
+        for (digest, _), result in zip(chunk, results):
+            store.put(key, digest, result_predictions(result))
+        store.save()  # An interrupted run keeps the finished batches
+        print(f'Inferred {start + len(chunk)}/{len(pending)} images', end='\r')
+    if pending:
+        print()
+    return len(pending)
+
+
+def load_labels(paths, label_dir=None):
+    """
+    Read the ground truth of images through the cached label index.
+
+    Args:
+        paths: Image files
+        label_dir: Label folder (defaults to the labels folder next to the images folder)
+
+    Returns:
+        list: (M, 5) float32 arrays of class, x1, y1, x2, y2 (normalized) per image
+    """
+    label_paths = [os.path.normpath(label_path_for(path) if label_dir is None
+                                    else os.path.join(label_dir, Path(path).stem + '.txt')) for path in paths]
+    entries = {}
+    for directory in sorted({os.path.dirname(path) for path in label_paths}):
+        if os.path.isdir(directory):
+            index, _ = build_index(directory)
+            entries.update({os.path.join(directory, rel_path): entry for rel_path, entry in index.items()})
+
+    labels = []
+    for path in label_paths:
+        entry = entries.get(path)
+        boxes = np.array(entry[2], np.float32).reshape(-1, 5) if entry else np.zeros((0, 5), np.float32)
+        xyxy = np.empty_like(boxes)
+        xyxy[:, 0] = boxes[:, 0]
+        xyxy[:, 1:3] = boxes[:, 1:3] - boxes[:, 3:5] / 2
+        xyxy[:, 3:5] = boxes[:, 1:3] + boxes[:, 3:5] / 2
+        labels.append(xyxy)
+    return labels
+
+
+def box_iou(a, b):
+    """
+    Pairwise IoU of two sets of xyxy boxes.
+
+    Args:
+        a: (M, 4) boxes
+        b: (N, 4) boxes
+
+    Returns:
+        np.ndarray: (M, N) IoU
+    """
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + EPSILON)
+
+
+def greedy_matches(iou, threshold):
+    """
+    One-to-one matches of labels and predictions, highest IoU first.
+
+    Args:
+        iou: (M, N) IoU of labels and predictions, 0 where they may not match
+        threshold: Minimum IoU of a match
+
+    Returns:
+        tuple: (label indices, prediction indices) arrays
+    """
+    labels, predictions = np.nonzero(iou >= threshold)
+    if len(labels) == 0:
+        return labels, predictions
+    order = np.argsort(-iou[labels, predictions], kind='stable')
+    labels, predictions = labels[order], predictions[order]
+    _, first = np.unique(predictions, return_index=True)
+    first = np.sort(first)
+    labels, predictions = labels[first], predictions[first]
+    _, first = np.unique(labels, return_index=True)
+    return labels[first], predictions[first]
+
+
+def match_predictions(predictions, labels, thresholds=IOU_THRESHOLDS):
+    """
+    Mark the true positives of an image's predictions at each IoU threshold.
+
+    Args:
+        predictions: (N, 6) prediction array
+        labels: (M, 5) label array
+        thresholds: IoU thresholds
+
+    Returns:
+        np.ndarray: (N, T) bool
+    """
+    correct = np.zeros((len(predictions), len(thresholds)), bool)
+    if len(predictions) == 0 or len(labels) == 0:
+        return correct
+    iou = box_iou(labels[:, 1:], predictions[:, :4])
+    iou *= labels[:, 0:1] == predictions[None, :, 5]
+    for i, threshold in enumerate(thresholds):
+        correct[greedy_matches(iou, threshold)[1], i] = True
+    return correct
+
+
+def average_precision(recall, precision):
+    """COCO 101-point interpolated area under a precision-recall curve."""
+    precision = np.flip(np.maximum.accumulate(np.flip(precision)))
+    indices = np.searchsorted(recall, np.linspace(0, 1, 101), side='left')
+    reached = indices < len(recall)  # Recall points beyond the last detection have no precision
+    return float(np.sum(precision[indices[reached]]) / 101)
+
+
+def confusion_matrix(predictions, labels, num_classes, conf=0.25, iou=0.5):
+    """
+    Confusion matrix of one image, the last row and column being the background.
+
+    Args:
+        predictions: (N, 6) prediction array
+        labels: (M, 5) label array
+        num_classes: Number of classes
+        conf: Minimum confidence of a prediction
+        iou: Minimum IoU of a match, whatever the classes
+
+    Returns:
+        np.ndarray: (C + 1, C + 1) counts, rows are true classes and columns predicted ones
+    """
+    matrix = np.zeros((num_classes + 1, num_classes + 1), np.int64)
+    predictions = predictions[predictions[:, 4] >= conf]
+    true_cls = labels[:, 0].astype(int)
+    pred_cls = predictions[:, 5].astype(int)
+    if len(predictions) and len(labels):
+        matched_labels, matched_predictions = greedy_matches(box_iou(labels[:, 1:], predictions[:, :4]), iou)
+    else:
+        matched_labels = matched_predictions = np.zeros(0, int)
+    np.add.at(matrix, (true_cls[matched_labels], pred_cls[matched_predictions]), 1)
+    np.add.at(matrix, (np.delete(true_cls, matched_labels), num_classes), 1)
+    np.add.at(matrix, (num_classes, np.delete(pred_cls, matched_predictions)), 1)
+    return matrix
+
+
+def evaluate(predictions, labels, num_classes=len(CLASS_NAMES), conf=0.25):
+    """
+    Compute per-class detection metrics.
+
+    Args:
+        predictions: (N, 6) prediction array per image
+        labels: (M, 5) label array per image
+        num_classes: Number of classes
+        conf: Confidence threshold of the precision, recall and confusion matrix
+
+    Returns:
+        dict: 'classes' with images, instances, precision, recall, map50 and map50_95 per class,
+        'all' with their mean, and 'confusion' (C + 1, C + 1) counts
+    """
+    correct, scores, pred_cls = [], [], []
+    true_positives = np.zeros(num_classes)
+    kept = np.zeros(num_classes)
+    images = np.zeros(num_classes, int)
+    matrix = np.zeros((num_classes + 1, num_classes + 1), np.int64)
+    for image_predictions, image_labels in zip(predictions, labels):
+        correct.append(match_predictions(image_predictions, image_labels))
+        scores.append(image_predictions[:, 4])
+        pred_cls.append(image_predictions[:, 5].astype(int))
+        above = image_predictions[image_predictions[:, 4] >= conf]
+        hits = match_predictions(above, image_labels, IOU_THRESHOLDS[:1])[:, 0]
+        np.add.at(true_positives, above[hits, 5].astype(int), 1)
+        np.add.at(kept, above[:, 5].astype(int), 1)
+        images[np.unique(image_labels[:, 0].astype(int))] += 1
+        matrix += confusion_matrix(image_predictions, image_labels, num_classes, conf)
+
+    correct = np.concatenate(correct) if correct else np.zeros((0, len(IOU_THRESHOLDS)), bool)
+    scores = np.concatenate(scores) if scores else np.zeros(0)
+    pred_cls = np.concatenate(pred_cls) if pred_cls else np.zeros(0, int)
+    true_cls = np.concatenate([image_labels[:, 0] for image_labels in labels]).astype(int) if labels else np.zeros(0, int)
+    order = np.argsort(-scores, kind='stable')
+    correct, pred_cls = correct[order], pred_cls[order]
+
+    classes = []
+    for cls in range(num_classes):
+        instances = int((true_cls == cls).sum())
+        hits = correct[pred_cls == cls]
+        ap = np.zeros(len(IOU_THRESHOLDS))
+        if instances and len(hits):
+            tp = np.cumsum(hits, axis=0)
+            fp = np.cumsum(~hits, axis=0)
+            for i in range(len(IOU_THRESHOLDS)):
+                ap[i] = average_precision(tp[:, i] / instances, tp[:, i] / (tp[:, i] + fp[:, i]))
+        classes.append({
+            'name': CLASS_NAMES[cls] if cls < len(CLASS_NAMES) else str(cls),
+            'images': int(images[cls]),
+            'instances': instances,
+            'precision': float(true_positives[cls] / kept[cls]) if kept[cls] else 0.0,
+            'recall': float(true_positives[cls] / instances) if instances else 0.0,
+            'map50': float(ap[0]),
+            'map50_95': float(ap.mean()),
+        })
+
+    present = [row for row in classes if row['instances']]
+    summary = {key: float(np.mean([row[key] for row in present])) if present else 0.0
+               for key in ('precision', 'recall', 'map50', 'map50_95')}
+    summary.update(name='all', images=len(labels), instances=len(true_cls))
+    return {'classes': classes, 'all': summary, 'confusion': matrix}
+
+
+def print_report(metrics, class_names=CLASS_NAMES):
+    """
+    Print the metrics table and the confusion matrix.
+
+    Args:
+        metrics: Result of evaluate
+        class_names: Names of the class indices
+    """
+    print(f"{'class':<12}{'images':>8}{'instances':>11}{'P':>8}{'R':>8}{'mAP50':>8}{'mAP50-95':>10}")
+    for row in [metrics['all']] + metrics['classes']:
+        print(f"{row['name']:<12}{row['images']:>8}{row['instances']:>11}{row['precision']:>8.3f}"
+              f"{row['recall']:>8.3f}{row['map50']:>8.3f}{row['map50_95']:>10.3f}")
+
+    names = list(class_names) + ['background']
+    width = max(len(name) for name in names) + 2
+    print('\nConfusion matrix (rows: true, columns: predicted)')
+    print(' ' * width + ''.join(f'{name:>{width}}' for name in names))
+    for name, counts in zip(names, metrics['confusion']):
+        print(f'{name:<{width}}' + ''.join(f'{count:>{width}}' for count in counts))
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', required=True, help='Folder of the split images, e.g. data/split/val/images')
+    parser.add_argument('--labels', default=None,
+                        help='Label folder (defaults to the labels folder next to an images folder)')
+    parser.add_argument('--model', default=str(GAME_DIR / MODEL_PATH), help='Detector weights')
+    parser.add_argument('--cache', default='runs/eval_cache.pkl',
+                        help='Prediction store, shared between models and splits')
+    parser.add_argument('--batch', type=int, default=16, help='Images per inference batch')
+    parser.add_argument('--imgsz', type=int, default=640, help='Inference size')
+    parser.add_argument('--iou', type=float, default=0.7, help='NMS IoU threshold')
+    parser.add_argument('--max-det', type=int, default=300, help='Maximum boxes per image')
+    parser.add_argument('--device', default=None, help="Inference device, e.g. 'cpu' or '0'")
+    parser.add_argument('--conf', type=float, default=0.25,
+                        help='Confidence threshold of the precision, recall and confusion matrix')
+    parser.add_argument('--json', default=None, help='Also write the metrics to this JSON file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.isdir(args.images):
+        print(f'Directory \"{args.images}\" not found. Verify the path is correct and try again.')
+        sys.exit(1)
+    start = time.perf_counter()
+    paths = sorted(str(path) for path in Path(args.images).iterdir() if path.suffix.lower() in IMAGE_EXTENSIONS)
+    store = PredictionStore(args.cache)
+    digests, hashed = store.digests(paths)
+    key = settings_key(file_digest(args.model), args.imgsz, args.iou, args.max_det)
+
+    missing = sum(store.get(key, digest) is None for digest in set(digests))
+    print(f'{len(paths)} images ({hashed} hashed), {missing} without cached predictions.')
+    if missing:
+        from ultralytics import YOLO
+        infer_missing(YOLO(args.model), store, key, paths, digests, args.batch, args.imgsz, args.iou,
+                      args.max_det, args.device)
+    elif hashed:
+        store.save()
+
+    metrics = evaluate([store.get(key, digest) for digest in digests], load_labels(paths, args.labels),
+                       conf=args.conf)
+    print_report(metrics)
+    print(f'\nEvaluated in {time.perf_counter() - start:.1f} s.')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({**metrics, 'confusion': metrics['confusion'].tolist()}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,458 @@
+# Build a dataset from recorded videos, keeping the frames that show something new
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from async_image_writer import AsyncImageWriter, encode_params
+from auto_label import result_labels
+from yolo_labels import label_path_for
+
+VIDEO_EXTENSIONS = {'.avi', '.m4v', '.mkv', '.mov', '.mp4', '.webm'}
+THUMB_SIZE = (64, 36)  # Frames are compared as small grayscale thumbnails
+PIXEL_CHANGE = 20  # Gray level difference from which a thumbnail pixel has changed
+
+_worker_model = None  # YOLO model of a worker process, when labelling
+
+
+class FrameSampler:
+    """
+    Choose frames by change instead of a fixed interval.
+
+    Frames are compared as blurred grayscale thumbnails by the fraction of
+    their pixels that changed, so a hand covering a small part of the frame
+    still counts. A frame is kept when it differs enough from the last kept
+    frame (novelty), while the scene is still enough not to be blurred
+    (motion from the previous analysed frame), and not sooner than min_gap
+    after the last kept frame. Long static scenes give one frame, a hand
+    changing sign gives one frame per settled pose.
+    """
+
+    def __init__(self, novelty=0.02, max_motion=0.01, min_gap=0.5):
+        """
+        Initialize the sampler.
+
+        Args:
+            novelty: Minimum fraction of pixels changed since the last kept frame
+            max_motion: Maximum fraction of pixels changed since the previous analysed frame
+            min_gap: Minimum time between kept frames, in seconds
+        """
+        self.novelty = novelty
+        self.max_motion = max_motion
+        self.min_gap = min_gap
+        self._previous = None
+        self._kept = None
+        self._kept_time = float('-inf')
+
+    def __str__(self):
+        return f"FrameSampler(novelty={self.novelty}, max_motion={self.max_motion}, min_gap={self.min_gap})"
+    def __repr__(self):
+        return self.__str__()
+
+    @staticmethod
+    def changed(a, b):
+        """Fraction of the pixels that differ between two thumbnails."""
+        return np.count_nonzero(np.abs(a - b) >= PIXEL_CHANGE) / a.size
+
+    @staticmethod
+    def thumbnail(frame):
+        """Blurred grayscale thumbnail of a BGR frame, as int16 for differences."""
+        small = cv2.resize(frame, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (3, 3), 0).astype(np.int16)
+
+    def seed(self, frame):
+        """
+        Start from a frame decoded before the first analysed one, without keeping it.
+
+        A video segment is seeded with the frame analysed just before it, so the
+        motion of its first frame is measured as in the whole video. The last
+        kept frame and its time are not known to the segment: the seed frame
+        stands in for it, and extract_videos corrects the frames this guess
+        kept or missed.
+
+        Args:
+            frame: BGR frame
+        """
+        self._previous = self._kept = self.thumbnail(frame)
+
+    def update(self, frame, timestamp):
+        """
+        Analyse the next frame.
+
+        Args:
+            frame: BGR frame
+            timestamp: Time of the frame in the video, in seconds
+
+        Returns:
+            bool: True if the frame should be kept
+        """
+        return self.update_thumbnail(self.thumbnail(frame), timestamp)
+
+    def update_thumbnail(self, thumb, timestamp):
+        """
+        Analyse the thumbnail of the next frame.
+
+        Args:
+            thumb: Thumbnail from FrameSampler.thumbnail
+            timestamp: Time of the frame in the video, in seconds
+
+        Returns:
+            bool: True if the frame should be kept
+        """
+        previous, self._previous = self._previous, thumb
+        if self._kept is None:
+            keep = True
+        else:
+            motion = self.changed(thumb, previous) if previous is not None else 0.0
+            keep = (timestamp - self._kept_time >= self.min_gap and motion <= self.max_motion
+                    and self.changed(thumb, self._kept) >= self.novelty)
+        if keep:
+            self._kept = thumb
+            self._kept_time = timestamp
+        return keep
+
+
+def find_videos(paths):
+    """
+    Expand files and folders into the list of videos.
+
+    Args:
+        paths: Video files or folders of videos
+
+    Returns:
+        list: Video paths, sorted
+    """
+    videos = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            videos.extend(p for p in path.rglob('*') if p.suffix.lower() in VIDEO_EXTENSIONS)
+        else:
+            videos.append(path)
+    return sorted(map(str, videos))
+
+
+def video_segments(video, segment_seconds):
+    """
+    Cut a video into frame ranges decoded by separate workers.
+
+    Args:
+        video: Video file
+        segment_seconds: Length of a segment
+
+    Returns:
+        list: (video, start frame, stop frame, fps) tuples
+    """
+    capture = cv2.VideoCapture(video)
+    if not capture.isOpened():
+        return []
+    frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    capture.release()
+    length = max(1, int(segment_seconds * fps))
+    return [(video, start, min(start + length, frames), fps) for start in range(0, frames, length)]
+
+
+def _init_worker(model_path, threads):
+    """Process pool initializer: limit the threads of each worker and load the model once."""
+    global _worker_model
+    cv2.setNumThreads(threads)
+    if model_path:
+        import torch
+        torch.set_num_threads(threads)
+        from ultralytics import YOLO
+        _worker_model = YOLO(model_path)
+
+
+def frame_path(image_dir, video, index, extension):
+    """Image path of a frame of a video, named after the video and the frame index."""
+    return os.path.join(image_dir, f"{Path(video).stem}_{index:07d}.{extension}")
+
+
+def _write_kept(writer, kept, conf, imgsz):
+    """Queue kept (path, frame) pairs, with their labels when a model is loaded."""
+    results = [None] * len(kept)
+    if _worker_model is not None:
+        results = _worker_model.predict([frame for _, frame in kept], imgsz=imgsz, conf=conf, verbose=False)
+    for (path, frame), result in zip(kept, results):
+        if result is None:
+            writer.submit(path, frame)
+        else:
+            writer.submit(path, frame, label_path_for(path), result_labels(result, conf)[0])
+
+
+def extract_segment(video, start, stop, fps, image_dir, options):
+    """
+    Decode a frame range of a video and write the frames chosen by a FrameSampler.
+
+    Only every `step`-th frame of the video is analysed, the frames in between
+    are grabbed without being converted. The sampler is seeded with the last
+    analysed frame before `start`, see FrameSampler.seed: the frames kept near
+    the start of a segment are a guess, checked by extract_videos against the
+    returned thumbnails.
+
+    Segments other than the first are reached with CAP_PROP_POS_FRAMES. The
+    FFmpeg backend seeks to the keyframe before the frame and decodes forward,
+    but it finds the frame from its timestamp: with variable frame rate or
+    badly timestamped mp4/h264 files the segment may start a few frames off.
+    Re-encode such files at a constant frame rate, or use one segment per
+    video (a --segment longer than the videos).
+
+    Args:
+        video: Video file
+        start: First frame
+        stop: Frame after the last one
+        fps: Frames per second of the video
+        image_dir: Output folder of the images
+        options: Dict of sampler (novelty, max_motion, min_gap), step, extension,
+            compression, writer_threads, batch, conf and imgsz
+
+    Returns:
+        tuple: (number of frames decoded, list of written image paths,
+            list of (frame index, thumbnail, kept) of the analysed frames)
+    """
+    step = options['step']
+    sampler = FrameSampler(options['novelty'], options['max_motion'], options['min_gap'])
+    capture = cv2.VideoCapture(video)
+    index = start
+    if start > 0:
+        # Seed the sampler with the last frame the previous segment analysed
+        index = (start - 1) // step * step
+        capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ok, frame = capture.read()
+        if ok:
+            sampler.seed(frame)
+        index += 1
+    writer = AsyncImageWriter(options['writer_threads'], params=encode_params(options['extension'],
+                                                                              options['compression']))
+    written = []
+    kept = []
+    analysed = []
+    try:
+        while index < stop:
+            if index % step:
+                if not capture.grab():
+                    break
+                index += 1
+                continue
+            ok, frame = capture.read()
+            if not ok:
+                break
+            thumb = sampler.thumbnail(frame)
+            keep = sampler.update_thumbnail(thumb, index / fps)
+            analysed.append((index, thumb, keep))
+            if keep:
+                path = frame_path(image_dir, video, index, options['extension'])
+                kept.append((path, frame))
+                written.append(path)
+                if len(kept) >= options['batch']:
+                    _write_kept(writer, kept, options['conf'], options['imgsz'])
+                    kept = []
+            index += 1
+        if kept:
+            _write_kept(writer, kept, options['conf'], options['imgsz'])
+    finally:
+        writer.close()
+        capture.release()
+    return max(0, index - start), written, analysed
+
+
+def extract_frames_at(video, indices, image_dir, options):
+    """
+    Decode a video up to the given frames and write them.
+
+    Used for the frames a segment missed because of its guessed sampler state.
+
+    Args:
+        video: Video file
+        indices: Frame indices to write
+        image_dir: Output folder of the images
+        options: Dict of extension, compression, writer_threads, batch, conf and imgsz
+
+    Returns:
+        tuple: (number of frames decoded, list of written image paths)
+    """
+    wanted = sorted(indices)
+    capture = cv2.VideoCapture(video)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, wanted[0])
+    writer = AsyncImageWriter(options['writer_threads'], params=encode_params(options['extension'],
+                                                                              options['compression']))
+    written = []
+    kept = []
+    index = wanted[0]
+    try:
+        for target in wanted:
+            while index < target and capture.grab():
+                index += 1
+            if index < target:
+                break
+            ok, frame = capture.read()
+            if not ok:
+                break
+            path = frame_path(image_dir, video, index, options['extension'])
+            kept.append((path, frame))
+            written.append(path)
+            index += 1
+        if kept:
+            _write_kept(writer, kept, options['conf'], options['imgsz'])
+    finally:
+        writer.close()
+        capture.release()
+    return index - wanted[0], written
+
+
+def verify_segment(sampler, analysed, fps):
+    """
+    Replay the analysed frames of a segment through the sampler of the whole video.
+
+    Args:
+        sampler: FrameSampler that analysed the previous segments of the video, in order
+        analysed: (frame index, thumbnail, kept) tuples returned by extract_segment
+        fps: Frames per second of the video
+
+    Returns:
+        tuple: (frame indices the segment kept wrongly, frame indices it missed)
+    """
+    extra = []
+    missing = []
+    for index, thumb, kept in analysed:
+        keep = sampler.update_thumbnail(thumb, index / fps)
+        if kept and not keep:
+            extra.append(index)
+        elif keep and not kept:
+            missing.append(index)
+    return extra, missing
+
+
+def extract_videos(executor, segments, image_dir, options, analyse_fps):
+    """
+    Extract the frames of video segments in parallel, keeping the frames of an unsplit run.
+
+    Each segment is decoded by a worker that guesses the sampler state at its
+    start. The thumbnails of the analysed frames are cheap to replay, so each
+    video is then run in order through one FrameSampler: images the guess
+    kept wrongly are deleted, and the frames it missed are decoded again.
+    Static scenes need no correction, a drifting scene usually a few frames
+    at the start of each segment.
+
+    Args:
+        executor: Executor running the workers
+        segments: (video, start frame, stop frame, fps) tuples from video_segments
+        image_dir: Output folder of the images
+        options: Dict of sampler (novelty, max_motion, min_gap), extension,
+            compression, writer_threads, batch, conf and imgsz
+        analyse_fps: Frames analysed per second of video
+
+    Returns:
+        tuple: (number of frames decoded, sorted list of written image paths)
+    """
+    futures = {}
+    for video, start, stop, fps in segments:
+        segment_options = dict(options, step=max(1, round(fps / analyse_fps)))
+        future = executor.submit(extract_segment, video, start, stop, fps, image_dir, segment_options)
+        futures[future] = (video, start, stop, fps)
+
+    samplers = {}
+    next_start = {}
+    for video, start, _, _ in segments:
+        samplers[video] = FrameSampler(options['novelty'], options['max_motion'], options['min_gap'])
+        next_start[video] = min(start, next_start.get(video, start))
+    finished = {}  # (video, start) -> (stop, fps, analysed) of segments waiting for the previous ones
+    decoded = done = 0
+    written = set()
+    while futures:
+        completed, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in completed:
+            segment = futures.pop(future)
+            result = future.result()
+            decoded += result[0]
+            written.update(result[1])
+            if segment is None:
+                continue
+            video, start, stop, fps = segment
+            finished[video, start] = (stop, fps, result[2])
+            done += 1
+            print(f'Segment {done}/{len(segments)}: {decoded} frames decoded, {len(written)} kept', end='\r')
+
+            # Replay the segments of the video that are complete up to this one
+            while (video, next_start[video]) in finished:
+                stop, fps, analysed = finished.pop((video, next_start[video]))
+                extra, missing = verify_segment(samplers[video], analysed, fps)
+                for index in extra:
+                    path = frame_path(image_dir, video, index, options['extension'])
+                    for file_path in (path, label_path_for(path)):
+                        if os.path.exists(file_path):
+                            os.remove(file_path)
+                    written.discard(path)
+                if missing:
+                    futures[executor.submit(extract_frames_at, video, missing, image_dir, options)] = None
+                next_start[video] = stop
+    return decoded, sorted(written)
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('videos', nargs='+', help='Video files or folders of videos')
+    parser.add_argument('--out', default='extracted', help='Output folder, images go to OUT/images')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes decoding video segments in parallel')
+    parser.add_argument('--segment', type=float, default=60.0, help='Seconds of video per worker task')
+    parser.add_argument('--analyse-fps', type=float, default=10.0,
+                        help='Frames analysed per second of video, the others are skipped')
+    parser.add_argument('--novelty', type=float, default=0.02,
+                        help='Minimum fraction of pixels changed since the last kept frame')
+    parser.add_argument('--max-motion', type=float, default=0.01,
+                        help='Maximum fraction of pixels changed since the previous analysed frame, to skip blurred frames')
+    parser.add_argument('--min-gap', type=float, default=0.5, help='Minimum seconds between kept frames')
+    parser.add_argument('--ext', default='jpg', help='Image format of the written frames')
+    parser.add_argument('--compression', type=int, default=None,
+                        help='PNG compression level or JPEG/WebP quality (defaults to OpenCV\'s)')
+    parser.add_argument('--writer-threads', type=int, default=2, help='Image writer threads of each worker')
+    parser.add_argument('--label-model', default=None,
+                        help='Detector weights, writes a YOLO label of each frame to OUT/labels')
+    parser.add_argument('--conf', type=float, default=0.25, help='Minimum confidence of a labelled box')
+    parser.add_argument('--imgsz', type=int, default=640, help='Inference size of the labelling model')
+    parser.add_argument('--batch', type=int, default=8, help='Kept frames per labelling batch')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    videos = find_videos(args.videos)
+    segments = [segment for video in videos for segment in video_segments(video, args.segment)]
+    if not segments:
+        print('No readable video found. Verify the paths are correct and try again.')
+        sys.exit(1)
+    image_dir = os.path.join(args.out, 'images')
+    os.makedirs(image_dir, exist_ok=True)
+
+    options = {'novelty': args.novelty, 'max_motion': args.max_motion, 'min_gap': args.min_gap,
+               'extension': args.ext.lstrip('.'), 'compression': args.compression,
+               'writer_threads': args.writer_threads, 'batch': args.batch, 'conf': args.conf, 'imgsz': args.imgsz}
+    duration = sum((stop - start) / fps for _, start, stop, fps in segments)
+    print(f'{len(videos)} videos, {duration / 60:.1f} min of footage in {len(segments)} segments.')
+
+    threads = max(1, (os.cpu_count() or 1) // max(1, args.workers))
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                             initargs=(args.label_model, threads)) as executor:
+        decoded, written = extract_videos(executor, segments, image_dir, options, args.analyse_fps)
+    elapsed = time.perf_counter() - start_time
+    print(f'\nKept {len(written)} of {decoded} frames in {elapsed:.1f} s ({duration / elapsed:.0f}x real time).')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import sys
 import cv2
 import numpy as np
 from datetime import datetime, timedelta
@@ -6,6 +7,14 @@ from keras.preprocessing import image
 from tensorflow.keras.models import load_model
 import logging
 import uuid
+from pathlib import Path
+from async_image_writer import AsyncImageWriter, encode_params
+from roi_threshold import ThresholdSegmenter, load_prediction_icon
+from yolo_labels import box_to_yolo, format_label_line, label_path_for
+
+# Label classes of the game, so captures can be used to train the game's model
+sys.path.insert(0, str(Path(__file__).parent / 'rps-game'))
+from config import CLASS_NAMES, ROCK
 
 # Logger -------------------------------------------------------------------------------------------
 logger = logging.getLogger(__name__)
@@ -29,12 +38,16 @@ roi_clr_selection = (0, 200, 0)
 roi_clr_background = (200, 200, 200)
 roi_clr_label = (255, 255, 255)
 # CAPTURE SETTINGS ---------------------------------------------------------------------------------
-img_folder = "captured"  # image saved as "{img_folder}/{img_prefix}{img_next_id}.{img_extension}"
+img_folder = "captured/images"  # image saved as "{img_folder}/{img_prefix}_{uuid}.{img_extension}"
 img_prefix = "image_"
 img_next_id = 0  # Starting id for image naming. If existing, the next highest id will be assigned
-img_extension = "png"
+img_extension = "png"  # png, jpg or webp
+img_compression = None  # PNG compression level (0-9) or JPEG/WebP quality (0-100), None for the fast default
+writer_threads = 4  # threads encoding and writing captures in the background
+writer_queue_size = 64  # captures waiting to be written before the capture loop waits
+label_class_id = CLASS_NAMES.index(ROCK)  # class written to the YOLO label of each capture, 'n' selects the next
 frames_batch = 200  # how many frames to capture in once session
-capture_delay = 250  # time in milliseconds to wait between captures
+capture_delay = 250  # time in milliseconds to wait between captures (0 = every camera frame)
 roi_clr_capturing = (0, 0, 255)
 roi_clr_saving = (255, 255, 255)
 # PREDICTION SETTINGS ------------------------------------------------------------------------------
@@ -60,7 +73,7 @@ show_help = False
 help_font = cv2.FONT_HERSHEY_SIMPLEX
 help_scale = 0.5
 help_thickness = 1
-help_x, help_y, help_w, help_h = 0, 0, 300, 270  # top left corner
+help_x, help_y, help_w, help_h = 0, 0, 300, 290  # top left corner
 # DEBUG SETTINGS -----------------------------------------------------------------------------------
 show_debug = False
 fps_count = 0
@@ -110,8 +123,18 @@ start_x, start_y = 0, 0
 square_color = roi_clr_default
 # Capture init settings ----------------------------------------------------------------------------
 is_capturing = False
+image_writer = AsyncImageWriter(writer_threads, writer_queue_size, encode_params(img_extension, img_compression))
+# Threshold init settings --------------------------------------------------------------------------
+segmenter = ThresholdSegmenter(roi_clr_background)  # reuses its buffers every frame
+roi_resized = np.empty((model_input_size[1], model_input_size[0], 3), np.uint8)
 # Prediction init settings -------------------------------------------------------------------------
 is_predicting = False
+# Model input buffers, filled in place every predicted frame
+roi_rgb = np.empty_like(roi_resized)
+model_batch = np.empty((1, model_input_size[1], model_input_size[0], 3), np.float32)
+# Icons blended on the prediction color once, instead of reading and blending them every frame
+prediction_icons = {path: load_prediction_icon(path, roi_clr_prediction, prediction_img_size)
+                    for path in class_img.values()}
 roi_background = None
 classify_image = False
 predicted_class_label = None
@@ -171,16 +194,16 @@ def capture_mode(log_str):
             # Save the ROI image
             uuid_str = str(uuid.uuid1())
             filepath = os.path.join(img_folder, f"{img_prefix}_{uuid_str}.{img_extension}")
+            # Copy, the frame is still drawn on while the writer threads encode it
             if use_threshold and display_threshold:
-                cv2.imwrite(filepath, threshold_roi)
+                capture = threshold_roi.copy()
+                box = box_to_yolo(0, 0, roi_w, roi_h, roi_w, roi_h)
             else:
-                cv2.imwrite(filepath, frame)
-                pass
-
-            capture_window_location = str(roi_x) + "; " + str(roi_y) + "; " + str(roi_x + roi_w) + "; " + str(roi_y+roi_h)
-            logger.debug(f"writing with use_threshold , {capture_window_location}")
-           # with open(filepath+".txt", "w") as f:
-           #     f.write(capture_window_location)
+                capture = frame.copy()
+                box = box_to_yolo(roi_x, roi_y, roi_w, roi_h, frame.shape[1], frame.shape[0])
+            label_line = format_label_line(label_class_id, box)
+            image_writer.submit(filepath, capture, label_path_for(filepath), [label_line])
+            logger.debug(f"queued {filepath} with label {label_line}")
 
             image_counter += 1
             capture_time_counter = datetime.now()
@@ -192,21 +215,21 @@ def capture_mode(log_str):
         is_capturing = False
         image_counter = 0
     roi_label = f'Capturing frame {image_counter} / {frames_batch}'
-    log_str += f" | Batch: {frames_batch} frames - Delay: {capture_delay} ms"
+    log_str += (f" | Batch: {frames_batch} frames - Delay: {capture_delay} ms"
+                f" - Writing: {image_writer.pending}")
     return log_str
 
 
 def prediction_mode(log_str):
-    global square_color, roi_resized, predicted_class_label, roi_label, prediction_img
+    global square_color, predicted_class_label, roi_label, prediction_img
     square_color = roi_clr_prediction
-    # Convert and resize ROI as used by the keras model
+    # Convert and resize ROI as used by the keras model, into the preallocated buffers
     roi_predicted = threshold_roi if use_threshold else roi
-    roi_resized = cv2.resize(roi_predicted, model_input_size, interpolation=cv2.INTER_AREA)
-    roi_rgb = cv2.cvtColor(roi_resized, cv2.COLOR_BGR2RGB)
-    roi_normalized = roi_rgb / 255.0
-    roi_expanded = np.expand_dims(roi_normalized, axis=0)
+    cv2.resize(roi_predicted, model_input_size, dst=roi_resized, interpolation=cv2.INTER_AREA)
+    cv2.cvtColor(roi_resized, cv2.COLOR_BGR2RGB, dst=roi_rgb)
+    np.multiply(roi_rgb, 1 / 255.0, out=model_batch[0], dtype=np.float32)
     # Classify the ROI image
-    prediction_prob = model.predict(roi_expanded, verbose=0)[0]
+    prediction_prob = model.predict(model_batch, verbose=0)[0]
     predicted_class_index = np.argmax(prediction_prob)
     predicted_class_label = class_labels[predicted_class_index]
     predicted_class_prob = prediction_prob[predicted_class_index]
@@ -243,10 +266,10 @@ while True:
     frame = cv2.flip(frame, 1)
     # Get the ROI
     roi = frame[roi_y:roi_y + roi_h, roi_x:roi_x + roi_w]
-    roi_resized = cv2.resize(roi, model_input_size, interpolation=cv2.INTER_AREA)
+    cv2.resize(roi, model_input_size, dst=roi_resized, interpolation=cv2.INTER_AREA)
     roi_label = ''
     prediction_img = None
-    log_str = f"ROI: {roi_x}, {roi_y}, {roi_x + roi_w}, {roi_y + roi_h} {roi_w}/{roi_h} | Mode: {roi_mode}"
+    log_str = f"ROI: {roi_x}, {roi_y}, {roi_x + roi_w}, {roi_y + roi_h} {roi_w}/{roi_h} | Mode: {roi_mode} | Class: {CLASS_NAMES[label_class_id]}"
 
     # Handle Key-Press Events ----------------------------------------------------------------------
     key = cv2.waitKey(1) & 0xFF
@@ -283,6 +306,9 @@ while True:
             use_threshold = not use_threshold
             if use_threshold:
                 roi_background = roi.copy()
+    # select the label class of the next captures ------------------------------------------------
+    elif key == ord('n') and not is_capturing:
+        label_class_id = (label_class_id + 1) % len(CLASS_NAMES)
     # store roi background -------------------------------------------------------------------------
     elif key == ord('b'):
         roi_background = roi.copy()
@@ -309,30 +335,11 @@ while True:
     # Activate Threshold in ROI --------------------------------------------------------------------
     threshold_roi = None
     if use_threshold:
-        # Convert roi and background to grayscale
-        roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        bkg_gray = cv2.cvtColor(roi_background, cv2.COLOR_BGR2GRAY)
-        # Calculate absolute difference
-        diff = cv2.absdiff(roi_gray, bkg_gray)
-        # Apply adaptative thresholding
-        _, mask = cv2.threshold(diff, threshold_amount, 255, cv2.THRESH_BINARY)
-        # Apply Gaussian blur
-        mask = cv2.GaussianBlur(mask, (1, 1), 0)
-        # Perform erosion and dilatation to remove noise and fill holes in hand
-        kernel_size = 2
-        mask = cv2.erode(mask, np.ones((kernel_size, kernel_size), np.uint8), iterations=1)
-        kernel_size = 5
-        mask = cv2.dilate(mask, np.ones((kernel_size, kernel_size), np.uint8), iterations=1)
-        # Convert mask to 3 channels
-        mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
-        # Create new background
-        new_bkg = np.ones_like(roi) * roi_clr_background
-        # Apply mask to copy of roi
-        threshold_roi = roi.copy()
-        threshold_roi[:, :] = np.where(mask > 10, roi, new_bkg)
+        # Difference to the background, thresholded, eroded and dilated into preallocated buffers
+        threshold_roi = segmenter.segment(roi, roi_background, threshold_amount)
         # Display threshold mask over ROI
         if display_threshold:
-            frame[roi_y:roi_y + roi_h, roi_x:roi_x + roi_w] = threshold_roi
+            np.copyto(roi, threshold_roi)  # roi is a view of the frame
         # Add threshold info to log
         log_str += f" | Threshold: On ({'Visible' if display_threshold else 'Hidden'}) - {threshold_amount}"
 
@@ -364,33 +371,16 @@ while True:
         cv2.putText(frame, roi_label, position, log_font, log_scale, roi_clr_label, log_thickness, cv2.LINE_AA)
 
     # Show prediction image if defined -------------------------------------------------------------
-    if is_predicting and prediction_img:
-        # Load prediction image with alpha channel
-        foreground = cv2.imread(prediction_img, cv2.IMREAD_UNCHANGED)
-        alpha_channel = foreground[:, :, 3]
-        rgb_channels = foreground[:, :, :3]
-
-        # Fill background with prediction color
-        background = np.ones_like(rgb_channels, dtype=np.uint8) * roi_clr_prediction
-
-        # Alpha factor
-        alpha_factor = alpha_channel[:, :, np.newaxis].astype(np.float32) / 255.0
-        alpha_factor = np.concatenate((alpha_factor, alpha_factor, alpha_factor), axis=2)
-
-        # Add foreground imager to background
-        base = rgb_channels.astype(np.float32) * alpha_factor
-        white = background.astype(np.float32) * (1 - alpha_factor)
-        final_image = (base + white).astype(np.uint8)
-
-        # Resize and display prediction image
-        final_image = cv2.resize(final_image, prediction_img_size, interpolation=cv2.INTER_AREA)
+    icon = prediction_icons.get(prediction_img) if is_predicting else None
+    if icon is not None:
+        # Display the prediction image, blended and resized at startup
         frame[roi_y + roi_h - prediction_img_size[1]:roi_y + roi_h,
-        roi_x + roi_w - prediction_img_size[0]:roi_x + roi_w] = final_image
+        roi_x + roi_w - prediction_img_size[0]:roi_x + roi_w] = icon
 
     # Show help ------------------------------------------------------------------------------------
     if show_help:
         text = ['LeftMouseButton: Move ROI', 'MouseWheel: Resize ROI', 'RightMouseButton: Reset ROI size',
-                'C: Toggle Capture Mode', 'P: Toggle Prediction Mode', 'T: Toggle Threshold',
+                'C: Toggle Capture Mode', 'N: Next Label Class', 'P: Toggle Prediction Mode', 'T: Toggle Threshold',
                 '+/-: Adjust Threshold Amount', 'B: Update Threshold Background', 'L: Toggle Log',
                 'D: Toggle Debug', 'H: Toggle Help', 'ESC: Exit current mode', 'Q: Quit the program']
 
@@ -432,6 +422,9 @@ if settings_path:
     except Exception as e:
         print(f"Unable to save settings to file: {e}")
 
+# Write the remaining captures ---------------------------------------------------------------------
+image_writer.close()
+
 # Release the webcam and close all windows ---------------------------------------------------------
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
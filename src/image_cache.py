@@ -0,0 +1,453 @@
+# Decode and letterbox training images once into a memory-mapped cache
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import os
+import random
+import time
+import cv2
+import numpy as np
+from yolo_labels import label_path_for
+
+CACHE_VERSION = 1
+DATA_FILE = 'images.u8'
+INDEX_FILE = 'index.npy'
+META_FILE = 'meta.json'
+PAD_VALUE = 114  # Gray padding, as used by YOLO letterboxing
+IMAGE_EXTENSIONS = {'.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp'}
+CHUNK_SIZE = 16
+
+# One row per image: where its pixels are in the data file and how it was letterboxed
+INDEX_DTYPE = np.dtype([
+    ('offset', np.int64),
+    ('height', np.int32),
+    ('width', np.int32),
+    ('scale', np.float32),
+    ('pad_x', np.int32),
+    ('pad_y', np.int32),
+    ('orig_height', np.int32),
+    ('orig_width', np.int32),
+])
+
+
+def letterbox(image, imgsz=640, stride=32):
+    """
+    Resize an image so its long side is imgsz, then pad it to a multiple of stride.
+
+    Like YOLO's rectangular letterbox, a 16:9 capture becomes 640x384 instead
+    of a padded 640x640 square, which keeps the cache smaller.
+
+    Args:
+        image: BGR image
+        imgsz: Training image size
+        stride: Model stride both sides are padded to
+
+    Returns:
+        tuple: (letterboxed image, scale, pad_x, pad_y)
+    """
+    h, w = image.shape[:2]
+    scale = imgsz / max(h, w)
+    new_w, new_h = round(w * scale), round(h * scale)
+    if (new_w, new_h) != (w, h):
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        image = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
+    out_w = -(-new_w // stride) * stride
+    out_h = -(-new_h // stride) * stride
+    pad_x = (out_w - new_w) // 2
+    pad_y = (out_h - new_h) // 2
+    image = cv2.copyMakeBorder(image, pad_y, out_h - new_h - pad_y, pad_x, out_w - new_w - pad_x,
+                               cv2.BORDER_CONSTANT, value=(PAD_VALUE, PAD_VALUE, PAD_VALUE))
+    return image, scale, pad_x, pad_y
+
+
+def _decode_chunk(paths, imgsz, stride):
+    """Process pool task: decode and letterbox a chunk of images."""
+    decoded = []
+    for path in paths:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            raise OSError(f"Cannot read image {path}")
+        boxed, scale, pad_x, pad_y = letterbox(image, imgsz, stride)
+        decoded.append((boxed, scale, pad_x, pad_y, image.shape[0], image.shape[1]))
+    return decoded
+
+
+def find_images(image_dir):
+    """Sorted image paths of a folder."""
+    return [str(path) for path in sorted(Path(image_dir).iterdir()) if path.suffix.lower() in IMAGE_EXTENSIONS]
+
+
+def source_stamps(paths):
+    """(mtime_ns, size) of each source image, to detect a stale cache."""
+    stamps = []
+    for path in paths:
+        stat = os.stat(path)
+        stamps.append([stat.st_mtime_ns, stat.st_size])
+    return stamps
+
+
+def build_cache(paths, cache_dir, imgsz=640, stride=32, workers=None):
+    """
+    Decode and letterbox images into a cache folder.
+
+    The pixels of all images are written back to back into one uint8 file.
+    index.npy holds the offset, shape and letterbox parameters of each image,
+    and meta.json the source files with their modification times and sizes.
+    Decoding runs in a process pool, the data file is written in order.
+
+    Args:
+        paths: Source image files
+        cache_dir: Output folder (created if missing)
+        imgsz: Training image size
+        stride: Model stride
+        workers: Processes of the pool (defaults to the CPU count, 1 decodes inline)
+
+    Returns:
+        int: Size of the data file in bytes
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    # Invalidate first, meta.json is written last: an interrupted build is rebuilt next time
+    if os.path.exists(os.path.join(cache_dir, META_FILE)):
+        os.remove(os.path.join(cache_dir, META_FILE))
+    index = np.zeros(len(paths), INDEX_DTYPE)
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    data_path = os.path.join(cache_dir, DATA_FILE)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 and len(chunks) > 1 else None
+    try:
+        results = (executor.map(_decode_chunk, chunks, [imgsz] * len(chunks), [stride] * len(chunks))
+                   if executor else (_decode_chunk(chunk, imgsz, stride) for chunk in chunks))
+        offset = 0
+        row = 0
+        with open(data_path + '.tmp', 'wb') as f:
+            for decoded in results:
+                for boxed, scale, pad_x, pad_y, orig_h, orig_w in decoded:
+                    f.write(np.ascontiguousarray(boxed).data)
+                    index[row] = (offset, boxed.shape[0], boxed.shape[1], scale, pad_x, pad_y, orig_h, orig_w)
+                    offset += boxed.nbytes
+                    row += 1
+    finally:
+        if executor:
+            executor.shutdown()
+
+    os.replace(data_path + '.tmp', data_path)
+    np.save(os.path.join(cache_dir, INDEX_FILE), index)
+    meta = {'version': CACHE_VERSION, 'imgsz': imgsz, 'stride': stride,
+            'sources': [os.path.abspath(path) for path in paths], 'stamps': source_stamps(paths)}
+    with open(os.path.join(cache_dir, META_FILE) + '.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(os.path.join(cache_dir, META_FILE) + '.tmp', os.path.join(cache_dir, META_FILE))
+    return offset
+
+
+def cache_is_current(cache_dir, paths, imgsz=640, stride=32):
+    """
+    Check that a cache holds exactly these unchanged images at this size.
+
+    Args:
+        cache_dir: Cache folder
+        paths: Source image files
+        imgsz: Training image size
+        stride: Model stride
+
+    Returns:
+        bool: True if the cache can be used as is
+    """
+    try:
+        with open(os.path.join(cache_dir, META_FILE)) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (meta.get('version') == CACHE_VERSION and meta['imgsz'] == imgsz and meta['stride'] == stride
+            and meta['sources'] == [os.path.abspath(path) for path in paths]
+            and meta['stamps'] == source_stamps(paths))
+
+
+class ImageCache:
+    """
+    Read-only view of a cache folder.
+
+    The data file is memory-mapped, so opening a cache reads nothing and
+    each image is a zero-copy view served from the page cache. Worker
+    processes of a data loader share the same physical pages.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Open a cache.
+
+        Args:
+            cache_dir: Folder written by build_cache
+        """
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.index = np.load(os.path.join(cache_dir, INDEX_FILE))
+        data_path = os.path.join(cache_dir, DATA_FILE)
+        self._data = np.memmap(data_path, np.uint8, 'r') if os.path.getsize(data_path) else np.empty(0, np.uint8)
+
+    def __str__(self):
+        return f"ImageCache(cache_dir={self.cache_dir}, images={len(self)}, imgsz={self.meta['imgsz']})"
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        """
+        Get a letterboxed image.
+
+        Args:
+            i: Image position
+
+        Returns:
+            ndarray: (height, width, 3) read-only uint8 view
+        """
+        row = self.index[i]
+        size = int(row['height']) * int(row['width']) * 3
+        return self._data[row['offset']:row['offset'] + size].reshape(int(row['height']), int(row['width']), 3)
+
+    def load_image(self, i):
+        """
+        Get a resized image without its letterbox padding.
+
+        Follows the return value of ultralytics' BaseDataset.load_image, so a
+        YOLODataset subclass can serve its images from the cache (see README).
+
+        Args:
+            i: Image position
+
+        Returns:
+            tuple: (read-only uint8 view, (original height, original width), (height, width))
+        """
+        row = self.index[i]
+        scale = float(row['scale'])
+        new_h, new_w = round(int(row['orig_height']) * scale), round(int(row['orig_width']) * scale)
+        image = self[i][row['pad_y']:row['pad_y'] + new_h, row['pad_x']:row['pad_x'] + new_w]
+        return image, (int(row['orig_height']), int(row['orig_width'])), (new_h, new_w)
+
+    @property
+    def sources(self):
+        """Source image file of each cached image."""
+        return self.meta['sources']
+
+
+def read_labels(image_path):
+    """
+    Read the YOLO labels of an image.
+
+    Args:
+        image_path: Image file, its labels are found with label_path_for
+
+    Returns:
+        ndarray: (N, 5) float32 rows of class, center x, center y, width, height
+    """
+    try:
+        with open(label_path_for(image_path)) as f:
+            rows = [line.split() for line in f if line.strip()]
+    except FileNotFoundError:
+        rows = []
+    return np.array(rows, np.float32).reshape(-1, 5)
+
+
+def letterbox_labels(labels, orig_shape, shape, scale, pad_x, pad_y):
+    """
+    Map labels normalized to the original image onto the letterboxed image.
+
+    Args:
+        labels: (N, 5) rows from read_labels
+        orig_shape: (height, width) of the original image
+        shape: (height, width) of the letterboxed image
+        scale, pad_x, pad_y: Letterbox parameters
+
+    Returns:
+        ndarray: (N, 5) float32 rows normalized to the letterboxed image
+    """
+    if not len(labels):
+        return labels
+    orig_h, orig_w = int(orig_shape[0]), int(orig_shape[1])
+    height, width = int(shape[0]), int(shape[1])
+    scale = float(scale)
+    labels = labels.copy()
+    labels[:, 1] = (labels[:, 1] * orig_w * scale + pad_x) / width
+    labels[:, 2] = (labels[:, 2] * orig_h * scale + pad_y) / height
+    labels[:, 3] *= orig_w * scale / width
+    labels[:, 4] *= orig_h * scale / height
+    return labels
+
+
+class CachedDataset:
+    """
+    Map-style dataset of letterboxed images and labels, read from an ImageCache.
+
+    Labels are converted to the normalized coordinates of the letterboxed
+    image. Items are (image, labels) pairs whose image size and label count
+    vary, so a torch DataLoader needs collate_fn=CachedDataset.collate.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Open the cache and read all labels.
+
+        Args:
+            cache_dir: Folder written by build_cache
+        """
+        self.cache = ImageCache(cache_dir)
+        self.labels = []
+        for row, path in zip(self.cache.index, self.cache.sources):
+            self.labels.append(letterbox_labels(read_labels(path), (row['orig_height'], row['orig_width']),
+                                                (row['height'], row['width']), row['scale'],
+                                                row['pad_x'], row['pad_y']))
+
+    def __str__(self):
+        return f"CachedDataset(cache={self.cache})"
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __getitem__(self, i):
+        return self.cache[i], self.labels[i]
+
+    @staticmethod
+    def collate(items):
+        """
+        Stack (image, labels) pairs into one batch, as a DataLoader collate_fn.
+
+        Images are padded at the bottom and right to the largest image of the
+        batch, and their labels rescaled to the padded size. Labels of all
+        images are concatenated with the image position in the first column,
+        like YOLO's batch_idx.
+
+        Args:
+            items: (image, labels) pairs
+
+        Returns:
+            tuple: ((B, H, W, 3) uint8 BGR images, (N, 6) float32 rows of image
+                position, class, center x, center y, width, height)
+        """
+        height = max(image.shape[0] for image, _ in items)
+        width = max(image.shape[1] for image, _ in items)
+        images = np.full((len(items), height, width, 3), PAD_VALUE, np.uint8)
+        rows = []
+        for i, (image, labels) in enumerate(items):
+            h, w = image.shape[:2]
+            images[i, :h, :w] = image
+            if len(labels):
+                batch_labels = np.empty((len(labels), 6), np.float32)
+                batch_labels[:, 0] = i
+                batch_labels[:, 1:] = labels
+                batch_labels[:, [2, 4]] *= w / width
+                batch_labels[:, [3, 5]] *= h / height
+                rows.append(batch_labels)
+        return images, np.concatenate(rows) if rows else np.zeros((0, 6), np.float32)
+
+    def batches(self, batch_size, shuffle=True, seed=0):
+        """
+        Iterate over the dataset in batches, shuffled once per call.
+
+        Args:
+            batch_size: Items per batch
+            shuffle: True to shuffle the order
+            seed: Seed of the shuffle
+
+        Yields:
+            tuple: Batch from CachedDataset.collate
+        """
+        order = list(range(len(self)))
+        if shuffle:
+            random.Random(seed).shuffle(order)
+        for start in range(0, len(order), batch_size):
+            yield self.collate([self[i] for i in order[start:start + batch_size]])
+
+
+def time_loading(paths, cache_dir, imgsz=640, stride=32, batch_size=16, passes=2):
+    """
+    Time loading every image once per pass, by decoding the source files and from the cache.
+
+    This measures data loader throughput only: both paths build the same
+    collated batches, with no augmentation and no model, so a pass is much
+    shorter than a training epoch.
+
+    Args:
+        paths: Source image files
+        cache_dir: Cache of the same images
+        imgsz: Training image size
+        stride: Model stride
+        batch_size: Images per batch
+        passes: Passes timed for each path
+
+    Returns:
+        dict: 'decode' and 'cache' -> list of seconds per pass
+    """
+    dataset = CachedDataset(cache_dir)
+
+    def decode_pass():
+        for start in range(0, len(paths), batch_size):
+            items = []
+            for path in paths[start:start + batch_size]:
+                image = cv2.imread(path, cv2.IMREAD_COLOR)
+                boxed, scale, pad_x, pad_y = letterbox(image, imgsz, stride)
+                labels = letterbox_labels(read_labels(path), image.shape[:2], boxed.shape[:2], scale, pad_x, pad_y)
+                items.append((boxed, labels))
+            CachedDataset.collate(items)
+
+    def cache_pass():
+        for _ in dataset.batches(batch_size):
+            pass
+
+    timings = {'decode': [], 'cache': []}
+    for name, run in (('decode', decode_pass), ('cache', cache_pass)):
+        for _ in range(passes):
+            start = time.perf_counter()
+            run()
+            timings[name].append(time.perf_counter() - start)
+    return timings
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', required=True, help='Folder of training images (labels next to it)')
+    parser.add_argument('--cache', required=True, help='Cache folder')
+    parser.add_argument('--imgsz', type=int, default=640, help='Training image size')
+    parser.add_argument('--stride', type=int, default=32, help='Model stride')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to decode images (defaults to the CPU count)')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the cache even if it is current')
+    parser.add_argument('--time-loading', type=int, default=0, metavar='N',
+                        help='Time N loader passes decoding the source images and N passes reading the cache '
+                             '(loader throughput, not training epochs)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = find_images(args.images)
+    if args.rebuild or not cache_is_current(args.cache, paths, args.imgsz, args.stride):
+        start = time.perf_counter()
+        size = build_cache(paths, args.cache, args.imgsz, args.stride, args.workers)
+        print(f'Cached {len(paths)} images ({size / 2 ** 20:.1f} MB) in {time.perf_counter() - start:.1f} s.')
+    else:
+        print(f'Cache {args.cache} is current ({len(paths)} images).')
+
+    if args.time_loading:
+        timings = time_loading(paths, args.cache, args.imgsz, args.stride, passes=args.time_loading)
+        for name, seconds in timings.items():
+            per_image = min(seconds) / max(1, len(paths)) * 1e3
+            print(f"{name:>6}: {', '.join(f'{s:.2f} s' for s in seconds)} per loader pass ({per_image:.2f} ms/image)")
+
+
+if __name__ == '__main__':
+    main()
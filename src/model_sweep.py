@@ -0,0 +1,303 @@
+# Train a grid of model and input sizes, and compare their accuracy with their CPU latency
+
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+import cv2
+
+# Latency percentiles of the game's instrumentation
+sys.path.insert(0, str(Path(__file__).parent / 'rps-game'))
+from instrumentation.latency import percentile
+
+IMAGE_EXTENSIONS = {'.bmp', '.jpeg', '.jpg', '.png', '.webp'}
+RESULTS_FILE = 'sweep.json'
+
+
+def model_label(model):
+    """
+    Short name of starting weights, with the training run of our own weights.
+
+    'yolo11s.pt' gives 'yolo11s', 'model_backup/modelv7/weights/best.pt' gives
+    'modelv7-best', so best.pt files of different runs do not collide.
+    """
+    path = Path(model)
+    if path.stem not in ('best', 'last'):
+        return path.stem
+    run_dir = path.parent.parent if path.parent.name == 'weights' else path.parent
+    return f"{run_dir.name}-{path.stem}" if run_dir.name else path.stem
+
+
+def run_name(model, imgsz):
+    """Folder name of one grid point, e.g. 'yolo11s_640'."""
+    return f"{model_label(model)}_{imgsz}"
+
+
+def load_frames(frames_dir, limit=100):
+    """
+    Load the fixed frame set used to measure latency.
+
+    Args:
+        frames_dir: Folder of camera frames
+        limit: Maximum number of frames, taken in name order
+
+    Returns:
+        list: BGR frames
+    """
+    paths = sorted(p for p in Path(frames_dir).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)[:limit]
+    return [cv2.imread(str(path)) for path in paths]
+
+
+def measure_latency(model, frames, imgsz, warmup=5, repeats=1):
+    """
+    Time single-frame CPU inference over a frame set, as the game runs it.
+
+    Args:
+        model: YOLO model
+        frames: BGR frames
+        imgsz: Inference size
+        warmup: Untimed frames run first
+        repeats: Passes over the frame set
+
+    Returns:
+        dict: p50_ms, p95_ms and mean_ms
+    """
+    for frame in frames[:warmup]:
+        model.predict(frame, imgsz=imgsz, device='cpu', verbose=False)
+    samples = []
+    for _ in range(repeats):
+        for frame in frames:
+            start = time.perf_counter()
+            model.predict(frame, imgsz=imgsz, device='cpu', verbose=False)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        'p50_ms': percentile(samples, 0.50) * 1000,
+        'p95_ms': percentile(samples, 0.95) * 1000,
+        'mean_ms': sum(samples) / len(samples) * 1000,
+    }
+
+
+def pareto_front(rows, accuracy='map50_95', latency='p95_ms'):
+    """
+    Select the grid points no other point beats on both accuracy and latency.
+
+    Args:
+        rows: Result dicts
+        accuracy: Key of the accuracy, higher is better
+        latency: Key of the latency, lower is better
+
+    Returns:
+        list: Pareto-optimal rows, fastest first
+    """
+    front = []
+    best = float('-inf')
+    for row in sorted(rows, key=lambda row: (row[latency], -row[accuracy])):
+        if row[accuracy] > best:
+            front.append(row)
+            best = row[accuracy]
+    return front
+
+
+def format_table(rows, front):
+    """
+    Format the results as a Markdown table, fastest first, marking the Pareto front.
+
+    Args:
+        rows: Result dicts
+        front: Pareto-optimal rows
+
+    Returns:
+        str: Markdown table
+    """
+    names = {row['name'] for row in front}
+    lines = ['| run | model | imgsz | mAP50 | mAP50-95 | p50 ms | p95 ms | Pareto |',
+             '|-----|-------|-------|-------|----------|--------|--------|--------|']
+    for row in sorted(rows, key=lambda row: row['p95_ms']):
+        lines.append(f"| {row['name']} | {row['model']} | {row['imgsz']} | {row['map50']:.3f} | "
+                     f"{row['map50_95']:.3f} | {row['p50_ms']:.1f} | {row['p95_ms']:.1f} | "
+                     f"{'*' if row['name'] in names else ''} |")
+    return '\n'.join(lines)
+
+
+def plot_front(rows, front, path):
+    """
+    Plot mAP50-95 against p95 latency, with the Pareto front as a line.
+
+    Args:
+        rows: Result dicts
+        front: Pareto-optimal rows
+        path: Image file to write
+
+    Returns:
+        bool: False if matplotlib is not installed
+    """
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return False
+    fig, ax = plt.subplots(figsize=(7, 5))
+    ax.scatter([row['p95_ms'] for row in rows], [row['map50_95'] for row in rows])
+    for row in rows:
+        ax.annotate(row['name'], (row['p95_ms'], row['map50_95']), fontsize=8,
+                    xytext=(4, 4), textcoords='offset points')
+    ax.plot([row['p95_ms'] for row in front], [row['map50_95'] for row in front], linestyle='--')
+    ax.set_xlabel('CPU p95 latency (ms)')
+    ax.set_ylabel('mAP50-95')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return True
+
+
+def load_results(out_dir):
+    """Results of earlier grid points, so an interrupted sweep resumes."""
+    try:
+        with open(os.path.join(out_dir, RESULTS_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_results(out_dir, rows):
+    """Atomically write the sweep results."""
+    path = os.path.join(out_dir, RESULTS_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(rows, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def checkpoint_finished(checkpoint):
+    """
+    Tell whether an ultralytics checkpoint is the end of its training.
+
+    During training last.pt holds the epoch and the optimizer state. When the
+    run ends, after its last epoch or early on patience, ultralytics strips
+    the optimizer and sets the epoch to -1, and the run cannot be resumed.
+
+    Args:
+        checkpoint: Dict loaded from last.pt
+
+    Returns:
+        bool: True if the optimizer state was stripped
+    """
+    return checkpoint.get('optimizer') is None or checkpoint.get('epoch', -1) < 0
+
+
+def training_finished(run_dir):
+    """
+    Tell whether a training run has ended.
+
+    Ultralytics writes weights/best.pt and last.pt after every epoch, and a
+    run stopped on patience has fewer epochs than asked, so completion is read
+    from last.pt itself (see checkpoint_finished).
+
+    Args:
+        run_dir: Folder of the training run
+
+    Returns:
+        bool: True if last.pt exists and its training has ended
+    """
+    last = os.path.join(run_dir, 'weights', 'last.pt')
+    if not os.path.exists(last):
+        return False
+    import torch
+    # Ultralytics checkpoints pickle the model classes, they are not plain tensors
+    return checkpoint_finished(torch.load(last, map_location='cpu', weights_only=False))
+
+
+def sweep_point(model, imgsz, args, frames):
+    """
+    Train (resume or reuse), validate and time one grid point.
+
+    Args:
+        model: Starting weights, e.g. 'yolo11s.pt' or a trained best.pt to fine-tune
+        imgsz: Training and inference size
+        args: Parsed command line arguments
+        frames: Latency frame set
+
+    Returns:
+        dict: Result row
+    """
+    from ultralytics import YOLO
+    name = run_name(model, imgsz)
+    run_dir = os.path.join(args.out, name)
+    weights = os.path.join(run_dir, 'weights', 'best.pt')
+    last = os.path.join(run_dir, 'weights', 'last.pt')
+    if not training_finished(run_dir):
+        if os.path.exists(last):
+            # Stopped during training: continue from the last epoch
+            YOLO(last).train(resume=True)
+        else:
+            YOLO(model).train(data=args.data, imgsz=imgsz, epochs=args.epochs, batch=args.batch,
+                              device=args.device, workers=args.workers, project=args.out, name=name,
+                              exist_ok=True, seed=0, deterministic=True, verbose=False)
+
+    trained = YOLO(weights)
+    metrics = trained.val(data=args.data, imgsz=imgsz, device=args.device, split='val', verbose=False,
+                          project=args.out, name=f"{name}_val", exist_ok=True)
+    row = {'name': name, 'model': model_label(model), 'imgsz': imgsz, 'weights': weights,
+           'map50': float(metrics.box.map50), 'map50_95': float(metrics.box.map)}
+    row.update(measure_latency(YOLO(weights), frames, imgsz, repeats=args.repeats))
+    return row
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', required=True, help='Dataset YAML used for training and validation')
+    parser.add_argument('--frames', required=True, help='Folder of camera frames used to measure latency')
+    parser.add_argument('--models', nargs='+', default=['yolo11n.pt', 'yolo11s.pt', 'yolo11m.pt'],
+                        help='Starting weights of each model size (pretrained or our own to fine-tune)')
+    parser.add_argument('--imgsz', type=int, nargs='+', default=[320, 480, 640], help='Input sizes')
+    parser.add_argument('--epochs', type=int, default=60, help='Training epochs of each grid point')
+    parser.add_argument('--batch', type=int, default=16, help='Training batch size')
+    parser.add_argument('--device', default='0', help="Training and validation device, e.g. '0' or 'cpu'")
+    parser.add_argument('--workers', type=int, default=8, help='Training data loader workers')
+    parser.add_argument('--max-frames', type=int, default=100, help='Frames of the latency set')
+    parser.add_argument('--repeats', type=int, default=3, help='Passes over the latency frames')
+    parser.add_argument('--out', default='runs/sweep', help='Output folder of runs and reports')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    frames = load_frames(args.frames, args.max_frames)
+    print(f'Measuring latency on {len(frames)} frames.')
+
+    rows = load_results(args.out)
+    done = {row['name'] for row in rows}
+    for model in args.models:
+        for imgsz in args.imgsz:
+            if run_name(model, imgsz) in done:
+                continue
+            row = sweep_point(model, imgsz, args, frames)
+            rows.append(row)
+            save_results(args.out, rows)
+            print(f"{row['name']}: mAP50-95 {row['map50_95']:.3f}, p95 {row['p95_ms']:.1f} ms")
+
+    front = pareto_front(rows)
+    table = format_table(rows, front)
+    with open(os.path.join(args.out, 'pareto.md'), 'w') as f:
+        f.write(table + '\n')
+    print(table)
+    if plot_front(rows, front, os.path.join(args.out, 'pareto.png')):
+        print(f"Plot written to {os.path.join(args.out, 'pareto.png')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# Background-difference segmentation of the capture ROI and prediction icons, without per-frame allocations
+
+import cv2
+import numpy as np
+
+
+class ThresholdSegmenter:
+    """
+    Isolates the hand in the ROI by thresholding its difference to a background.
+
+    All intermediate images are preallocated for the ROI size and every
+    OpenCV call writes into them, so a frame allocates nothing. The buffers
+    are reallocated only when the ROI size changes, and the background is
+    converted to grayscale only when a new one is set.
+    """
+
+    def __init__(self, background_color, erode_size=2, dilate_size=5):
+        """
+        Initialize the segmenter.
+
+        Args:
+            background_color: BGR color replacing the background pixels
+            erode_size: Size of the erosion kernel removing noise
+            dilate_size: Size of the dilation kernel filling holes in the hand
+        """
+        self.background_color = background_color
+        self.erode_kernel = np.ones((erode_size, erode_size), np.uint8)
+        self.dilate_kernel = np.ones((dilate_size, dilate_size), np.uint8)
+        self.shape = None
+        self._background = None
+
+    def __str__(self):
+        return f"ThresholdSegmenter(shape={self.shape}, background_color={self.background_color})"
+    def __repr__(self):
+        return self.__str__()
+
+    def _allocate(self, shape):
+        """Allocate the buffers for an ROI of the given shape."""
+        h, w = shape[:2]
+        self.shape = shape
+        self.roi_gray = np.empty((h, w), np.uint8)
+        self.bkg_gray = np.empty((h, w), np.uint8)
+        self.diff = np.empty((h, w), np.uint8)
+        self.mask = np.empty((h, w), np.uint8)
+        self.eroded = np.empty((h, w), np.uint8)
+        self.fill = np.empty(shape, np.uint8)
+        self.fill[:] = self.background_color
+        self.output = np.empty(shape, np.uint8)
+        self._background = None
+
+    def segment(self, roi, background, threshold):
+        """
+        Replace the pixels of the ROI close to the background with the background color.
+
+        Args:
+            roi: BGR ROI of the current frame (may be a view of the frame)
+            background: BGR ROI captured without the hand, same size as roi
+            threshold: Minimum gray level difference of hand pixels
+
+        Returns:
+            ndarray: Segmented ROI, a buffer overwritten by the next call
+        """
+        if roi.shape != self.shape:
+            self._allocate(roi.shape)
+        if background is not self._background:
+            cv2.cvtColor(background, cv2.COLOR_BGR2GRAY, dst=self.bkg_gray)
+            self._background = background
+
+        cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=self.roi_gray)
+        cv2.absdiff(self.roi_gray, self.bkg_gray, dst=self.diff)
+        cv2.threshold(self.diff, threshold, 255, cv2.THRESH_BINARY, dst=self.mask)
+        # Erode to remove noise, then dilate to fill holes in the hand
+        cv2.erode(self.mask, self.erode_kernel, dst=self.eroded, iterations=1)
+        cv2.dilate(self.eroded, self.dilate_kernel, dst=self.mask, iterations=1)
+
+        np.copyto(self.output, self.fill)
+        cv2.copyTo(roi, self.mask, self.output)
+        return self.output
+
+
+def load_prediction_icon(path, background_color, size):
+    """
+    Blend an icon with transparency onto a solid color and resize it once.
+
+    Args:
+        path: PNG icon with an alpha channel
+        background_color: BGR color shown through the transparent pixels
+        size: (width, height) of the returned icon
+
+    Returns:
+        ndarray: BGR icon, or None if the file cannot be read
+    """
+    foreground = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if foreground is None or foreground.ndim != 3 or foreground.shape[2] != 4:
+        return None
+    alpha = foreground[:, :, 3:4].astype(np.float32) / 255.0
+    background = np.empty(foreground.shape[:2] + (3,), np.float32)
+    background[:] = background_color
+    blended = (foreground[:, :, :3].astype(np.float32) * alpha + background * (1 - alpha)).astype(np.uint8)
+    return cv2.resize(blended, size, interpolation=cv2.INTER_AREA)
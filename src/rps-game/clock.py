@@ -0,0 +1,62 @@
+"""
+Clock module.
+Provides the time source that stamps each frame, either real or simulated.
+"""
+import time
+
+
+class SystemClock:
+    """Clock backed by the system wall clock."""
+
+    def now(self):
+        """
+        Get the current time.
+        
+        Returns:
+            float: Seconds since the epoch
+        """
+        return time.time()
+
+
+class SimulatedClock:
+    """Manually driven clock for replays, tests and fast-forward simulation."""
+
+    def __init__(self, start=0.0):
+        """
+        Initialize the simulated clock.
+        
+        Args:
+            start: Initial time in seconds
+        """
+        self.current = start
+
+    def now(self):
+        """
+        Get the current simulated time.
+        
+        Returns:
+            float: Simulated time in seconds
+        """
+        return self.current
+
+    def advance(self, seconds):
+        """
+        Move the clock forward.
+        
+        Args:
+            seconds: Time step in seconds
+        
+        Returns:
+            float: New simulated time
+        """
+        self.current += seconds
+        return self.current
+
+    def set(self, timestamp):
+        """
+        Jump to an absolute time.
+        
+        Args:
+            timestamp: New simulated time in seconds
+        """
+        self.current = timestamp
@@ -3,12 +3,13 @@ Configuration module for RPS game.
 Contains constants, class names, colors, and logging configuration.
 """
 import logging
-import logging.config
-import cv2
+import os
 
-# Logging configuration
+# Logging configuration, applied by setup_logging()
+LOG_DIR = 'log'
 LOGGING_CONFIG = {
     'version': 1,
+    'disable_existing_loggers': False,
     'formatters': {
         'detailed': {
             'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -36,8 +37,38 @@ LOGGING_CONFIG = {
     }
 }
 
-logging.config.dictConfig(LOGGING_CONFIG)
 log = logging.getLogger('myapp')
+_log_listener = None
+
+
+def setup_logging(log_dir=LOG_DIR):
+    """
+    Configure the console and file handlers of the app logger.
+
+    Entry points call this once at startup. Until then only warnings and
+    errors are printed, so importing modules opens no files and starts no
+    threads. Later calls do nothing.
+
+    Args:
+        log_dir: Directory of video-predict.log (created if missing)
+
+    Returns:
+        QueueListener: Background thread writing the log records
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return _log_listener
+    # logging.config and logging.handlers pull in socket and pickle, only load them when needed
+    import logging.config
+    from instrumentation.log_queue import start_queued_logging
+    os.makedirs(log_dir, exist_ok=True)
+    handlers = dict(LOGGING_CONFIG['handlers'])
+    handlers['file'] = {**handlers['file'], 'filename': os.path.join(log_dir, 'video-predict.log')}
+    logging.config.dictConfig({**LOGGING_CONFIG, 'handlers': handlers})
+    # Console and file writes happen on a background thread, the frame loop only queues records
+    _log_listener = start_queued_logging(log)
+    return _log_listener
+
 
 # Hand sign constants
 GUN = "Gun"
@@ -53,6 +84,10 @@ THUMB_UP = "Thumb_up"
 CLASS_NAMES = [GUN, PAPER, ROCK, SCISSOR, THUMB_DOWN, THUMB_UP]
 PLAYABLE_SIGNS = [ROCK, PAPER, SCISSOR, GUN]
 
+# Integer sign codes (class IDs) used by compact state tables
+SIGN_CODES = {name: code for code, name in enumerate(CLASS_NAMES)}
+NO_SIGN = -1
+
 # Display position constants
 HEADING1_HEIGHT = 30
 HEADING2_HEIGHT = 60
@@ -65,7 +100,7 @@ HEADING6_HEIGHT = 170
 TEXT_THICKNESS = 1
 TEXT_SCALE = 0.5
 TEXT_COLOR = (255, 255, 255)
-TEXT_FONT = cv2.FONT_HERSHEY_SIMPLEX
+TEXT_FONT = 0  # cv2.FONT_HERSHEY_SIMPLEX, config does not import cv2
 BG_COLOR = (0, 0, 0)
 BOX_COLOR = (40, 196, 212)
 
@@ -2,35 +2,43 @@
 Hand tracking module for detection phase.
 Handles pending hand tracking, locking, and player assignment.
 """
+import math
 import time
-from config import log, THUMB_UP
-from game_state import GamePhase
+from config import log, THUMB_UP, SIGN_CODES, NO_SIGN
+from game.event_log import event_log
+from game_state import Player
 
+THUMB_UP_CODE = SIGN_CODES[THUMB_UP]
+REASSOCIATE_MAX_DISTANCE = 200.0  # Pixels between a restored player's last position and a new hand
 
-def get_pending_hand_lock_state(track_id, game_state):
+
+def get_pending_hand_lock_state(track_id, game_state, now=None):
     """
     Determine the lock state of a pending hand.
     
     Args:
         track_id: Tracking ID of the hand
         game_state: Current game state object
+        now: Frame timestamp (defaults to the current time)
     
     Returns:
         str: Lock state ('none', 'locking', 'locked_ok', 'locked_invalid')
     """
-    if track_id not in game_state.pending_hands:
+    pending_hands = game_state.pending_hands
+    row = pending_hands.rows.get(track_id)
+    if row is None:
         return 'none'
     
-    hand = game_state.pending_hands[track_id]
-    sign = hand['sign']
-    locked_sign = hand['locked']
+    sign = pending_hands.sign[row]
+    locked_sign = pending_hands.locked[row]
     
-    if locked_sign is None or sign != locked_sign:
+    if locked_sign == NO_SIGN or sign != locked_sign:
         return 'none'
     
-    if sign == THUMB_UP:
-        if hand['lock_start_time'] is not None:
-            elapsed = time.time() - hand['lock_start_time']
+    if sign == THUMB_UP_CODE:
+        lock_start_time = pending_hands.lock_start_time[row]
+        if not math.isnan(lock_start_time):
+            elapsed = (time.time() if now is None else now) - lock_start_time
             if elapsed >= game_state.lock_duration:
                 return 'locked_ok'
             return 'locking'
@@ -39,182 +47,350 @@ def get_pending_hand_lock_state(track_id, game_state):
     return 'locked_invalid'
 
 
-def get_lock_progress(track_id, game_state):
+def get_lock_progress(track_id, game_state, now=None):
     """
     Get lock progress as percentage (0-100).
     
     Args:
         track_id: Tracking ID of the hand
         game_state: Current game state object
+        now: Frame timestamp (defaults to the current time)
     
     Returns:
         float: Progress percentage (0.0 to 100.0)
     """
-    if track_id not in game_state.pending_hands:
+    pending_hands = game_state.pending_hands
+    row = pending_hands.rows.get(track_id)
+    if row is None:
         return 0.0
     
-    hand = game_state.pending_hands[track_id]
-    if hand['lock_start_time'] is None:
+    lock_start_time = pending_hands.lock_start_time[row]
+    if math.isnan(lock_start_time):
         return 0.0
     
-    elapsed = time.time() - hand['lock_start_time']
+    elapsed = (time.time() if now is None else now) - lock_start_time
     progress = min(100, (elapsed / game_state.lock_duration) * 100)
     return progress
 
 
-def update_pending_hand_lock(hand_data, current_sign, current_time, game_state):
+def expire_ready_player(now, game_state, track_id):
     """
-    Update lock state for a pending hand.
+    Timer callback: a registered player has not been seen for too long.
     
     Args:
-        hand_data: Dictionary containing hand tracking data
-        current_sign: Currently detected sign
-        current_time: Current timestamp
+        now: Frame timestamp
         game_state: Current game state object
+        track_id: Tracking ID of the player
+    """
+    player = game_state.ready_players.pop(track_id, None)
+    if player is not None:
+        player.disconnect_timer = None
+        log.info("Registered ID %s disconnected during detection.", track_id)
+        event_log.emit('player_disconnected', now, track_id=track_id, match_id=None)
+
+
+def expire_pending_hand(now, pending_hands, track_id):
     """
-    locked_sign = hand_data['locked']
+    Timer callback: a pending hand has not been seen for too long.
     
-    if current_sign == locked_sign and locked_sign is not None:
-        # Continue locking
-        if hand_data['lock_start_time'] is None:
-            hand_data['lock_start_time'] = current_time
-    else:
-        # Sign changed, reset lock
-        hand_data['locked'] = current_sign
-        hand_data['lock_start_time'] = None
+    Args:
+        now: Frame timestamp
+        pending_hands: PendingHands table
+        track_id: Tracking ID of the hand
+    """
+    row = pending_hands.rows.get(track_id)
+    if row is not None:
+        pending_hands.disconnect_timer[row] = None
+        pending_hands.remove(track_id)
 
 
-def update_assigned_players(signs_by_id, game_state):
+def complete_pending_lock(now, pending_hands, track_id):
     """
-    Update assigned players with current detections.
+    Timer callback: a pending hand held THUMBS UP for the lock duration.
+    
+    Args:
+        now: Frame timestamp
+        pending_hands: PendingHands table
+        track_id: Tracking ID of the hand
+    """
+    row = pending_hands.rows.get(track_id)
+    if row is not None:
+        pending_hands.lock_timer[row] = None
+        pending_hands.locked_ok[track_id] = True
+
+
+def update_assigned_players(signs_by_id, game_state, now=None, centers_by_id=None):
+    """
+    Update registered players waiting for an opponent with current detections.
+    
+    A disconnect timer is scheduled when a player leaves the view and cancelled
+    when it comes back. There are at most two players per free match slot.
     
     Args:
         signs_by_id: Dictionary mapping track_id -> sign
         game_state: Current game state object
+        now: Frame timestamp (defaults to the current time)
+        centers_by_id: Optional dictionary mapping track_id -> (x, y) box center
     """
-    players = game_state.players
-    current_time = time.time()
+    timers = game_state.timers
+    current_time = time.time() if now is None else now
     
-    for player_key, player_data in players.items():
-        if player_data.id is not None and player_data.id in signs_by_id:
+    for track_id, player_data in game_state.ready_players.items():
+        if track_id in signs_by_id:
             player_data.last_seen = current_time
-            player_data.sign = signs_by_id[player_data.id]
-        elif player_data.id is not None:
-            # Check for disconnection
-            if current_time - player_data.last_seen > game_state.disconnect_timeout:
-                log.info(f"{player_key} disconnected during detection.")
-                player_data.id = None
-                player_data.sign = None
+            player_data.sign = signs_by_id[track_id]
+            if centers_by_id:
+                player_data.center = centers_by_id.get(track_id)
+            if player_data.disconnect_timer is not None:
+                timers.cancel(player_data.disconnect_timer)
+                player_data.disconnect_timer = None
+        elif player_data.disconnect_timer is None:
+            # Left the view, disconnect unless seen again in time
+            player_data.disconnect_timer = timers.schedule(
+                player_data.last_seen + game_state.disconnect_timeout,
+                expire_ready_player, game_state, track_id)
 
 
-def update_pending_hands(signs_by_id, game_state):
+def update_pending_hands(signs_by_id, game_state, now=None, centers_by_id=None):
     """
-    Update pending hands tracking and remove disconnected ones.
+    Update pending hands in view and schedule their lock and disconnect timers.
+    
+    A hand starts locking on the second consecutive frame with the same sign,
+    and its lock resets whenever the sign changes. Only detected hands and
+    hands that left the view since the last frame are touched, the timer
+    queue handles the rest.
     
     Args:
         signs_by_id: Dictionary mapping track_id -> sign
         game_state: Current game state object
+        now: Frame timestamp (defaults to the current time)
+        centers_by_id: Optional dictionary mapping track_id -> (x, y) box center
     """
     pending_hands = game_state.pending_hands
-    current_time = time.time()
-    hands_to_remove = []
+    timers = game_state.timers
+    current_time = time.time() if now is None else now
+    # Bind the table columns once, this loop runs for every detected hand on every frame
+    rows = pending_hands.rows
+    signs = pending_hands.sign
+    locked = pending_hands.locked
+    lock_start_time = pending_hands.lock_start_time
+    last_seen = pending_hands.last_seen
+    disconnect_timer = pending_hands.disconnect_timer
+    lock_timer = pending_hands.lock_timer
+    sign_codes = SIGN_CODES
+    seen = set()
     
-    for track_id, hand_data in pending_hands.items():
-        if track_id in signs_by_id:
-            hand_data['last_seen'] = current_time
-            hand_data['sign'] = signs_by_id[track_id]
-            update_pending_hand_lock(hand_data, signs_by_id[track_id], current_time, game_state)
+    for track_id, sign in signs_by_id.items():
+        row = rows.get(track_id)
+        if row is None:
+            continue
+        seen.add(track_id)
+        last_seen[row] = current_time
+        if disconnect_timer[row] is not None:
+            # Back in view
+            timers.cancel(disconnect_timer[row])
+            disconnect_timer[row] = None
+        sign_code = signs[row] = sign_codes[sign]
+        if centers_by_id:
+            pending_hands.set_center(row, centers_by_id.get(track_id))
+        if sign_code == locked[row]:
+            # Continue locking
+            if lock_start_time[row] != lock_start_time[row]:  # NaN, not locking yet
+                lock_start_time[row] = current_time
+                if sign_code == THUMB_UP_CODE:
+                    lock_timer[row] = timers.schedule(current_time + game_state.lock_duration,
+                                                      complete_pending_lock, pending_hands, track_id)
+                    event_log.emit('registration_lock_started', current_time, track_id=track_id)
         else:
-            # Hand not detected, check for timeout
-            if current_time - hand_data['last_seen'] > game_state.disconnect_timeout:
-                hands_to_remove.append(track_id)
+            # Sign changed, reset lock
+            locked[row] = sign_code
+            lock_start_time[row] = math.nan
+            if lock_timer[row] is not None:
+                timers.cancel(lock_timer[row])
+                lock_timer[row] = None
+            pending_hands.locked_ok.pop(track_id, None)
     
-    # Remove disconnected hands
-    for track_id in hands_to_remove:
-        del pending_hands[track_id]
+    # Hands that left the view since the last frame are removed unless seen again in time
+    for track_id in pending_hands.visible - seen:
+        row = rows[track_id]
+        disconnect_timer[row] = timers.schedule(last_seen[row] + game_state.disconnect_timeout,
+                                                expire_pending_hand, pending_hands, track_id)
+    pending_hands.visible = seen
 
 
-def add_new_detections(signs_by_id, game_state):
+def add_new_detections(signs_by_id, game_state, now=None, centers_by_id=None):
     """
     Add new detections to pending hands.
     
     Args:
         signs_by_id: Dictionary mapping track_id -> sign
         game_state: Current game state object
+        now: Frame timestamp (defaults to the current time)
+        centers_by_id: Optional dictionary mapping track_id -> (x, y) box center
     """
-    players = game_state.players
-    pending_hands = game_state.pending_hands
-    current_time = time.time()
-    
-    assigned_ids = [p.id for p in players.values() if p.id is not None]
+    pending_rows = game_state.pending_hands.rows
+    ready_players = game_state.ready_players
+    match_by_track_id = game_state.match_by_track_id
+    current_time = time.time() if now is None else now
     
     for track_id, sign in signs_by_id.items():
-        if track_id not in assigned_ids and track_id not in pending_hands:
-            pending_hands[track_id] = {
-                'sign': sign,
-                'locked': None,
-                'lock_start_time': None,
-                'last_seen': current_time
-            }
-            log.info(f"Tracking new hand: ID {track_id}")
+        if track_id not in pending_rows and track_id not in ready_players \
+                and track_id not in match_by_track_id:
+            center = centers_by_id.get(track_id) if centers_by_id else None
+            game_state.pending_hands.add(track_id, SIGN_CODES[sign], current_time, center)
+            log.info("Tracking new hand: ID %s", track_id)
 
 
-def assign_players_from_locked_hands(game_state):
+def assign_players_from_locked_hands(game_state, now=None):
     """
-    Assign IDs from locked OK hands to available player slots.
+    Register hands locked with OK as players waiting for an opponent.
     
     Args:
         game_state: Current game state object
+        now: Frame timestamp (defaults to the current time)
     """
-    players = game_state.players
     pending_hands = game_state.pending_hands
-    current_time = time.time()
+    if not pending_hands.locked_ok:
+        return
+    current_time = time.time() if now is None else now
     
-    available_slots = [k for k, v in players.items() if v.id is None]
-    locked_ok_hands = [
-        (track_id, hand) for track_id, hand in pending_hands.items()
-        if get_pending_hand_lock_state(track_id, game_state) == 'locked_ok'
-    ]
+    open_slots = game_state.open_player_slots()
+    for track_id in list(pending_hands.locked_ok):
+        if open_slots <= 0:
+            break
+        player = Player()
+        player.id = track_id
+        player.sign = pending_hands.sign_name(track_id)
+        player.last_seen = current_time
+        player.ready = True
+        player.center = pending_hands.center(track_id)
+        game_state.ready_players[track_id] = player
+        pending_hands.remove(track_id)
+        open_slots -= 1
+        log.info("Registered ID %s (locked with OK)", track_id)
+        event_log.emit('player_registered', current_time, track_id=track_id)
+
+
+def pair_distance(p1, p2):
+    """
+    Get the distance between the hands of two players.
     
-    for track_id, hand_data in locked_ok_hands:
-        if available_slots:
-            slot = available_slots.pop(0)
-            player = players[slot]
-            player.id = track_id
-            player.sign = hand_data['sign']
-            player.last_seen = current_time
-            player.ready = True
-            del pending_hands[track_id]
-            log.info(f"Assigned {slot} to ID {track_id} (locked with OK)")
+    Args:
+        p1: First player
+        p2: Second player
+    
+    Returns:
+        float: Distance in pixels, or 0 if a position is unknown
+    """
+    if p1.center is None or p2.center is None:
+        return 0.0
+    return ((p1.center[0] - p2.center[0]) ** 2 + (p1.center[1] - p2.center[1]) ** 2) ** 0.5
 
 
-def check_transition_to_game(game_state):
+def reassociate_players(signs_by_id, game_state, now=None, centers_by_id=None,
+                        max_distance=REASSOCIATE_MAX_DISTANCE):
     """
-    Check if both players are assigned and transition to game phase.
+    Give players restored from a snapshot the tracking ID of their hand.
+    
+    Tracking IDs do not survive a restart, so each restored player takes the
+    closest new hand within max_distance of its last known position, closest
+    pairs first. Without positions, new hands are taken in detection order.
     
     Args:
+        signs_by_id: Dictionary mapping track_id -> sign
         game_state: Current game state object
+        now: Frame timestamp (defaults to the current time)
+        centers_by_id: Optional dictionary mapping track_id -> (x, y) box center
+        max_distance: Maximum distance in pixels to the last known position
     """
-    players = game_state.players
+    candidates = [track_id for track_id in signs_by_id
+                  if track_id not in game_state.match_by_track_id and track_id not in game_state.ready_players]
+    if not candidates:
+        return
+    current_time = time.time() if now is None else now
+    
+    pairs = []
+    for index, (match, player) in enumerate(game_state.awaiting_players):
+        for order, track_id in enumerate(candidates):
+            center = centers_by_id.get(track_id) if centers_by_id else None
+            if center is None or player.center is None:
+                pairs.append((order, index, track_id))
+                continue
+            distance = ((center[0] - player.center[0]) ** 2 + (center[1] - player.center[1]) ** 2) ** 0.5
+            if distance <= max_distance:
+                pairs.append((distance, index, track_id))
+    pairs.sort()
+    
+    assigned = set()
+    taken = set()
+    for _, index, track_id in pairs:
+        if index in assigned or track_id in taken:
+            continue
+        match, player = game_state.awaiting_players[index]
+        player.id = track_id
+        if centers_by_id:
+            player.center = centers_by_id.get(track_id, player.center)
+        game_state.match_by_track_id[track_id] = match
+        if track_id in game_state.pending_hands:
+            game_state.pending_hands.remove(track_id)
+        assigned.add(index)
+        taken.add(track_id)
+        log.info("Restored player of match %d is now ID %s.", match.match_id, track_id)
+        event_log.emit('player_reassociated', current_time, track_id=track_id, match_id=match.match_id)
     
-    if all(p.id is not None for p in players.values()):
-        game_state.phase = GamePhase.GAME
-        game_state.pending_hands = {}
-        log.info("Both players assigned. Starting game phase.")
-        game_state.start_game()
+    if assigned:
+        game_state.awaiting_players = [entry for index, entry in enumerate(game_state.awaiting_players)
+                                       if index not in assigned]
 
 
-def update_player_detection(signs_by_id, game_state):
+def check_transition_to_game(game_state, now=None):
+    """
+    Pair registered players into matches and transition to game phase.
+    
+    Players are paired with their horizontal neighbour, so players standing
+    next to each other play together and the left player becomes P1. Players
+    without a known position are paired in registration order.
+    
+    Args:
+        game_state: Current game state object
+        now: Frame timestamp (defaults to the current time)
+    """
+    ready = list(game_state.ready_players.values())
+    if len(ready) < 2:
+        return
+    
+    if all(p.center is not None for p in ready):
+        ready.sort(key=lambda p: p.center[0])
+    
+    i = 0
+    while i + 1 < len(ready) and game_state.registration_open():
+        left, right = ready[i], ready[i + 1]
+        max_distance = game_state.max_pair_distance
+        if max_distance is not None and pair_distance(left, right) > max_distance:
+            i += 1
+            continue
+        del game_state.ready_players[left.id]
+        del game_state.ready_players[right.id]
+        game_state.create_match(left, right, now)
+        i += 2
+
+
+def update_player_detection(signs_by_id, game_state, now=None, centers_by_id=None):
     """
     Handle detection phase with per-hand locking and ID assignment on OK lock.
     
     Args:
         signs_by_id: Dictionary mapping track_id -> sign
         game_state: Current game state object
+        now: Frame timestamp shared by all updates (defaults to the current time)
+        centers_by_id: Optional dictionary mapping track_id -> (x, y) box center,
+            used to pair neighbouring players
     """
-    update_assigned_players(signs_by_id, game_state)
-    update_pending_hands(signs_by_id, game_state)
-    add_new_detections(signs_by_id, game_state)
-    assign_players_from_locked_hands(game_state)
-    check_transition_to_game(game_state)
-
+    if now is None:
+        now = time.time()
+    update_assigned_players(signs_by_id, game_state, now, centers_by_id)
+    update_pending_hands(signs_by_id, game_state, now, centers_by_id)
+    add_new_detections(signs_by_id, game_state, now, centers_by_id)
+    game_state.timers.advance(now)
+    assign_players_from_locked_hands(game_state, now)
+    check_transition_to_game(game_state, now)
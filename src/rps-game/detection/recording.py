@@ -0,0 +1,301 @@
+"""
+Detection recording module.
+Records per-frame tracking results into memory-mapped columnar segments and
+replays them without loading the YOLO model.
+"""
+import json
+import os
+import time
+import numpy as np
+from config import log, CLASS_NAMES
+
+FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+NO_TRACK_ID = -1
+
+# Column name -> dtype of the per-detection arrays stored in each segment
+DETECTION_COLUMNS = {
+    'boxes': np.float32,     # (N, 4) xyxy in pixels
+    'conf': np.float16,      # (N,)
+    'cls': np.uint8,         # (N,)
+    'track_id': np.int32,    # (N,) NO_TRACK_ID when untracked
+}
+
+
+class RecordedTensor:
+    """Array wrapper exposing the tensor calls used on YOLO boxes (indexing, cpu, numpy)."""
+
+    __slots__ = ('_array',)
+
+    def __init__(self, array):
+        self._array = array
+
+    def __getitem__(self, index):
+        return RecordedTensor(self._array[index])
+
+    def __len__(self):
+        return len(self._array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return np.asarray(self._array)
+
+
+class RecordedBoxes:
+    """Detection boxes with the same attribute interface as ultralytics Boxes."""
+
+    __slots__ = ('_xyxy', '_conf', '_cls', '_track_id', '_tracked')
+
+    def __init__(self, xyxy, conf, cls, track_id, tracked=None):
+        self._xyxy = xyxy
+        self._conf = conf
+        self._cls = cls
+        self._track_id = track_id
+        # Like ultralytics, ids are only exposed when every box is tracked
+        if tracked is None:
+            tracked = len(track_id) > 0 and not np.any(track_id == NO_TRACK_ID)
+        self._tracked = tracked
+
+    def __len__(self):
+        return len(self._cls)
+
+    def __iter__(self):
+        for i in range(len(self._cls)):
+            yield RecordedBoxes(self._xyxy[i:i + 1], self._conf[i:i + 1],
+                                self._cls[i:i + 1], self._track_id[i:i + 1], self._tracked)
+
+    @property
+    def xyxy(self):
+        return RecordedTensor(self._xyxy)
+
+    @property
+    def conf(self):
+        return RecordedTensor(self._conf)
+
+    @property
+    def cls(self):
+        return RecordedTensor(self._cls)
+
+    @property
+    def id(self):
+        return RecordedTensor(self._track_id) if self._tracked else None
+
+
+class RecordedResult:
+    """Tracking result for one frame, usable wherever a YOLO result is expected."""
+
+    __slots__ = ('boxes', 'orig_shape', 'timestamp')
+
+    def __init__(self, boxes, orig_shape, timestamp):
+        self.boxes = boxes
+        self.orig_shape = orig_shape
+        self.timestamp = timestamp
+
+    def __len__(self):
+        return len(self.boxes)
+
+
+def extract_detection_arrays(result):
+    """
+    Extract detection columns from a YOLO (or recorded) result.
+    
+    Args:
+        result: YOLO result object
+    
+    Returns:
+        tuple: (boxes, conf, cls, track_id) numpy arrays
+    """
+    boxes = None if result is None else result.boxes
+    if boxes is None or len(boxes) == 0:
+        return tuple(np.empty((0, 4) if name == 'boxes' else (0,), dtype)
+                     for name, dtype in DETECTION_COLUMNS.items())
+
+    xyxy = boxes.xyxy.cpu().numpy().astype(np.float32, copy=False)
+    conf = boxes.conf.cpu().numpy().astype(np.float16)
+    cls = boxes.cls.cpu().numpy().astype(np.uint8)
+    if boxes.id is not None:
+        track_id = boxes.id.cpu().numpy().astype(np.int32)
+    else:
+        track_id = np.full(len(cls), NO_TRACK_ID, dtype=np.int32)
+    return xyxy, conf, cls, track_id
+
+
+class DetectionRecorder:
+    """
+    Records tracking results into a directory of columnar segments.
+    
+    Each segment is a sub-directory holding one .npy file per column plus the
+    per-frame timestamps and detection offsets, so a replay can memory-map
+    every column without parsing.
+    """
+
+    def __init__(self, directory, frame_width, frame_height, segment_frames=1000):
+        """
+        Initialize the recorder.
+        
+        Args:
+            directory: Output directory (created if missing)
+            frame_width: Width of the recorded frames
+            frame_height: Height of the recorded frames
+            segment_frames: Number of frames buffered before a segment is written
+        """
+        self.directory = directory
+        self.segment_frames = segment_frames
+        self.meta = {
+            'version': FORMAT_VERSION,
+            'frame_width': frame_width,
+            'frame_height': frame_height,
+            'class_names': CLASS_NAMES,
+            'frames': 0,
+            'segments': [],
+        }
+        self._reset_buffer()
+        os.makedirs(directory, exist_ok=True)
+        log.info("Recording detections to %s", directory)
+
+    def _reset_buffer(self):
+        self._timestamps = []
+        self._counts = []
+        self._columns = {name: [] for name in DETECTION_COLUMNS}
+
+    def record(self, result, timestamp):
+        """
+        Append one frame of detections.
+        
+        Args:
+            result: YOLO result object for the frame
+            timestamp: Capture time of the frame in seconds
+        """
+        arrays = extract_detection_arrays(result)
+        for name, array in zip(DETECTION_COLUMNS, arrays):
+            self._columns[name].append(array)
+        self._counts.append(len(arrays[2]))
+        self._timestamps.append(timestamp)
+
+        if len(self._timestamps) >= self.segment_frames:
+            self.flush()
+
+    def flush(self):
+        """Write buffered frames as a new segment and update the metadata file."""
+        if not self._timestamps:
+            return
+
+        name = f"segment_{len(self.meta['segments']):05d}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(path, exist_ok=True)
+
+        offsets = np.zeros(len(self._counts) + 1, dtype=np.int64)
+        np.cumsum(self._counts, out=offsets[1:])
+        np.save(os.path.join(path, 'timestamps.npy'), np.asarray(self._timestamps, dtype=np.float64))
+        np.save(os.path.join(path, 'offsets.npy'), offsets)
+        for column, dtype in DETECTION_COLUMNS.items():
+            np.save(os.path.join(path, f"{column}.npy"),
+                    np.concatenate(self._columns[column]).astype(dtype, copy=False))
+
+        self.meta['segments'].append(name)
+        self.meta['frames'] += len(self._timestamps)
+        self._write_meta()
+        self._reset_buffer()
+
+    def _write_meta(self):
+        # Write to a temporary file first so a crash never leaves a truncated index
+        tmp_path = os.path.join(self.directory, META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.directory, META_FILE))
+
+    def close(self):
+        """Flush remaining frames."""
+        self.flush()
+        log.info("Recorded %d frames in %d segments.", self.meta['frames'], len(self.meta['segments']))
+
+
+class DetectionReplay:
+    """Replays a recording made by DetectionRecorder without loading the model."""
+
+    def __init__(self, directory):
+        """
+        Open a recording.
+        
+        Args:
+            directory: Recording directory containing meta.json
+        """
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version: {self.meta.get('version')}")
+        if self.meta['class_names'] != CLASS_NAMES:
+            log.warning("Recording class names differ from config.CLASS_NAMES; signs may be mislabelled.")
+
+    @property
+    def frame_size(self):
+        """Return (width, height) of the recorded frames."""
+        return self.meta['frame_width'], self.meta['frame_height']
+
+    def __len__(self):
+        return self.meta['frames']
+
+    def load_segment(self, name):
+        """
+        Memory-map all columns of a segment.
+        
+        Args:
+            name: Segment directory name
+        
+        Returns:
+            dict: Column name -> read-only memory-mapped array
+        """
+        path = os.path.join(self.directory, name)
+        columns = ['timestamps', 'offsets'] + list(DETECTION_COLUMNS)
+        return {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')
+                for column in columns}
+
+    def results(self):
+        """
+        Iterate over recorded frames.
+        
+        Yields:
+            RecordedResult: Result for each frame, in recording order
+        """
+        orig_shape = (self.meta['frame_height'], self.meta['frame_width'])
+        for name in self.meta['segments']:
+            segment = self.load_segment(name)
+            offsets = segment['offsets']
+            for i, timestamp in enumerate(segment['timestamps']):
+                start, end = offsets[i], offsets[i + 1]
+                boxes = RecordedBoxes(segment['boxes'][start:end], segment['conf'][start:end],
+                                      segment['cls'][start:end], segment['track_id'][start:end])
+                yield RecordedResult(boxes, orig_shape, float(timestamp))
+
+    def frames(self, stamp_capture, speed=1.0, clock=None):
+        """
+        Frame source replaying recorded results on a blank canvas.
+        
+        Args:
+            stamp_capture: Callable returning a FrameStamp for each frame
+            speed: Playback speed relative to the recording (0 for as fast as possible)
+            clock: Optional SimulatedClock set to each frame's recorded timestamp,
+                so game logic runs on recorded time at any playback speed
+        
+        Yields:
+            tuple: (stamp, frame, results) like the live frame source
+        """
+        width, height = self.frame_size
+        canvas = np.full((height, width, 3), 48, dtype=np.uint8)
+        start_wall = None
+        start_recorded = None
+
+        for result in self.results():
+            if speed > 0:
+                if start_wall is None:
+                    start_wall, start_recorded = time.perf_counter(), result.timestamp
+                delay = (result.timestamp - start_recorded) / speed - (time.perf_counter() - start_wall)
+                if delay > 0:
+                    time.sleep(delay)
+            if clock is not None:
+                clock.set(result.timestamp)
+            yield stamp_capture(), canvas, [result]
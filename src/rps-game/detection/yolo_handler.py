@@ -2,9 +2,28 @@
 YOLO model handler module.
 Handles model initialization and detection processing.
 """
+import importlib
+import threading
 import cv2
-from ultralytics import YOLO
 from config import log, MODEL_PATH, WINDOW_NAME, CLASS_NAMES
+from instrumentation.tracer import tracer
+from ui.display import create_window
+
+
+def preload_model_library():
+    """
+    Start importing ultralytics (and torch) on a background thread.
+    
+    The import takes seconds, so it overlaps with opening the webcam. A later
+    `from ultralytics import YOLO` waits for this import to finish.
+    
+    Returns:
+        threading.Thread: The started import thread
+    """
+    thread = threading.Thread(target=importlib.import_module, args=('ultralytics',),
+                              name='preload-ultralytics', daemon=True)
+    thread.start()
+    return thread
 
 
 def initialize_model_and_capture():
@@ -15,7 +34,7 @@ def initialize_model_and_capture():
         tuple: (model, width, height) of the webcam
     """
     log.info("Initializing YOLO model and webcam capture.")
-    model = YOLO(MODEL_PATH)
+    preload_model_library()
     cap = cv2.VideoCapture(0)
     
     if not cap.isOpened():
@@ -26,19 +45,48 @@ def initialize_model_and_capture():
     h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     cap.release()
     
-    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-    cv2.resizeWindow(WINDOW_NAME, w, h)
+    # Imported here so detection processing can be used without loading torch
+    from ultralytics import YOLO
+    model = YOLO(MODEL_PATH)
+    
+    create_window(WINDOW_NAME, w, h)
     
     return model, w, h
 
 
-def process_detections(result, w_img):
+def track_frames(model, cap, stamp_capture):
+    """
+    Live frame source: read webcam frames and run YOLO tracking on them.
+    
+    Args:
+        model: YOLO model
+        cap: Opened cv2.VideoCapture
+        stamp_capture: Callable returning a FrameStamp, called right after capture
+    
+    Yields:
+        tuple: (stamp, frame, results) for each captured frame
+    """
+    while True:
+        with tracer.span('capture'):
+            ret, frame = cap.read()
+        if not ret:
+            log.warning("Failed to read frame from webcam.")
+            return
+        stamp = stamp_capture()
+        
+        with tracer.span('track'):
+            results = model.track(frame, persist=True, verbose=False)
+        yield stamp, frame, results
+
+
+def process_detections(result, w_img, centers_by_id=None):
     """
     Process YOLO detection results and extract signs by track ID.
     
     Args:
         result: YOLO result object
         w_img: Image width (unused, kept for compatibility)
+        centers_by_id: Optional dictionary filled with track_id -> (x, y) box center
     
     Returns:
         dict: Mapping of track_id -> class_name
@@ -57,6 +105,9 @@ def process_detections(result, w_img):
         
         if track_id is not None:
             signs_by_id[track_id] = class_name
+            if centers_by_id is not None:
+                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+                centers_by_id[track_id] = (float(x1 + x2) / 2, float(y1 + y2) / 2)
     
     return signs_by_id
 
@@ -0,0 +1,165 @@
+"""
+Frame view module.
+Builds an immutable snapshot of the derived game state for rendering one frame.
+"""
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Tuple
+from config import NO_SIGN
+from detection.hand_tracking import THUMB_UP_CODE
+from game_state import GamePhase
+
+
+class TrackView(NamedTuple):
+    """What the renderers show for one tracked hand."""
+    track_id: int
+    slot: Optional[str]  # 'P1', 'M2 P1', 'READY' or None for unassigned hands
+    lock_state: str  # Lock state of a pending hand, 'none' otherwise
+    progress: float  # Lock progress percentage, 100 when not locking
+    score: Optional[int]  # Score of a match player, None otherwise
+
+
+class MatchView(NamedTuple):
+    """What the renderers show for one match."""
+    match_id: int
+    p1_id: int
+    p2_id: int
+    p1_score: int
+    p2_score: int
+    game_active: bool
+    elapsed_time: float  # Seconds since the match started
+    round_remaining: Optional[float]  # Seconds until the round locks, None when not locking
+    round_result: str
+    timeout_active: bool
+    timeout_remaining: float
+    timeout_progress: float
+    timeout_warning: bool
+
+
+class FrameView(NamedTuple):
+    """Derived game state of one frame, computed once after game logic and only read by renderers."""
+    now: float
+    phase: GamePhase
+    help_ui_visible: bool
+    max_matches: int
+    registration_open: bool
+    tracks: MappingProxyType  # track_id -> TrackView
+    pending_hands: Tuple[Tuple[int, str], ...]  # (track_id, sign) of each pending hand
+    matches: Tuple[MatchView, ...]
+    leaderboard: tuple  # LeaderboardEntry tuples, best session first
+
+
+def player_lock_progress(player, lock_duration, now):
+    """
+    Get the round lock progress of a match player.
+
+    Args:
+        player: Player of a match
+        lock_duration: Time in seconds both signs must be held
+        now: Frame timestamp
+
+    Returns:
+        float: Progress percentage (0.0 to 100.0), 100 when not locking
+    """
+    if player.locked is None or player.lock_start_time is None:
+        return 100.0
+    return min(100, ((now - player.lock_start_time) / lock_duration) * 100)
+
+
+def build_match_view(match, lock_duration, now):
+    """
+    Build the view of one match.
+
+    Args:
+        match: Match to describe
+        lock_duration: Time in seconds both signs must be held
+        now: Frame timestamp
+
+    Returns:
+        MatchView
+    """
+    p1 = match.p1
+    p2 = match.p2
+    timeout_manager = match.timeout_manager
+    round_remaining = None
+    if p1.lock_start_time is not None:
+        round_remaining = max(0, lock_duration - (now - p1.lock_start_time))
+    return MatchView(
+        match_id=match.match_id,
+        p1_id=p1.id,
+        p2_id=p2.id,
+        p1_score=p1.score,
+        p2_score=p2.score,
+        game_active=match.game_active,
+        elapsed_time=now - match.game_start_time if match.game_start_time is not None else 0.0,
+        round_remaining=round_remaining,
+        round_result=match.round_result,
+        timeout_active=timeout_manager.is_active(),
+        timeout_remaining=timeout_manager.get_remaining_time(now),
+        timeout_progress=timeout_manager.get_progress_percent(now),
+        timeout_warning=timeout_manager.should_show_warning(now),
+    )
+
+
+def build_frame_view(game_state, now, leaderboard=()):
+    """
+    Compute lock states, progress, slots and match summaries for one frame.
+
+    Call after game logic for the frame has run. The returned view does not
+    reference the mutable game state, so it can be handed to a render thread.
+
+    Args:
+        game_state: Current game state object
+        now: Frame timestamp used for all derived values
+        leaderboard: Cached leaderboard entries to show (Leaderboard.top)
+
+    Returns:
+        FrameView
+    """
+    tracks = {}
+    several_matches = game_state.max_matches > 1
+
+    # Same rules as get_pending_hand_lock_state and get_lock_progress, read from the columns once
+    pending_hands = game_state.pending_hands
+    signs = pending_hands.sign
+    locked = pending_hands.locked
+    lock_start_time = pending_hands.lock_start_time
+    lock_duration = game_state.lock_duration
+    for track_id, row in pending_hands.rows.items():
+        sign = signs[row]
+        start = lock_start_time[row]
+        elapsed = now - start  # NaN when not locking
+        progress = min(100, (elapsed / lock_duration) * 100) if start == start else 0.0
+        if locked[row] == NO_SIGN or sign != locked[row]:
+            lock_state = 'none'
+        elif sign == THUMB_UP_CODE:
+            lock_state = 'locked_ok' if elapsed >= lock_duration else 'locking'
+        else:
+            lock_state = 'locked_invalid'
+        tracks[track_id] = TrackView(track_id, None, lock_state, progress, None)
+
+    for track_id in game_state.ready_players:
+        tracks[track_id] = TrackView(track_id, 'READY', 'none', 100.0, None)
+
+    for match in game_state.matches:
+        for slot, player in (('P1', match.p1), ('P2', match.p2)):
+            if several_matches:
+                slot = f"M{match.match_id} {slot}"
+            tracks[player.id] = TrackView(
+                track_id=player.id,
+                slot=slot,
+                lock_state='none',
+                progress=player_lock_progress(player, game_state.lock_duration, now),
+                score=player.score,
+            )
+
+    return FrameView(
+        now=now,
+        phase=game_state.phase,
+        help_ui_visible=game_state.help_ui_visible,
+        max_matches=game_state.max_matches,
+        registration_open=game_state.registration_open(),
+        tracks=MappingProxyType(tracks),
+        pending_hands=tuple((track_id, pending_hands.sign_name(track_id)) for track_id in pending_hands),
+        matches=tuple(build_match_view(match, game_state.lock_duration, now) for match in game_state.matches),
+        leaderboard=leaderboard,
+    )
@@ -0,0 +1,228 @@
+"""
+Match event log module.
+Delivers structured game events in batches from a background thread to JSONL segment files and other sinks.
+"""
+import collections
+import glob
+import json
+import os
+import threading
+from config import log
+
+SEGMENT_PREFIX = 'events-'
+SEGMENT_SUFFIX = '.jsonl'
+
+
+def segment_paths(directory):
+    """
+    List the event segment files of a directory, oldest first.
+
+    Args:
+        directory: Event log directory
+
+    Returns:
+        list: Paths of the segment files
+    """
+    return sorted(glob.glob(os.path.join(directory, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")))
+
+
+def read_events(directory):
+    """
+    Read all events of an event log directory, oldest first.
+
+    Args:
+        directory: Event log directory
+
+    Yields:
+        dict: One event with its 't' timestamp, 'event' type and fields
+    """
+    for path in segment_paths(directory):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class SegmentWriter:
+    """
+    Event sink writing JSON lines to rotating segment files.
+
+    Events are written to `events-00000.jsonl`, `events-00001.jsonl`, ... A
+    new segment is started when the current one reaches `max_bytes`, and the
+    oldest segments are deleted beyond `max_segments`. Existing segments are
+    kept and new events go to a new segment.
+    """
+
+    DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, max_segments=None):
+        """
+        Initialize the writer.
+
+        Args:
+            directory: Output directory (created if missing)
+            max_bytes: Size at which a new segment file is started
+            max_segments: Number of most recent segments kept, None to keep all
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_segments = max_segments
+        self.events_written = 0
+        self._file = None
+        existing = segment_paths(directory)
+        if existing:
+            name = os.path.basename(existing[-1])
+            self._segment_index = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+        else:
+            self._segment_index = 0
+
+    def __str__(self):
+        return f"SegmentWriter(directory={self.directory}, segment={self._segment_index}, events_written={self.events_written})"
+    def __repr__(self):
+        return self.__str__()
+
+    def write(self, events):
+        """
+        Write a batch of events with a single call, rotating the segment if needed.
+
+        Args:
+            events: List of (now, event, fields) tuples
+        """
+        lines = [json.dumps({'t': now, 'event': event, **fields}, separators=(',', ':'), default=str)
+                 for now, event, fields in events]
+        if self._file is None:
+            self._open_segment()
+        self._file.write('\n'.join(lines) + '\n')
+        self._file.flush()
+        self.events_written += len(lines)
+        if self._file.tell() >= self.max_bytes:
+            # The next batch starts a new segment
+            self._file.close()
+            self._file = None
+            self._segment_index += 1
+
+    def close(self):
+        """Close the current segment file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        log.info("Wrote %d game events to %s", self.events_written, self.directory)
+
+    def _open_segment(self):
+        """Open the current segment file and delete segments beyond max_segments."""
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{self._segment_index:05d}{SEGMENT_SUFFIX}")
+        self._file = open(path, 'a', encoding='utf-8')
+        if self.max_segments is not None:
+            for old in segment_paths(self.directory)[:-self.max_segments]:
+                os.remove(old)
+
+
+class EventLog:
+    """
+    Append-only stream of game events, delivered in batches to sinks.
+
+    `emit` only appends a tuple to an in-memory deque, so the frame loop does
+    no I/O and no serialization. While at least one sink is attached, a
+    writer thread wakes every `flush_interval` seconds and hands all pending
+    events to each sink's `write(events)` as one batch. Sinks are only
+    called from the writer thread, and closed with the log.
+    """
+
+    def __init__(self, flush_interval=1.0):
+        self.enabled = False
+        self.flush_interval = flush_interval
+        self.sinks = []
+        self._pending = collections.deque()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __str__(self):
+        return f"EventLog(enabled={self.enabled}, sinks={self.sinks}, pending={len(self._pending)})"
+    def __repr__(self):
+        return self.__str__()
+
+    def open(self, directory, max_bytes=SegmentWriter.DEFAULT_MAX_BYTES, max_segments=None, flush_interval=None):
+        """
+        Start recording events into JSONL segment files.
+
+        Args:
+            directory: Output directory (created if missing)
+            max_bytes: Size at which a new segment file is started
+            max_segments: Number of most recent segments kept, None to keep all
+            flush_interval: Optional new number of seconds between two batches
+
+        Returns:
+            SegmentWriter: The attached sink
+        """
+        writer = SegmentWriter(directory, max_bytes, max_segments)
+        self.attach(writer, flush_interval)
+        log.info("Recording game events to %s", directory)
+        return writer
+
+    def attach(self, sink, flush_interval=None):
+        """
+        Deliver events to a sink, starting the writer thread if needed.
+
+        Args:
+            sink: Object with write(events) and close() methods
+            flush_interval: Optional new number of seconds between two batches
+        """
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+        self.sinks.append(sink)
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='event-log-writer', daemon=True)
+            self._thread.start()
+        self.enabled = True
+
+    def emit(self, event, now, **fields):
+        """
+        Record one event. Does nothing while no sink is attached.
+
+        Args:
+            event: Event type, e.g. 'round_result'
+            now: Frame timestamp of the event
+            **fields: JSON-serializable values describing the event
+        """
+        if self.enabled:
+            # deque.append is atomic, the writer thread pops without a lock
+            self._pending.append((now, event, fields))
+
+    def close(self):
+        """Deliver the pending events, stop the writer thread and close all sinks."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+
+    def _run(self):
+        """Writer thread: deliver a batch every flush interval until closed."""
+        while not self._stop.wait(self.flush_interval):
+            self._write_pending()
+        self._write_pending()
+
+    def _write_pending(self):
+        """Hand all pending events to every sink as one batch."""
+        pending = self._pending
+        events = []
+        while pending:
+            events.append(pending.popleft())
+        if not events:
+            return
+        for sink in self.sinks:
+            try:
+                sink.write(events)
+            except Exception:
+                # Keep delivering to the other sinks and later batches
+                log.exception("Event sink %s failed to write %d events.", sink, len(events))
+
+
+# Shared event log used by the game logic (closed by default)
+event_log = EventLog()
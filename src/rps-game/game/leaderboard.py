@@ -0,0 +1,195 @@
+"""
+Leaderboard persistence module.
+Stores matches, player sessions and rounds in SQLite and keeps the top scores cached for the HUD.
+"""
+import sqlite3
+import time
+from typing import NamedTuple
+from config import log
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    rounds INTEGER NOT NULL DEFAULT 0,
+    end_reason TEXT
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    slot INTEGER NOT NULL,
+    track_id INTEGER,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    wins INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    round INTEGER NOT NULL,
+    t REAL NOT NULL,
+    p1_sign TEXT NOT NULL,
+    p2_sign TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    PRIMARY KEY (match_id, round)
+);
+CREATE INDEX IF NOT EXISTS sessions_by_wins ON sessions (wins DESC, started_at);
+"""
+
+
+class LeaderboardEntry(NamedTuple):
+    """One player session on the leaderboard."""
+    session_id: int
+    track_id: int
+    wins: int
+    started_at: float
+
+
+class Leaderboard:
+    """
+    Event sink persisting scores to SQLite.
+
+    Attached to the event log, it receives the game events in batches on the
+    event log's writer thread and applies each batch in a single transaction.
+    The database uses WAL mode, so readers such as a venue display are not
+    blocked by the writes. After each batch the top sessions are read back
+    into `top`, a tuple the HUD reads without touching the database.
+
+    Every player of a match is a session. Live match IDs restart after a game
+    reset, so they are mapped to database rows while the match runs. A match
+    restored from a snapshot is mapped back to the rows it had before the
+    restart.
+    """
+
+    def __init__(self, path, size=5):
+        """
+        Open (or create) the leaderboard database.
+
+        Args:
+            path: SQLite database file
+            size: Number of sessions kept in the `top` cache
+        """
+        self.path = path
+        self.size = size
+        # Opened here, then only used by the event log's writer thread
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+        self._live = {}  # live match_id -> (database match id, p1 session id, p2 session id)
+        self._end_reasons = {}  # live match_id -> matches.end_reason stored by its match_ended event
+        self._last_event_time = None  # Time of the last event written, ends the matches still live on close
+        self.top = self._read_top()
+
+    def __str__(self):
+        return f"Leaderboard(path={self.path}, live_matches={len(self._live)}, top={self.top})"
+    def __repr__(self):
+        return self.__str__()
+
+    def write(self, events):
+        """
+        Apply a batch of game events in one transaction and refresh the cache.
+
+        Args:
+            events: List of (now, event, fields) tuples
+        """
+        with self._connection:
+            for now, event, fields in events:
+                handler = getattr(self, f"_on_{event}", None)
+                if handler is not None:
+                    handler(now, **fields)
+                self._last_event_time = now
+        self.top = self._read_top()
+
+    def close(self):
+        """Close the database, ending matches that are still running at the last event's time."""
+        now = time.time() if self._last_event_time is None else self._last_event_time
+        with self._connection:
+            for match_id in list(self._live):
+                self._end_match(match_id, now, 'closed')
+        self._connection.close()
+        log.info("Leaderboard saved to %s", self.path)
+
+    def _read_top(self):
+        """Read the best sessions, most wins first."""
+        rows = self._connection.execute(
+            'SELECT id, track_id, wins, started_at FROM sessions '
+            'WHERE wins > 0 ORDER BY wins DESC, started_at LIMIT ?', (self.size,))
+        return tuple(LeaderboardEntry(*row) for row in rows)
+
+    def _end_match(self, match_id, now, reason):
+        """Close the rows of a live match."""
+        db_match_id, p1_session, p2_session = self._live.pop(match_id)
+        self._connection.execute('UPDATE matches SET ended_at = ?, end_reason = ? WHERE id = ?',
+                                 (now, reason, db_match_id))
+        self._connection.execute('UPDATE sessions SET ended_at = ? WHERE id IN (?, ?)',
+                                 (now, p1_session, p2_session))
+
+    def _on_match_started(self, now, match_id, p1_id, p2_id):
+        db_match_id = self._connection.execute('INSERT INTO matches (started_at) VALUES (?)', (now,)).lastrowid
+        sessions = [
+            self._connection.execute(
+                'INSERT INTO sessions (match_id, slot, track_id, started_at) VALUES (?, ?, ?, ?)',
+                (db_match_id, slot, track_id, now)).lastrowid
+            for slot, track_id in ((1, p1_id), (2, p2_id))
+        ]
+        self._live[match_id] = (db_match_id, *sessions)
+
+    def _on_match_restored(self, now, match_id, started_at, rounds, p1_score, p2_score):
+        # The rows of the match are still open, or were closed by the crashed run's shutdown. Matches
+        # started on the same frame share started_at: they are restored in the order they were stored.
+        live = [db_match_id for db_match_id, _, _ in self._live.values()]
+        row = self._connection.execute(
+            'SELECT id FROM matches WHERE started_at = ? AND (ended_at IS NULL OR end_reason = ?) '
+            f'AND id NOT IN ({", ".join("?" * len(live))}) ORDER BY id LIMIT 1',
+            (started_at, 'closed', *live)).fetchone()
+        if row is not None:
+            db_match_id = row[0]
+            sessions = [session for session, in self._connection.execute(
+                'SELECT id FROM sessions WHERE match_id = ? ORDER BY slot', (db_match_id,))]
+            self._connection.execute('UPDATE matches SET ended_at = NULL, end_reason = NULL WHERE id = ?',
+                                     (db_match_id,))
+            self._connection.execute('UPDATE sessions SET ended_at = NULL WHERE match_id = ?', (db_match_id,))
+        else:
+            # Started before the leaderboard was used: store it with the restored scores
+            db_match_id = self._connection.execute('INSERT INTO matches (started_at, rounds) VALUES (?, ?)',
+                                                   (started_at, rounds)).lastrowid
+            sessions = [
+                self._connection.execute(
+                    'INSERT INTO sessions (match_id, slot, started_at, wins) VALUES (?, ?, ?, ?)',
+                    (db_match_id, slot, started_at, wins)).lastrowid
+                for slot, wins in ((1, p1_score), (2, p2_score))
+            ]
+        self._live[match_id] = (db_match_id, *sessions)
+
+    def _on_round_result(self, now, match_id, round, p1_sign, p2_sign, winner, p1_score, p2_score, **fields):
+        if match_id not in self._live:
+            return
+        db_match_id, p1_session, p2_session = self._live[match_id]
+        self._connection.execute(
+            'INSERT OR REPLACE INTO rounds (match_id, round, t, p1_sign, p2_sign, winner) VALUES (?, ?, ?, ?, ?, ?)',
+            (db_match_id, round, now, p1_sign, p2_sign, winner))
+        self._connection.execute('UPDATE matches SET rounds = ? WHERE id = ?', (round, db_match_id))
+        self._connection.executemany('UPDATE sessions SET wins = ? WHERE id = ?',
+                                     ((p1_score, p1_session), (p2_score, p2_session)))
+
+    def _on_player_disconnected(self, now, track_id, match_id):
+        if match_id is not None:
+            self._end_reasons[match_id] = 'disconnect'
+
+    def _on_match_timed_out(self, now, match_id):
+        self._end_reasons[match_id] = 'timeout'
+
+    def _on_match_stopped(self, now, match_id):
+        self._end_reasons[match_id] = 'stopped'
+
+    def _on_match_ended(self, now, match_id, **fields):
+        reason = self._end_reasons.pop(match_id, 'ended')
+        if match_id in self._live:
+            self._end_match(match_id, now, reason)
+
+    def _on_game_reset(self, now):
+        # A reset from the keyboard drops running matches without ending them
+        for match_id in list(self._live):
+            self._end_match(match_id, now, 'reset')
+        self._end_reasons.clear()
@@ -4,121 +4,182 @@ Handles game phase logic including locking and round processing.
 """
 import time
 from config import log, THUMB_DOWN, PLAYABLE_SIGNS
+from game.event_log import event_log
 from game.rules import get_rps_winner
-from game.player_timeout import PlayerTimeoutManager
-from game_state import GameState
+from detection.hand_tracking import reassociate_players, update_player_detection
 
 
-def update_player_signs(signs_by_id, game_state):
+def disconnect_match_player(now, game_state, match, label):
     """
-    Update player signs and check for disconnections.
+    Timer callback: a player of a match has not been seen for too long.
+    
+    Args:
+        now: Frame timestamp
+        game_state: Current game state object
+        match: Match of the player
+        label: 'p1' or 'p2', for logging
+    """
+    log.info("%s of match %d disconnected. Ending match.", label, match.match_id)
+    player = match.p1 if label == 'p1' else match.p2
+    event_log.emit('player_disconnected', now, track_id=player.id, match_id=match.match_id)
+    game_state.end_match(match, now)
+
+
+def update_player_signs(signs_by_id, game_state, match, now=None):
+    """
+    Update player signs of a match and schedule disconnect timers.
+    
+    A disconnect timer is scheduled when a player leaves the view and
+    cancelled when it comes back.
     
     Args:
         signs_by_id: Dictionary mapping track_id -> sign
         game_state: Current game state object
+        match: Match to update
+        now: Frame timestamp (defaults to the current time)
     
     Returns:
-        tuple: (current_p1_sign, current_p2_sign) or (None, None) if disconnected
+        tuple: (current_p1_sign, current_p2_sign), None for a player not in view
     """
-    p1 = game_state.p1
-    p2 = game_state.p2
-    current_time = time.time()
-    current_p1 = None
-    current_p2 = None
-    
-    if p1.id is not None and p1.id in signs_by_id:
-        p1.last_seen = current_time
-        current_p1 = signs_by_id[p1.id]
-    elif p1.id is not None:
-        # Check disconnection
-        if current_time - p1.last_seen > game_state.disconnect_timeout:
-            log.info("p1 disconnected. Returning to detection phase.")
-            game_state.reset_game_state()
-            return None, None
-    
-    if p2.id is not None and p2.id in signs_by_id:
-        p2.last_seen = current_time
-        current_p2 = signs_by_id[p2.id]
-    elif p2.id is not None:
-        # Check disconnection
-        if current_time - p2.last_seen > game_state.disconnect_timeout:
-            log.info("p2 disconnected. Returning to detection phase.")
-            game_state.reset_game_state()
-            return None, None
-    
-    return current_p1, current_p2
-
-
-def process_locked_round(game_state):
+    timers = game_state.timers
+    current_time = time.time() if now is None else now
+    current_signs = []
+    
+    for label, player in (("p1", match.p1), ("p2", match.p2)):
+        sign = signs_by_id.get(player.id)
+        if sign is not None:
+            player.last_seen = current_time
+            if player.disconnect_timer is not None:
+                timers.cancel(player.disconnect_timer)
+                player.disconnect_timer = None
+        elif player.disconnect_timer is None:
+            player.disconnect_timer = timers.schedule(player.last_seen + game_state.disconnect_timeout,
+                                                      disconnect_match_player, game_state, match, label)
+        current_signs.append(sign)
+    
+    return current_signs[0], current_signs[1]
+
+
+def process_locked_round(game_state, match, now=None):
     """
     Process a locked round: determine winner and update scores.
     
     Args:
         game_state: Current game state object
+        match: Match whose round is locked
+        now: Frame timestamp (defaults to the current time)
     """
-    locked_p1 = game_state.p1.locked
-    locked_p2 = game_state.p2.locked
+    locked_p1 = match.p1.locked
+    locked_p2 = match.p2.locked
     
     if locked_p1 == THUMB_DOWN and locked_p2 == THUMB_DOWN:
-        game_state.reset_game_state()
+        event_log.emit('match_stopped', time.time() if now is None else now, match_id=match.match_id)
+        game_state.end_match(match, now)
         log.info("Game stopped by both players showing STOP.")
     elif locked_p1 in PLAYABLE_SIGNS and locked_p2 in PLAYABLE_SIGNS:
         winner = get_rps_winner(locked_p1, locked_p2)
         if winner == 'Player 1 Wins':
-            game_state.p1.score += 1
+            match.p1.score += 1
         elif winner == 'Player 2 Wins':
-            game_state.p2.score += 1
-        game_state.round_result = f"{locked_p1} vs {locked_p2} - {winner}"
-        log.info(f"Round result: {winner}")
-
-
-
+            match.p2.score += 1
+        match.round_result = f"{locked_p1} vs {locked_p2} - {winner}"
+        match.rounds_played += 1
+        game_state.rounds_played += 1
+        log.info("Round result: %s", winner)
+        event_log.emit('round_result', time.time() if now is None else now, match_id=match.match_id,
+                       round=match.rounds_played, p1_id=match.p1.id, p2_id=match.p2.id,
+                       p1_sign=locked_p1, p2_sign=locked_p2, winner=winner,
+                       p1_score=match.p1.score, p2_score=match.p2.score)
 
 
-def check_player_visibility(signs_by_id, game_state: GameState):
+def check_player_visibility(signs_by_id, match):
     """
-    Check if players are visible in current detections.
+    Check if the players of a match are visible in current detections.
     
     Args:
         signs_by_id: Dictionary mapping track_id -> sign
-        game_state: Current game state object
+        match: Match to check
     
     Returns:
         tuple: (p1_visible, p2_visible)
     """
-    p1_visible = game_state.p1.id is not None and game_state.p1.id in signs_by_id
-    p2_visible = game_state.p2.id is not None and game_state.p2.id in signs_by_id
+    p1_visible = match.p1.id is not None and match.p1.id in signs_by_id
+    p2_visible = match.p2.id is not None and match.p2.id in signs_by_id
     return p1_visible, p2_visible
 
 
-def update_game_phase(signs_by_id, game_state, timeout_manager):
+def update_match(game_state, match, current_p1, current_p2, now=None):
     """
-    Handle game phase logic: update signs, check locks, process rounds.
+    Handle round logic of one match: check locks and process rounds.
     
     Args:
-        signs_by_id: Dictionary mapping track_id -> sign
         game_state: Current game state object
-        timeout_manager: PlayerTimeoutManager instance
+        match: Match to update
+        current_p1: Current sign of player 1, None if not in view
+        current_p2: Current sign of player 2, None if not in view
+        now: Frame timestamp (defaults to the current time)
+    """
+    if current_p1 is None or current_p2 is None:
+        return  # A player is not visible
+    
+    locked = match.check_and_lock(current_p1, current_p2, game_state.lock_duration, now)
+    
+    if locked:
+        if match.game_active:
+            process_locked_round(game_state, match, now)
+        match.reset_locks()
+        log.debug("Current Match State: %s", match)
+
+
+def update_game_phase(signs_by_id, game_state, now=None):
     """
-    # Check player visibility for timeout management
-    p1_visible, p2_visible = check_player_visibility(signs_by_id, game_state)
-    timeout_reached = timeout_manager.update_visibility(p1_visible, p2_visible)
+    Handle game phase logic for every running match.
     
-    if timeout_reached:
-        log.warning("Player timeout reached. Resetting game state.")
-        game_state.reset_game_state()
-        timeout_manager.reset()
-        return
+    Visibility changes schedule or cancel the timeout and disconnect timers of
+    each match, then expired timers end their matches, then the remaining
+    matches check locks and process rounds.
     
-    current_p1, current_p2 = update_player_signs(signs_by_id, game_state)
+    Args:
+        signs_by_id: Dictionary mapping track_id -> sign
+        game_state: Current game state object
+        now: Frame timestamp shared by all updates (defaults to the current time)
+    """
+    if now is None:
+        now = time.time()
+
+    current_signs = []
+    for match in game_state.matches:
+        # Check player visibility for timeout management
+        p1_visible, p2_visible = check_player_visibility(signs_by_id, match)
+        match.timeout_manager.update_visibility(p1_visible, p2_visible, now)
+        current_signs.append((match, update_player_signs(signs_by_id, game_state, match, now)))
     
-    if current_p1 is None or current_p2 is None:
-        return  # Disconnection occurred
+    game_state.timers.advance(now)
     
-    locked = game_state.check_and_lock(current_p1, current_p2)
+    for match, (current_p1, current_p2) in current_signs:
+        if match.game_active:  # Not ended by a timer this frame
+            update_match(game_state, match, current_p1, current_p2, now)
+
+
+def update_game(signs_by_id, game_state, now=None, centers_by_id=None):
+    """
+    Update all matches and register new players while there is room for another match.
     
-    if locked:
-        if game_state.game_active:
-            process_locked_round(game_state)
-        game_state.reset_locks()
-        log.debug(f"Current Game State: {game_state}")
+    Args:
+        signs_by_id: Dictionary mapping track_id -> sign
+        game_state: Current game state object
+        now: Frame timestamp shared by all updates (defaults to the current time)
+        centers_by_id: Optional dictionary mapping track_id -> (x, y) box center
+    """
+    if now is None:
+        now = time.time()
+
+    if game_state.awaiting_players:
+        reassociate_players(signs_by_id, game_state, now, centers_by_id)
+
+    # Decide before updating, so a match started this frame is first updated next frame
+    registering = game_state.registration_open()
+    if game_state.matches:
+        update_game_phase(signs_by_id, game_state, now)
+    if registering:
+        update_player_detection(signs_by_id, game_state, now, centers_by_id)
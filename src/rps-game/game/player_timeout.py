@@ -12,40 +12,62 @@ class PlayerTimeoutManager:
     TIMEOUT_DURATION = 60.0  # 1 minute in seconds
     WARNING_THRESHOLD = 5.0  # Show warning when 5 seconds remaining
     
-    def __init__(self):
-        """Initialize the timeout manager."""
+    def __init__(self, timers=None, on_timeout=None):
+        """
+        Initialize the timeout manager.
+        
+        Args:
+            timers: Optional TimerQueue. When given, the timeout is scheduled when
+                a player disappears and fires on_timeout instead of being polled
+            on_timeout: Callable invoked as on_timeout(now) when the scheduled timeout fires
+        """
         self.timeout_start_time = None
         self.warning_shown = False
+        self.timers = timers
+        self.on_timeout = on_timeout
+        self.timer = None
         log.debug("Initialized PlayerTimeoutManager.")
     
-    def update_visibility(self, p1_visible, p2_visible):
+    def update_visibility(self, p1_visible, p2_visible, now=None):
         """
         Update player visibility status and manage timeout.
         
         Args:
             p1_visible: True if player 1 is visible
             p2_visible: True if player 2 is visible
+            now: Frame timestamp (defaults to the current time)
         
         Returns:
-            bool: True if timeout has been reached and reset is needed
+            bool: True if timeout has been reached and reset is needed (always
+                False with a timer queue, which calls on_timeout instead)
         """
+        if now is None:
+            now = time.time()
         one_invisible = not p1_visible or not p2_visible
         
         if one_invisible:
             if self.timeout_start_time is None:
-                self.timeout_start_time = time.time()
+                self.timeout_start_time = now
                 self.warning_shown = False
                 log.info("One player not visible. Starting timeout timer.")
+                if self.timers is not None:
+                    self.timer = self.timers.schedule(now + self.TIMEOUT_DURATION, self._expire)
         else:
             # At least one player is visible, reset timer
             if self.timeout_start_time is not None:
                 log.info("Both players visible. Resetting timeout timer.")
                 self.timeout_start_time = None
                 self.warning_shown = False
+                if self.timers is not None:
+                    self.timers.cancel(self.timer)
+                    self.timer = None
+        
+        if self.timers is not None:
+            return False
         
         # Check if timeout has been reached
         if self.timeout_start_time is not None:
-            elapsed = time.time() - self.timeout_start_time
+            elapsed = now - self.timeout_start_time
             if elapsed >= self.TIMEOUT_DURATION:
                 log.warning("Timeout reached. Game will be reset.")
                 self.reset()
@@ -62,50 +84,82 @@ class PlayerTimeoutManager:
         """
         return self.timeout_start_time is not None
     
-    def get_remaining_time(self):
+    def get_remaining_time(self, now=None):
         """
         Get remaining time until timeout.
         
+        Args:
+            now: Frame timestamp (defaults to the current time)
+        
         Returns:
             float: Remaining time in seconds, or 0 if timer not active
         """
         if self.timeout_start_time is None:
             return 0.0
         
-        elapsed = time.time() - self.timeout_start_time
+        elapsed = (time.time() if now is None else now) - self.timeout_start_time
         remaining = max(0, self.TIMEOUT_DURATION - elapsed)
         return remaining
     
-    def get_progress_percent(self):
+    def get_progress_percent(self, now=None):
         """
         Get timeout progress as percentage (0-100).
         
+        Args:
+            now: Frame timestamp (defaults to the current time)
+        
         Returns:
             float: Progress percentage (0.0 to 100.0)
         """
         if self.timeout_start_time is None:
             return 0.0
         
-        elapsed = time.time() - self.timeout_start_time
+        elapsed = (time.time() if now is None else now) - self.timeout_start_time
         progress = min(100, (elapsed / self.TIMEOUT_DURATION) * 100)
         return progress
     
-    def should_show_warning(self):
+    def should_show_warning(self, now=None):
         """
         Check if warning should be shown.
         
+        Args:
+            now: Frame timestamp (defaults to the current time)
+        
         Returns:
             bool: True if warning should be displayed
         """
         if not self.is_active():
             return False
         
-        remaining = self.get_remaining_time()
+        remaining = self.get_remaining_time(now)
         return remaining <= self.WARNING_THRESHOLD
     
+    def resume(self, timeout_start_time):
+        """
+        Continue a timeout that started earlier, e.g. before a restart.
+        
+        Args:
+            timeout_start_time: Time at which the timeout started
+        """
+        self.reset()
+        self.timeout_start_time = timeout_start_time
+        if self.timers is not None:
+            self.timer = self.timers.schedule(timeout_start_time + self.TIMEOUT_DURATION, self._expire)
+    
+    def _expire(self, now):
+        """Timer callback: the timeout has been reached."""
+        self.timer = None
+        log.warning("Timeout reached. Game will be reset.")
+        self.reset()
+        if self.on_timeout is not None:
+            self.on_timeout(now)
+    
     def reset(self):
         """Reset the timeout manager to initial state."""
         self.timeout_start_time = None
         self.warning_shown = False
+        if self.timers is not None:
+            self.timers.cancel(self.timer)
+            self.timer = None
         log.debug("PlayerTimeoutManager reset.")
 
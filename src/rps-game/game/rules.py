@@ -1,29 +1,223 @@
 """
 RPS game rules module.
-Contains the logic for determining winners in Rock-Paper-Scissors.
+Defines rule sets as data, compiles them into outcome matrices and determines winners.
 """
-from config import ROCK, PAPER, SCISSOR, GUN
+import json
+from functools import cached_property
+from config import ROCK, PAPER, SCISSOR, GUN, CLASS_NAMES
 
+LIZARD = "Lizard"
+SPOCK = "Spock"
 
-def get_rps_winner(sign1, sign2):
+# Outcome codes stored in the compiled matrices
+NO_OUTCOME = -1  # At least one sign is not part of the rule set
+TIE = 0
+P1_WINS = 1
+P2_WINS = 2
+OUTCOME_LABELS = {TIE: 'Tie', P1_WINS: 'Player 1 Wins', P2_WINS: 'Player 2 Wins'}
+
+# Rule set definitions: sign -> signs it beats
+CLASSIC_RULES = {
+    ROCK: [SCISSOR],
+    PAPER: [ROCK],
+    SCISSOR: [PAPER],
+}
+HOUSE_RULES = {
+    **CLASSIC_RULES,
+    GUN: [ROCK, PAPER, SCISSOR],  # The gun beats everything
+}
+LIZARD_SPOCK_RULES = {
+    ROCK: [SCISSOR, LIZARD],
+    PAPER: [ROCK, SPOCK],
+    SCISSOR: [PAPER, LIZARD],
+    LIZARD: [PAPER, SPOCK],
+    SPOCK: [ROCK, SCISSOR],
+}
+
+
+class RuleSet:
     """
-    Determine the winner of a Rock-Paper-Scissors round.
-    
+    A set of signs and the signs each one beats, compiled into an outcome matrix.
+
+    Signs are encoded as integer codes (their position in `signs`). The matrix
+    has one extra row and column for code -1, so unknown signs evaluate to
+    NO_OUTCOME without a separate mask.
+    """
+
+    def __init__(self, name, beats):
+        """
+        Compile a rule set.
+
+        Args:
+            name: Name of the rule set
+            beats: Dictionary mapping sign -> iterable of signs it beats
+
+        Raises:
+            ValueError: If a sign beats an unknown sign or two signs beat each other
+        """
+        self.name = name
+        self.signs = tuple(beats)
+        self.codes = {sign: code for code, sign in enumerate(self.signs)}
+
+        # (code1, code2) -> outcome of every decided pair, all other pairs are ties
+        decided = {}
+        for sign, beaten in beats.items():
+            for other in beaten:
+                if other not in self.codes:
+                    raise ValueError(f"Rule set '{name}': {sign} beats unknown sign {other}")
+                if other in beats and sign in beats[other]:
+                    raise ValueError(f"Rule set '{name}': {sign} and {other} beat each other")
+                decided[(self.codes[sign], self.codes[other])] = P1_WINS
+                decided[(self.codes[other], self.codes[sign])] = P2_WINS
+        self._decided = decided
+
+        # Single-pair lookups for the game loop
+        self._labels = {
+            (sign1, sign2): OUTCOME_LABELS[decided.get((self.codes[sign1], self.codes[sign2]), TIE)]
+            for sign1 in self.signs for sign2 in self.signs
+        }
+
+    @cached_property
+    def outcomes(self):
+        """Read-only int8 outcome matrix, compiled on first bulk use so importing the rules does not load numpy."""
+        import numpy as np
+        size = len(self.signs)
+        outcomes = np.full((size + 1, size + 1), NO_OUTCOME, dtype=np.int8)
+        outcomes[:size, :size] = TIE
+        for (code1, code2), outcome in self._decided.items():
+            outcomes[code1, code2] = outcome
+        outcomes.setflags(write=False)
+        return outcomes
+
+    @cached_property
+    def class_codes(self):
+        """Model class ID -> sign code, for recorded detection columns."""
+        import numpy as np
+        return np.array([self.codes.get(name, -1) for name in CLASS_NAMES], dtype=np.int8)
+
+    def __str__(self):
+        return f"RuleSet(name={self.name}, signs={self.signs})"
+    def __repr__(self):
+        return self.__str__()
+
+    def winner(self, sign1, sign2):
+        """
+        Determine the winner of a single round.
+
+        Args:
+            sign1: Player 1's sign
+            sign2: Player 2's sign
+
+        Returns:
+            str: 'Tie', 'Player 1 Wins', or 'Player 2 Wins'
+
+        Raises:
+            ValueError: If a sign is not part of the rule set
+        """
+        try:
+            return self._labels[(sign1, sign2)]
+        except KeyError:
+            raise ValueError(f"Signs {sign1!r} and {sign2!r} are not both part of rule set '{self.name}'") from None
+
+    def encode(self, signs):
+        """
+        Convert sign names to integer codes.
+
+        Args:
+            signs: Iterable or numpy array of sign names
+
+        Returns:
+            np.ndarray: int8 codes, -1 for signs not in the rule set
+        """
+        import numpy as np
+        codes = self.codes
+        if isinstance(signs, np.ndarray):
+            # Look up each distinct sign once
+            unique, inverse = np.unique(signs, return_inverse=True)
+            lookup = np.array([codes.get(sign, -1) for sign in unique.tolist()], dtype=np.int8)
+            return lookup[inverse].reshape(signs.shape)
+        return np.fromiter((codes.get(sign, -1) for sign in signs), dtype=np.int8)
+
+    def evaluate(self, codes1, codes2):
+        """
+        Determine the outcome of many rounds at once.
+
+        Args:
+            codes1: Array of player 1 sign codes
+            codes2: Array of player 2 sign codes (same shape as codes1)
+
+        Returns:
+            np.ndarray: int8 outcome codes (TIE, P1_WINS, P2_WINS or NO_OUTCOME)
+        """
+        return self.outcomes[codes1, codes2]
+
+    def evaluate_class_ids(self, class_ids1, class_ids2):
+        """
+        Determine the outcome of many rounds from model class IDs.
+
+        Args:
+            class_ids1: Array of player 1 class IDs (indices into CLASS_NAMES)
+            class_ids2: Array of player 2 class IDs
+
+        Returns:
+            np.ndarray: int8 outcome codes
+        """
+        return self.outcomes[self.class_codes[class_ids1], self.class_codes[class_ids2]]
+
+    def tally(self, codes1, codes2):
+        """
+        Count the outcomes of many rounds.
+
+        Args:
+            codes1: Array of player 1 sign codes
+            codes2: Array of player 2 sign codes
+
+        Returns:
+            dict: Outcome label -> number of rounds, plus 'No Outcome'
+        """
+        import numpy as np
+        counts = np.bincount(self.evaluate(codes1, codes2).ravel() + 1, minlength=4)
+        tally = {'No Outcome': int(counts[0])}
+        for outcome, label in OUTCOME_LABELS.items():
+            tally[label] = int(counts[outcome + 1])
+        return tally
+
+
+def load_rule_set(path):
+    """
+    Load a rule set from a JSON file.
+
+    The file holds {"name": ..., "beats": {sign: [signs it beats]}}.
+
     Args:
-        sign1: Player 1's sign (ROCK, PAPER, or SCISSOR)
-        sign2: Player 2's sign (ROCK, PAPER, or SCISSOR)
-    
+        path: Path of the JSON file
+
     Returns:
-        str: 'Tie', 'Player 1 Wins', or 'Player 2 Wins'
+        RuleSet: The compiled rule set
     """
-    if sign1 == sign2:
-        return 'Tie'
-    
-    if (sign1 == ROCK and sign2 == SCISSOR) or \
-       (sign1 == PAPER and sign2 == ROCK) or \
-       (sign1 == SCISSOR and sign2 == PAPER) or \
-       (sign1 == GUN):
-        return 'Player 1 Wins'
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return RuleSet(data['name'], data['beats'])
+
+
+RULE_SETS = {
+    'classic': RuleSet('classic', CLASSIC_RULES),
+    'house': RuleSet('house', HOUSE_RULES),
+    'lizard-spock': RuleSet('lizard-spock', LIZARD_SPOCK_RULES),
+}
+DEFAULT_RULE_SET = RULE_SETS['house']
 
-    return 'Player 2 Wins'
 
+def get_rps_winner(sign1, sign2, rule_set=None):
+    """
+    Determine the winner of a Rock-Paper-Scissors round.
+
+    Args:
+        sign1: Player 1's sign (ROCK, PAPER, SCISSOR or GUN)
+        sign2: Player 2's sign (ROCK, PAPER, SCISSOR or GUN)
+        rule_set: RuleSet to apply (defaults to the house rules, where GUN beats everything)
+
+    Returns:
+        str: 'Tie', 'Player 1 Wins', or 'Player 2 Wins'
+    """
+    return (rule_set or DEFAULT_RULE_SET).winner(sign1, sign2)
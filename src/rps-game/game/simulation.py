@@ -0,0 +1,176 @@
+"""
+Game simulation module.
+Drives the game engine with synthetic sign streams on a simulated clock,
+for deterministic tests and fast-forward benchmarks.
+
+Usage (from src/rps-game):
+    python -m game.simulation --hours 2 --fps 30 --seed 0
+"""
+import argparse
+import logging
+import random
+import time
+from clock import SimulatedClock
+from config import log, setup_logging, GUN, PAPER, ROCK, SCISSOR, THUMB_DOWN, THUMB_UP
+from game.event_log import event_log
+from game.phases import update_game
+from game_state import GameState
+
+# Relative frequency of each sign in synthetic streams
+SIGN_WEIGHTS = {
+    THUMB_UP: 3.0,
+    ROCK: 3.0,
+    PAPER: 3.0,
+    SCISSOR: 3.0,
+    GUN: 1.0,
+    THUMB_DOWN: 0.2,
+}
+
+
+class SyntheticHand:
+    """A simulated hand that holds signs for random durations and sometimes leaves the frame."""
+
+    __slots__ = ('track_id', 'sign', 'visible', 'frames_left')
+
+    def __init__(self, track_id, sign):
+        self.track_id = track_id
+        self.sign = sign
+        self.visible = True
+        self.frames_left = 0
+
+
+def synthetic_sign_stream(frames, fps=30.0, seed=0, hands=3, hold_seconds=(1.0, 6.0),
+                          absence_rate=0.005, absence_seconds=(1.0, 90.0)):
+    """
+    Generate a deterministic stream of per-frame detections.
+    
+    The same dictionary object is yielded for consecutive frames without
+    changes, so generating the stream costs little compared to the engine.
+    
+    Args:
+        frames: Number of frames to generate
+        fps: Simulated camera frame rate
+        seed: Random seed
+        hands: Number of simulated hands in view (players and bystanders)
+        hold_seconds: (min, max) time a sign is held
+        absence_rate: Probability that a hand leaves the frame when its sign changes
+        absence_seconds: (min, max) time a hand stays out of the frame
+    
+    Yields:
+        dict: Mapping of track_id -> sign for each frame
+    """
+    rng = random.Random(seed)
+    signs = list(SIGN_WEIGHTS)
+    weights = list(SIGN_WEIGHTS.values())
+    next_id = hands + 1
+    actors = [SyntheticHand(i + 1, THUMB_UP) for i in range(hands)]
+    signs_by_id = {}
+    changed = True
+
+    for _ in range(frames):
+        for hand in actors:
+            hand.frames_left -= 1
+            if hand.frames_left > 0:
+                continue
+            changed = True
+            if hand.visible and rng.random() < absence_rate:
+                hand.visible = False
+                hand.frames_left = int(rng.uniform(*absence_seconds) * fps)
+                continue
+            if not hand.visible:
+                hand.visible = True
+                # The tracker usually assigns a new ID after a long absence
+                if rng.random() < 0.5:
+                    hand.track_id = next_id
+                    next_id += 1
+            hand.sign = rng.choices(signs, weights)[0]
+            hand.frames_left = max(1, int(rng.uniform(*hold_seconds) * fps))
+
+        if changed:
+            signs_by_id = {hand.track_id: hand.sign for hand in actors if hand.visible}
+            changed = False
+        yield signs_by_id
+
+
+def simulate(stream, fps=30.0, clock=None, game_state=None):
+    """
+    Run the game engine over a stream of detections.
+    
+    Args:
+        stream: Iterable of signs_by_id dictionaries, one per frame
+        fps: Simulated frame rate used to advance the clock
+        clock: SimulatedClock (a new one starting at 0 if omitted)
+        game_state: GameState to drive (a new one if omitted)
+    
+    Returns:
+        dict: Simulation statistics
+    """
+    clock = clock or SimulatedClock()
+    game_state = game_state or GameState(clock.now())
+    frame_interval = 1.0 / fps
+
+    frames = 0
+    rounds = 0
+    last_rounds = game_state.rounds_played
+    first_match_count = game_state.matches_started
+    start = time.perf_counter()
+
+    for signs_by_id in stream:
+        now = clock.advance(frame_interval)
+        update_game(signs_by_id, game_state, now)
+
+        if game_state.rounds_played != last_rounds:
+            rounds += max(0, game_state.rounds_played - last_rounds)
+            last_rounds = game_state.rounds_played
+        frames += 1
+
+    wall_seconds = time.perf_counter() - start
+    return {
+        'frames': frames,
+        'simulated_seconds': frames * frame_interval,
+        'wall_seconds': wall_seconds,
+        'frames_per_second': frames / wall_seconds if wall_seconds > 0 else float('inf'),
+        'games_started': game_state.matches_started - first_match_count,
+        'rounds': rounds,
+        'final_phase': game_state.phase.value,
+        'final_scores': [(match.p1.score, match.p2.score) for match in game_state.matches],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fast-forward the game engine over synthetic detections.")
+    parser.add_argument('--hours', type=float, default=1.0, help="Simulated time in hours")
+    parser.add_argument('--fps', type=float, default=30.0, help="Simulated camera frame rate")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed of the synthetic stream")
+    parser.add_argument('--hands', type=int, default=3, help="Number of hands in view")
+    parser.add_argument('--matches', type=int, default=1, help="Maximum number of concurrent matches")
+    parser.add_argument('--events', metavar='DIR', help="Append the game events to JSONL files in DIR")
+    parser.add_argument('--leaderboard', metavar='DB', help="Store scores in the SQLite database DB")
+    parser.add_argument('--verbose', action='store_true', help="Keep game logging enabled")
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        setup_logging()
+    else:
+        log.setLevel(logging.ERROR)
+
+    frames = int(args.hours * 3600 * args.fps)
+    stream = synthetic_sign_stream(frames, args.fps, args.seed, args.hands)
+    clock = SimulatedClock()
+    if args.events:
+        event_log.open(args.events)
+    if args.leaderboard:
+        from game.leaderboard import Leaderboard
+        event_log.attach(Leaderboard(args.leaderboard))
+    try:
+        stats = simulate(stream, args.fps, clock, GameState(clock.now(), args.matches))
+    finally:
+        event_log.close()
+    print(f"Simulated {stats['simulated_seconds'] / 3600:.2f} h ({stats['frames']} frames) "
+          f"in {stats['wall_seconds']:.2f} s: {stats['frames_per_second']:,.0f} frames/s")
+    print(f"Games started: {stats['games_started']}, rounds played: {stats['rounds']}, "
+          f"final phase: {stats['final_phase']}, final scores: {stats['final_scores']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Game state snapshot module.
+Periodically saves running matches to disk from a background thread and restores them after a restart.
+"""
+import os
+import pickle
+import threading
+from config import log
+from game.event_log import event_log
+from game.player_timeout import PlayerTimeoutManager
+from game_state import GamePhase, GameState, Match, Player
+
+SNAPSHOT_VERSION = 1
+
+
+def capture_snapshot(game_state, now):
+    """
+    Copy what is needed to resume the running matches into plain values.
+
+    Runs on the frame thread, so it only copies a few numbers per match.
+    Pending hands and players waiting for an opponent are not kept, they
+    register again in a few seconds.
+
+    Args:
+        game_state: Current game state object
+        now: Frame timestamp
+
+    Returns:
+        dict: Snapshot, or None if no match is running
+    """
+    if not game_state.matches:
+        return None
+    return {
+        'version': SNAPSHOT_VERSION,
+        'saved_at': now,
+        'game_start_time': game_state.game_start_time,
+        'lock_duration': game_state.lock_duration,
+        'rounds_played': game_state.rounds_played,
+        'disconnect_timeout': game_state.disconnect_timeout,
+        'max_matches': game_state.max_matches,
+        'max_pair_distance': game_state.max_pair_distance,
+        'next_match_id': game_state.next_match_id,
+        'matches_started': game_state.matches_started,
+        'matches': [
+            {
+                'match_id': match.match_id,
+                'game_start_time': match.game_start_time,
+                'started_at': match.started_at,
+                'round_result': match.round_result,
+                'rounds_played': match.rounds_played,
+                'timeout_start_time': match.timeout_manager.timeout_start_time,
+                'players': [(player.score, player.center) for player in match.players],
+            }
+            for match in game_state.matches
+        ],
+    }
+
+
+def load_snapshot(path, now):
+    """
+    Read a snapshot file.
+
+    Args:
+        path: Snapshot file
+        now: Current time, snapshots older than their disconnect timeout are ignored
+
+    Returns:
+        dict: Snapshot, or None if it is missing, unreadable or too old
+    """
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning("Ignoring unreadable snapshot %s: %s", path, e)
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        log.warning("Ignoring snapshot %s with an unknown format.", path)
+        return None
+    if now - snapshot['saved_at'] > snapshot['disconnect_timeout']:
+        log.info("Ignoring snapshot %s saved %.0f s ago.", path, now - snapshot['saved_at'])
+        return None
+    return snapshot
+
+
+def restore_game_state(snapshot, now, max_matches=None):
+    """
+    Build a game state that resumes the matches of a snapshot.
+
+    Restored players have no tracking ID until reassociate_players gives them
+    the closest new hand. Until then their match waits: a visibility timeout
+    interrupted by the restart continues with the time it had left, and
+    otherwise starts on the first frame. A match_restored event is emitted
+    for each match, so event sinks such as the leaderboard pick it up again.
+
+    Args:
+        snapshot: Snapshot returned by load_snapshot
+        now: Frame timestamp of the restart
+        max_matches: Optional new number of concurrent matches
+
+    Returns:
+        GameState: Game state with the restored matches
+    """
+    game_state = GameState(now, max_matches or snapshot['max_matches'])
+    game_state.game_start_time = snapshot['game_start_time']
+    game_state.lock_duration = snapshot['lock_duration']
+    game_state.rounds_played = snapshot['rounds_played']
+    game_state.disconnect_timeout = snapshot['disconnect_timeout']
+    game_state.max_pair_distance = snapshot['max_pair_distance']
+    game_state.next_match_id = snapshot['next_match_id']
+    game_state.matches_started = snapshot['matches_started']
+    downtime = now - snapshot['saved_at']
+
+    for saved in snapshot['matches']:
+        players = []
+        for score, center in saved['players']:
+            player = Player()
+            player.score = score
+            player.center = center
+            player.last_seen = now
+            player.ready = True
+            players.append(player)
+        match = Match(saved['match_id'], players[0], players[1])
+        match.timeout_manager = PlayerTimeoutManager(
+            game_state.timers, lambda now, match=match: game_state.match_timed_out(match, now))
+        match.game_active = True
+        match.game_start_time = saved['game_start_time'] + downtime
+        # game_start_time moves with each restart, started_at keeps identifying the match's rows
+        match.started_at = saved.get('started_at', saved['game_start_time'])
+        match.round_result = saved['round_result']
+        match.rounds_played = saved['rounds_played']
+        if saved['timeout_start_time'] is not None:
+            match.timeout_manager.resume(saved['timeout_start_time'] + downtime)
+        game_state.matches.append(match)
+        game_state.awaiting_players.extend((match, player) for player in players)
+        event_log.emit('match_restored', now, match_id=match.match_id, started_at=match.started_at,
+                       rounds=match.rounds_played, p1_score=players[0].score, p2_score=players[1].score)
+
+    game_state.phase = GamePhase.GAME
+    log.info("Restored %d matches from a snapshot saved %.1f s ago.", len(game_state.matches), downtime)
+    return game_state
+
+
+class SnapshotWriter:
+    """
+    Writes game state snapshots off the frame thread.
+
+    `maybe_write` copies the state at most every `interval` seconds and hands
+    the copy to a writer thread, which pickles it and atomically replaces the
+    snapshot file (write to a temporary file, fsync, rename). Only the latest
+    copy is kept, so a slow disk never queues up snapshots. The file is
+    removed while no match is running.
+    """
+
+    def __init__(self, path, interval=1.0):
+        """
+        Start the writer thread.
+
+        Args:
+            path: Snapshot file
+            interval: Minimum time in seconds between two snapshots
+        """
+        self.path = path
+        self.interval = interval
+        self.snapshots_written = 0
+        self._last_capture = None
+        self._latest = None
+        self._has_latest = False
+        self._file_exists = os.path.exists(path)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='snapshot-writer', daemon=True)
+        self._thread.start()
+
+    def __str__(self):
+        return f"SnapshotWriter(path={self.path}, interval={self.interval}, snapshots_written={self.snapshots_written})"
+    def __repr__(self):
+        return self.__str__()
+
+    def maybe_write(self, game_state, now):
+        """
+        Snapshot the game state if the interval has elapsed since the last one.
+
+        Args:
+            game_state: Current game state object
+            now: Frame timestamp
+        """
+        if self._last_capture is not None and now - self._last_capture < self.interval:
+            return
+        self._last_capture = now
+        snapshot = capture_snapshot(game_state, now)
+        if snapshot is None and not self._file_exists:
+            return
+        self._file_exists = snapshot is not None
+        with self._condition:
+            self._latest = snapshot
+            self._has_latest = True
+            self._condition.notify()
+
+    def close(self, remove=False):
+        """
+        Write the last snapshot and stop the writer thread.
+
+        Args:
+            remove: True to delete the snapshot file, e.g. after a clean exit
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _run(self):
+        """Writer thread: save the latest snapshot whenever one is handed over."""
+        while True:
+            with self._condition:
+                while not self._has_latest and not self._closed:
+                    self._condition.wait()
+                if not self._has_latest:
+                    return
+                snapshot = self._latest
+                self._latest = None
+                self._has_latest = False
+            try:
+                self._save(snapshot)
+            except OSError as e:
+                log.warning("Failed to write snapshot %s: %s", self.path, e)
+
+    def _save(self, snapshot):
+        """Atomically replace the snapshot file, or remove it when snapshot is None."""
+        if snapshot is None:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.snapshots_written += 1
@@ -0,0 +1,123 @@
+"""
+Timer scheduling module.
+Fires callbacks at scheduled deadlines, so timeouts cost O(expired) per frame.
+"""
+import heapq
+
+
+class Timer:
+    """Handle of a scheduled callback, used to cancel it."""
+
+    __slots__ = ('deadline', 'callback', 'args', 'active')
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.active = True
+
+    def __str__(self):
+        return f"Timer(deadline={self.deadline}, callback={getattr(self.callback, '__name__', self.callback)}, active={self.active})"
+    def __repr__(self):
+        return self.__str__()
+
+
+class TimerQueue:
+    """
+    Deadline queue driven by frame timestamps.
+
+    Timers are kept in a binary heap ordered by deadline. Cancelling only marks
+    the timer, and cancelled timers are dropped when they reach the top of the
+    heap or when they make up most of it. Each frame, `advance` pops the
+    expired timers and calls `callback(now, *args)`, in deadline order.
+    """
+
+    COMPACT_MIN_CANCELLED = 64  # Cancelled timers kept before the heap is compacted
+
+    def __init__(self):
+        self._heap = []
+        self._counter = 0  # Tie breaker keeping equal deadlines in scheduling order
+        self._cancelled = 0
+
+    def __len__(self):
+        return len(self._heap) - self._cancelled
+
+    def __str__(self):
+        return f"TimerQueue(pending={len(self)}, next_deadline={self.next_deadline()})"
+    def __repr__(self):
+        return self.__str__()
+
+    def schedule(self, deadline, callback, *args):
+        """
+        Schedule a callback.
+
+        Args:
+            deadline: Time at which the callback fires
+            callback: Callable invoked as callback(now, *args)
+            *args: Extra arguments passed to the callback
+
+        Returns:
+            Timer: Handle for cancel()
+        """
+        timer = Timer(deadline, callback, args)
+        self._counter += 1
+        heapq.heappush(self._heap, (deadline, self._counter, timer))
+        return timer
+
+    def cancel(self, timer):
+        """
+        Cancel a timer. Cancelling a fired or cancelled timer does nothing.
+
+        Args:
+            timer: Timer returned by schedule(), or None
+        """
+        if timer is None or not timer.active:
+            return
+        timer.active = False
+        self._cancelled += 1
+        if self._cancelled > self.COMPACT_MIN_CANCELLED and self._cancelled * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if entry[2].active]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def next_deadline(self):
+        """
+        Get the deadline of the next active timer.
+
+        Returns:
+            float: Deadline, or None if no timer is scheduled
+        """
+        heap = self._heap
+        while heap and not heap[0][2].active:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+        return heap[0][0] if heap else None
+
+    def advance(self, now):
+        """
+        Fire all timers whose deadline is at or before now.
+
+        Args:
+            now: Current frame timestamp
+
+        Returns:
+            int: Number of callbacks fired
+        """
+        fired = 0
+        # Callbacks may schedule, cancel or clear timers, so re-read the heap each time
+        while self._heap and self._heap[0][0] <= now:
+            timer = heapq.heappop(self._heap)[2]
+            if not timer.active:
+                self._cancelled -= 1
+                continue
+            timer.active = False
+            timer.callback(now, *timer.args)
+            fired += 1
+        return fired
+
+    def clear(self):
+        """Cancel all timers."""
+        for entry in self._heap:
+            entry[2].active = False
+        self._heap.clear()
+        self._cancelled = 0
@@ -1,112 +1,286 @@
 """
 Game state management module.
-Handles initialization and reset of game state.
+Handles initialization and reset of game state, and the matches played in it.
 """
 import enum
+import math
 import time
-from config import log
+from config import log, CLASS_NAMES, NO_SIGN
+from game.event_log import event_log
+from game.player_timeout import PlayerTimeoutManager
+from game.timers import TimerQueue
 
 class GamePhase(enum.Enum):
     DETECTION = 'detection'
     GAME = 'game'
 
 class GameState():
-    """Class to manage the state of the RPS game."""
+    """Class to manage the state of the RPS game, shared by all matches in the camera frame."""
 
-    def __init__(self):
-        self.game_start_time = time.time()
+    __slots__ = ('game_start_time', 'lock_duration', 'rounds_played', 'phase', 'pending_hands',
+                 'ready_players', 'ready_duration', 'disconnect_timeout', 'help_ui_visible',
+                 'max_matches', 'max_pair_distance', 'matches', 'match_by_track_id',
+                 'next_match_id', 'matches_started', 'timers', 'awaiting_players')
+
+    def __init__(self, now=None, max_matches=1):
+        self.game_start_time = time.time() if now is None else now
+        self.timers = TimerQueue()  # Lock, disconnect and visibility deadlines of all hands and matches
         self.lock_duration = 2.0
-        self.round_result = ""
-        self.game_active = False
-        self.phase = GamePhase.DETECTION  # 'detection' or 'game'
-        self.pending_hands = {}  # Temporary tracking for unassigned hands
+        self.rounds_played = 0  # Rounds played by all matches since the last reset
+        self.phase = GamePhase.DETECTION  # 'detection' while no match is running, 'game' otherwise
+        self.pending_hands = PendingHands(self.timers)  # Temporary tracking for unassigned hands
+        self.ready_players = {}  # track_id -> Player registered and waiting for an opponent
         self.ready_duration = 2.0  # Time to hold OK to lock
         self.disconnect_timeout = 120.0  # 2 minutes
         self.help_ui_visible = False
-        self.p1 = Player()
-        self.p2 = Player()
-        
+        self.max_matches = max_matches
+        self.max_pair_distance = None  # Maximum distance in pixels between paired hands (None = any)
+        self.matches = []
+        self.match_by_track_id = {}  # track_id -> Match, for constant time lookups per hand
+        self.next_match_id = 1
+        self.matches_started = 0  # Matches started since the game state was created
+        self.awaiting_players = []  # (match, player) restored from a snapshot, waiting for their hand
+
         log.debug("Initialized new game state.")
     def __str__(self):
-        return f"GameState(game_start_time={self.game_start_time}, lock_duration={self.lock_duration}, round_result={self.round_result}, game_active={self.game_active}, phase={self.phase}, pending_hands={self.pending_hands}, ready_duration={self.ready_duration}, disconnect_timeout={self.disconnect_timeout}, p1={self.p1}, p2={self.p2})"
+        return f"GameState(game_start_time={self.game_start_time}, lock_duration={self.lock_duration}, rounds_played={self.rounds_played}, phase={self.phase}, pending_hands={self.pending_hands}, ready_players={self.ready_players}, ready_duration={self.ready_duration}, disconnect_timeout={self.disconnect_timeout}, max_matches={self.max_matches}, matches={self.matches})"
     def __repr__(self):
         return self.__str__()
 
-    @property
-    def players(self):
-        """Return a dict-like interface for players for backward compatibility."""
-        return {'p1': self.p1, 'p2': self.p2}
+    def registration_open(self):
+        """
+        Check if there is room for another match.
+
+        Returns:
+            bool: True if new players can still register
+        """
+        return len(self.matches) < self.max_matches
+
+    def open_player_slots(self):
+        """
+        Get the number of players that can still register.
+
+        Returns:
+            int: Free player slots, not counting players already waiting for an opponent
+        """
+        return 2 * (self.max_matches - len(self.matches)) - len(self.ready_players)
+
+    def match_for_track(self, track_id):
+        """
+        Get the match a tracked hand is playing in.
+
+        Args:
+            track_id: Tracking ID of the hand
+
+        Returns:
+            Match or None
+        """
+        return self.match_by_track_id.get(track_id)
+
+    def create_match(self, p1, p2, now=None):
+        """
+        Start a new match between two registered players.
+
+        Args:
+            p1: Player on the left
+            p2: Player on the right
+            now: Frame timestamp (defaults to the current time)
+
+        Returns:
+            Match: The started match
+        """
+        for player in (p1, p2):
+            # Disconnect timers of the registration phase no longer apply
+            self.timers.cancel(player.disconnect_timer)
+            player.disconnect_timer = None
+        timeout_manager = PlayerTimeoutManager(self.timers, lambda now: self.match_timed_out(match, now))
+        match = Match(self.next_match_id, p1, p2, timeout_manager)
+        self.next_match_id += 1
+        self.matches_started += 1
+        self.matches.append(match)
+        self.match_by_track_id[p1.id] = match
+        self.match_by_track_id[p2.id] = match
+        match.start_game(now)
+        self.phase = GamePhase.GAME
+        event_log.emit('match_started', match.game_start_time, match_id=match.match_id, p1_id=p1.id, p2_id=p2.id)
+
+        if not self.registration_open():
+            self.pending_hands.clear()
+            log.info("Both players assigned. Starting game phase.")
+        else:
+            log.info("Match %d started: ID %s vs ID %s.", match.match_id, p1.id, p2.id)
+        return match
+
+    def end_match(self, match, now=None):
+        """
+        End a match and free its players. Returns to detection when no match is left.
 
-    def reset_game_state(self):
-        """Reset the game state to initial values."""
+        Only the state of this match is dropped: players registered or being
+        detected meanwhile keep their place for the next match.
+
+        Args:
+            match: Match to end
+            now: Frame timestamp (defaults to the current time)
+        """
+        if match not in self.matches:
+            return
+        event_log.emit('match_ended', time.time() if now is None else now, match_id=match.match_id,
+                       rounds=match.rounds_played, p1_score=match.p1.score, p2_score=match.p2.score)
+        self.matches.remove(match)
+        match.game_active = False
+        match.timeout_manager.reset()
+        for player in match.players:
+            self.timers.cancel(player.disconnect_timer)
+            player.disconnect_timer = None
+            if self.match_by_track_id.get(player.id) is match:
+                del self.match_by_track_id[player.id]
+        if self.awaiting_players:
+            self.awaiting_players = [(m, p) for m, p in self.awaiting_players if m is not match]
+
+        if not self.matches:
+            self.phase = GamePhase.DETECTION
+            log.info("Match %d ended. Returning to detection phase.", match.match_id)
+        else:
+            log.info("Match %d ended.", match.match_id)
+
+    def match_timed_out(self, match, now):
+        """
+        Timer callback: a player of the match has not been visible for too long.
+
+        Args:
+            match: Match whose timeout fired
+            now: Frame timestamp
+        """
+        log.warning("Player timeout reached. Ending match %d.", match.match_id)
+        event_log.emit('match_timed_out', now, match_id=match.match_id)
+        self.end_match(match, now)
+
+    def reset_game_state(self, now=None):
+        """
+        Reset the game state to initial values.
+
+        Args:
+            now: Frame timestamp (defaults to the current time)
+        """
         log.debug("Resetting game state.")
-        self.game_start_time = time.time()
+        self.game_start_time = time.time() if now is None else now
+        event_log.emit('game_reset', self.game_start_time)
         self.lock_duration = 5.0
-        self.round_result = ""
-        self.game_active = False
+        self.rounds_played = 0
         self.phase = GamePhase.DETECTION
 
-        # Reset players
-        del self.p1
-        del self.p2
-        self.p1 = Player()
-        self.p2 = Player()
+        # Reset matches and players, and drop all their deadlines
+        self.timers.clear()
+        self.matches = []
+        self.match_by_track_id = {}
+        self.next_match_id = 1
+        self.ready_players = {}
+        self.awaiting_players = []
 
-        self.pending_hands = {}
+        self.pending_hands.clear()
         self.ready_duration = 2.0
         self.disconnect_timeout = 120.0
 
-    def start_game(self):
-        """Start the game phase and reset scores."""
-        log.debug("Starting game.")
+
+class Match():
+    """Class to represent one match between two players."""
+
+    __slots__ = ('match_id', 'p1', 'p2', 'game_active', 'game_start_time', 'started_at', 'round_result',
+                 'rounds_played', 'timeout_manager')
+
+    def __init__(self, match_id, p1, p2, timeout_manager=None):
+        self.match_id = match_id
+        self.p1 = p1
+        self.p2 = p2
+        self.game_active = False
+        self.game_start_time = None
+        self.started_at = None  # Start time of the match_started event, kept across restores
+        self.round_result = ""
+        self.rounds_played = 0
+        self.timeout_manager = timeout_manager or PlayerTimeoutManager()
+        log.debug("Initialized new Match %d.", match_id)
+
+    def __str__(self):
+        return f"Match(match_id={self.match_id}, game_active={self.game_active}, game_start_time={self.game_start_time}, round_result={self.round_result}, rounds_played={self.rounds_played}, p1={self.p1}, p2={self.p2})"
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def players(self):
+        """Return both players as a tuple (p1, p2)."""
+        return self.p1, self.p2
+
+    def player_for(self, track_id):
+        """
+        Get the player of this match using a tracking ID.
+
+        Args:
+            track_id: Tracking ID of the hand
+
+        Returns:
+            Player or None
+        """
+        if self.p1.id == track_id:
+            return self.p1
+        if self.p2.id == track_id:
+            return self.p2
+        return None
+
+    def start_game(self, now=None):
+        """
+        Start the match and reset scores.
+
+        Args:
+            now: Frame timestamp (defaults to the current time)
+        """
+        log.debug("Starting match %d.", self.match_id)
         self.game_active = True
-        self.game_start_time = time.time()
-        
+        self.game_start_time = time.time() if now is None else now
+        self.started_at = self.game_start_time
+
         self.p1.score = 0
         self.p2.score = 0
-        self.p1.locked = None
-        self.p2.locked = None
-        self.p1.lock_start_time = None
-        self.p2.lock_start_time = None
+        self.reset_locks()
         self.round_result = ""
+        self.rounds_played = 0
 
     def reset_locks(self):
-        """
-        Reset player locks after processing a round.
-        
-        Args:
-            game_state: Current game state object
-        """
+        """Reset player locks after processing a round."""
         self.p1.locked = None
         self.p2.locked = None
         self.p1.lock_start_time = None
         self.p2.lock_start_time = None
 
-    def check_and_lock(self,current_p1, current_p2):
+    def check_and_lock(self, current_p1, current_p2, lock_duration, now=None):
         """
         Check if both players have locked their gestures.
-        
+
         Args:
             current_p1: Current sign for player 1
             current_p2: Current sign for player 2
-            game_state: Current game state object
-        
+            lock_duration: Time in seconds both signs must be held
+            now: Frame timestamp (defaults to the current time)
+
         Returns:
             bool: True if both players have locked for the required duration
         """
         p1 = self.p1
         p2 = self.p2
+        if now is None:
+            now = time.time()
 
         if current_p1 == p1.locked and \
         current_p2 == p2.locked and \
         current_p1 is not None and current_p2 is not None:
             if p1.lock_start_time is None:
-                p1.lock_start_time = time.time()
-                p2.lock_start_time = time.time()
-                log.info(f"Positions locked: P1={current_p1}, P2={current_p2}")
-            
-            elapsed = time.time() - p1.lock_start_time
-            if elapsed >= self.lock_duration:
+                p1.lock_start_time = now
+                p2.lock_start_time = now
+                log.info("Positions locked: P1=%s, P2=%s", current_p1, current_p2)
+                event_log.emit('round_lock_started', now, match_id=self.match_id,
+                               p1_sign=current_p1, p2_sign=current_p2)
+
+            elapsed = now - p1.lock_start_time
+            if elapsed >= lock_duration:
                 return True
         else:
             # Reset lock if signs changed
@@ -114,12 +288,15 @@ class GameState():
             p2.locked = current_p2
             p1.lock_start_time = None
             p2.lock_start_time = None
-        
+
         return False
 
 class Player():
     """Class to represent a player in the RPS game."""
 
+    __slots__ = ('id', 'sign', 'last_seen', 'ready', 'score', 'locked', 'lock_start_time', 'center',
+                 'disconnect_timer')
+
     def __init__(self):
         self.id = None
         self.sign = None
@@ -128,9 +305,170 @@ class Player():
         self.score = 0
         self.locked = None
         self.lock_start_time = None
+        self.center = None  # (x, y) of the hand's bounding box, when known
+        self.disconnect_timer = None  # Scheduled while the player is not visible
         log.debug("Initialized new Player.")
-    
+
     def __str__(self):
-        return f"Player(id={self.id}, sign={self.sign}, last_seen={self.last_seen}, ready={self.ready}, score={self.score}, locked={self.locked}, lock_start_time={self.lock_start_time})"
+        return f"Player(id={self.id}, sign={self.sign}, last_seen={self.last_seen}, ready={self.ready}, score={self.score}, locked={self.locked}, lock_start_time={self.lock_start_time}, center={self.center})"
     def __repr__(self):
         return self.__str__()
+
+
+class PendingHands():
+    """
+    Table of hands tracked during registration, stored column-wise.
+
+    Each hand is a row in parallel column lists (integer sign codes, times,
+    centers), found through a track ID -> row index, instead of one dict per
+    hand. Rows of removed hands are reused, so the table stops allocating once
+    it has grown. Cells only hold references to small ints and to the frame
+    timestamp shared by all hands, and per-cell access is faster than with
+    typed arrays, which box every value read. A lock start time of NaN means
+    the hand is not locking.
+
+    Disconnect and lock deadlines are timers in the shared TimerQueue, so the
+    per-frame update only touches visible hands and expired timers.
+    """
+
+    __slots__ = ('timers', 'rows', 'free_rows', 'visible', 'locked_ok', 'track_id', 'sign',
+                 'locked', 'lock_start_time', 'last_seen', 'center_x', 'center_y',
+                 'disconnect_timer', 'lock_timer')
+
+    def __init__(self, timers=None):
+        self.timers = timers if timers is not None else TimerQueue()
+        self.rows = {}  # track_id -> row
+        self.free_rows = []
+        self.visible = set()  # Track IDs seen in the last frame
+        self.locked_ok = {}  # Track IDs whose OK lock completed, in completion order
+        self.track_id = []
+        self.sign = []
+        self.locked = []
+        self.lock_start_time = []
+        self.last_seen = []
+        self.center_x = []
+        self.center_y = []
+        self.disconnect_timer = []
+        self.lock_timer = []
+
+    def __str__(self):
+        hands = {track_id: self.sign_name(track_id) for track_id in self.rows}
+        return f"PendingHands({hands})"
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, track_id):
+        return track_id in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def add(self, track_id, sign_code, now, center=None):
+        """
+        Start tracking a hand.
+
+        Args:
+            track_id: Tracking ID of the hand
+            sign_code: Integer code of the detected sign
+            now: Frame timestamp
+            center: Optional (x, y) box center
+
+        Returns:
+            int: Row of the hand
+        """
+        x, y = center if center is not None else (math.nan, math.nan)
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.track_id[row] = track_id
+            self.sign[row] = sign_code
+            self.locked[row] = NO_SIGN
+            self.lock_start_time[row] = math.nan
+            self.last_seen[row] = now
+            self.center_x[row] = x
+            self.center_y[row] = y
+            self.disconnect_timer[row] = None
+            self.lock_timer[row] = None
+        else:
+            row = len(self.track_id)
+            self.track_id.append(track_id)
+            self.sign.append(sign_code)
+            self.locked.append(NO_SIGN)
+            self.lock_start_time.append(math.nan)
+            self.last_seen.append(now)
+            self.center_x.append(x)
+            self.center_y.append(y)
+            self.disconnect_timer.append(None)
+            self.lock_timer.append(None)
+        self.rows[track_id] = row
+        self.visible.add(track_id)
+        return row
+
+    def remove(self, track_id):
+        """
+        Stop tracking a hand and cancel its timers.
+
+        Args:
+            track_id: Tracking ID of the hand
+        """
+        row = self.rows.pop(track_id)
+        self._release(row)
+        self.visible.discard(track_id)
+        self.locked_ok.pop(track_id, None)
+
+    def clear(self):
+        """Remove all hands, keeping the allocated rows for reuse."""
+        for row in self.rows.values():
+            self._release(row)
+        self.rows.clear()
+        self.visible.clear()
+        self.locked_ok.clear()
+
+    def _release(self, row):
+        """Cancel the timers of a row and mark it for reuse."""
+        self.timers.cancel(self.disconnect_timer[row])
+        self.timers.cancel(self.lock_timer[row])
+        self.disconnect_timer[row] = None
+        self.lock_timer[row] = None
+        self.free_rows.append(row)
+    def sign_name(self, track_id):
+        """
+        Get the detected sign of a hand.
+
+        Args:
+            track_id: Tracking ID of the hand
+
+        Returns:
+            str: Sign name
+        """
+        return CLASS_NAMES[self.sign[self.rows[track_id]]]
+
+    def center(self, track_id):
+        """
+        Get the box center of a hand.
+
+        Args:
+            track_id: Tracking ID of the hand
+
+        Returns:
+            tuple: (x, y), or None if unknown
+        """
+        row = self.rows[track_id]
+        x = self.center_x[row]
+        if math.isnan(x):
+            return None
+        return x, self.center_y[row]
+
+    def set_center(self, row, center):
+        """
+        Update the box center of a hand.
+
+        Args:
+            row: Row of the hand
+            center: (x, y) box center, or None if unknown
+        """
+        x, y = center if center is not None else (math.nan, math.nan)
+        self.center_x[row] = x
+        self.center_y[row] = y
@@ -0,0 +1,2 @@
+"""Instrumentation module for tracing and profiling the frame pipeline."""
+
@@ -0,0 +1,119 @@
+"""
+Frame latency measurement module.
+Stamps frames at capture and reports capture-to-display latency distributions.
+"""
+import collections
+import time
+from clock import SystemClock
+from config import log
+
+
+class FrameStamp:
+    """Capture metadata carried by a frame through the main loop."""
+
+    __slots__ = ('seq', 'capture_time', 'capture_wall_time')
+
+    def __init__(self, seq, capture_time, capture_wall_time):
+        self.seq = seq
+        self.capture_time = capture_time  # time.perf_counter() when the frame was read
+        self.capture_wall_time = capture_wall_time  # clock time, shared by all game logic for the frame
+
+    def __str__(self):
+        return f"FrameStamp(seq={self.seq}, capture_time={self.capture_time}, capture_wall_time={self.capture_wall_time})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def percentile(sorted_values, fraction):
+    """
+    Get a percentile from an already sorted list using linear interpolation.
+    
+    Args:
+        sorted_values: Values sorted in ascending order
+        fraction: Percentile as a fraction (0.0 to 1.0)
+    
+    Returns:
+        float: Interpolated percentile value
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+class LatencyMonitor:
+    """Assigns sequence numbers to frames and collects capture-to-display latencies."""
+
+    def __init__(self, window=1000, clock=None):
+        """
+        Initialize the latency monitor.
+        
+        Args:
+            window: Number of most recent frames used for the distribution
+            clock: Clock providing frame timestamps (defaults to SystemClock)
+        """
+        self.clock = clock or SystemClock()
+        self.next_seq = 0
+        self._latencies = collections.deque(maxlen=window)
+
+    def stamp_capture(self):
+        """
+        Stamp a frame that was just captured.
+        
+        Returns:
+            FrameStamp: Stamp to carry with the frame
+        """
+        stamp = FrameStamp(self.next_seq, time.perf_counter(), self.clock.now())
+        self.next_seq += 1
+        return stamp
+
+    def mark_displayed(self, stamp):
+        """
+        Record that a frame has been shown on screen.
+        
+        Args:
+            stamp: FrameStamp of the displayed frame
+        
+        Returns:
+            float: Capture-to-display latency in seconds
+        """
+        latency = time.perf_counter() - stamp.capture_time
+        self._latencies.append(latency)
+        return latency
+
+    def summary(self):
+        """
+        Summarize the latency distribution over the recent window.
+        
+        Returns:
+            dict: Frame count and latency statistics in milliseconds
+        """
+        values = sorted(self._latencies)
+        if not values:
+            return {'frames': 0}
+        return {
+            'frames': len(values),
+            'min_ms': values[0] * 1000,
+            'mean_ms': sum(values) / len(values) * 1000,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p90_ms': percentile(values, 0.90) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': values[-1] * 1000,
+        }
+
+    def report(self):
+        """Log the current latency distribution."""
+        stats = self.summary()
+        if not stats['frames']:
+            log.info("Latency: no frames displayed yet.")
+            return
+        log.info(
+            "Capture-to-display latency over %d frames: "
+            "min=%.1fms mean=%.1fms p50=%.1fms p90=%.1fms p99=%.1fms max=%.1fms",
+            stats['frames'], stats['min_ms'], stats['mean_ms'], stats['p50_ms'],
+            stats['p90_ms'], stats['p99_ms'], stats['max_ms']
+        )
@@ -0,0 +1,158 @@
+"""
+Queued logging module.
+Moves log handler I/O to a background thread and rate-limits noisy call sites.
+"""
+import atexit
+import enum
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Argument types that can be formatted later on the listener thread without copying
+_DEFERRABLE_ARGS = (str, int, float, bool, type(None), enum.Enum)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site (file and line of the log call).
+
+    Each call site may emit `burst` records at once and `burst` records per
+    `interval` seconds on average. Dropped records are counted and the count
+    is appended to the next record emitted from the same call site. Records at
+    ERROR and above are never dropped.
+    """
+
+    def __init__(self, burst=5, interval=1.0):
+        """
+        Initialize the filter.
+
+        Args:
+            burst: Records a call site may emit without waiting
+            interval: Seconds over which `burst` records are refilled
+        """
+        super().__init__()
+        self.burst = burst
+        self.rate = burst / interval
+        self._sites = {}  # (pathname, lineno) -> [tokens, last record time, suppressed]
+
+    def __str__(self):
+        return f"RateLimitFilter(burst={self.burst}, rate={self.rate}/s, sites={len(self._sites)})"
+    def __repr__(self):
+        return self.__str__()
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.pathname, record.lineno)
+        site = self._sites.get(key)
+        if site is None:
+            self._sites[key] = [self.burst - 1, record.created, 0]
+            return True
+
+        site[0] = min(self.burst, site[0] + (record.created - site[1]) * self.rate)
+        site[1] = record.created
+        if site[0] < 1:
+            site[2] += 1
+            return False
+        site[0] -= 1
+        if site[2]:
+            record.msg = f"{record.getMessage()} ({site[2]} similar messages suppressed)"
+            record.args = None
+            site[2] = 0
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the caller.
+
+    Messages whose arguments are plain values are formatted by the listener
+    thread. Other arguments may change after the call, so those messages are
+    formatted before they are queued. When the queue is full the record is
+    dropped and counted instead of waiting for the writer.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def __str__(self):
+        return f"NonBlockingQueueHandler(dropped={self.dropped})"
+    def __repr__(self):
+        return self.__str__()
+
+    def prepare(self, record):
+        args = record.args
+        deferrable = not args or (isinstance(args, tuple) and all(isinstance(arg, _DEFERRABLE_ARGS) for arg in args))
+        if deferrable and not record.exc_info:
+            return record
+
+        # Copy so handlers on other loggers still see the original record
+        prepared = logging.makeLogRecord(record.__dict__)
+        if not deferrable:
+            prepared.msg = record.getMessage()
+            prepared.args = None
+        if record.exc_info:
+            # Tracebacks reference live frames, render them on this thread
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def start_queued_logging(logger, queue_size=10000, burst=5, interval=1.0):
+    """
+    Move the handlers of a logger behind a queue served by a background thread.
+
+    The logger keeps a single NonBlockingQueueHandler with a RateLimitFilter,
+    and its previous handlers are served by a QueueListener that honours their
+    levels. The listener is stopped, and the queue flushed, at interpreter exit.
+
+    Args:
+        logger: Logger whose handlers should write in the background
+        queue_size: Maximum number of queued records before records are dropped
+        burst: Records a call site may emit without waiting
+        interval: Seconds over which `burst` records are refilled
+
+    Returns:
+        QueueListener: The started listener
+    """
+    handlers = list(logger.handlers)
+    for handler in handlers:
+        logger.removeHandler(handler)
+
+    log_queue = queue.Queue(queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(burst, interval))
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_queued_logging, logger, listener)
+    return listener
+
+
+def stop_queued_logging(logger, listener):
+    """
+    Flush queued records and stop the background writer.
+
+    Args:
+        logger: Logger passed to start_queued_logging
+        listener: Listener returned by start_queued_logging
+    """
+    if listener._thread is None:
+        return  # Already stopped
+    listener.stop()
+    for handler in logger.handlers:
+        if isinstance(handler, NonBlockingQueueHandler) and handler.dropped:
+            # The listener is stopped, write the notice directly
+            record = logger.makeRecord(logger.name, logging.WARNING, __file__, 0,
+                                       f"Dropped {handler.dropped} log records because the log queue was full.",
+                                       None, None)
+            for target in listener.handlers:
+                target.handle(record)
@@ -0,0 +1,191 @@
+"""
+Frame pipeline tracer module.
+Records begin/end spans into a ring buffer and exports Chrome Trace Event JSON.
+"""
+import collections
+import json
+import os
+import threading
+import time
+from config import log
+
+
+class _NullSpan:
+    """No-op span returned when tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Context manager that records one complete span on exit."""
+
+    __slots__ = ('tracer', 'name', 'args', 'start_ns')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.record(self.name, self.start_ns, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Tracer:
+    """
+    Opt-in span tracer for the frame pipeline.
+
+    Spans are kept in a bounded ring buffer so tracing can stay enabled for
+    long sessions; only the most recent `capacity` spans are exported.
+    """
+
+    DEFAULT_CAPACITY = 200000
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=False):
+        """
+        Initialize the tracer.
+
+        Args:
+            capacity: Maximum number of spans kept in the ring buffer
+            enabled: True to start recording immediately
+        """
+        self.enabled = enabled
+        self._events = collections.deque(maxlen=capacity)
+        self._thread_names = {}
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self, capacity=None):
+        """
+        Start recording spans.
+
+        Args:
+            capacity: Optional new ring buffer size (clears recorded spans)
+        """
+        if capacity is not None and capacity != self._events.maxlen:
+            self._events = collections.deque(maxlen=capacity)
+        self.enabled = True
+        log.info("Tracing enabled (capacity=%d spans).", self._events.maxlen)
+
+    def disable(self):
+        """Stop recording spans, keeping the ones already recorded."""
+        self.enabled = False
+
+    def clear(self):
+        """Drop all recorded spans."""
+        self._events.clear()
+
+    def span(self, name, **args):
+        """
+        Create a span context manager for a pipeline stage.
+
+        Args:
+            name: Stage name shown in the trace viewer
+            **args: Optional values attached to the span
+
+        Returns:
+            Context manager recording the span, or a no-op when disabled
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def record(self, name, start_ns, end_ns, args=None):
+        """
+        Record a finished span.
+
+        Args:
+            name: Stage name
+            start_ns: Start timestamp from time.perf_counter_ns()
+            end_ns: End timestamp from time.perf_counter_ns()
+            args: Optional dictionary of values attached to the span
+        """
+        if not self.enabled:
+            return
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        # deque.append is atomic, so worker threads can record without a lock
+        self._events.append((name, start_ns, end_ns - start_ns, tid, args))
+
+    def instant(self, name, **args):
+        """
+        Record a zero-length marker event.
+
+        Args:
+            name: Marker name
+            **args: Optional values attached to the marker
+        """
+        if self.enabled:
+            now = time.perf_counter_ns()
+            self.record(name, now, now, args)
+
+    def __len__(self):
+        return len(self._events)
+
+    def to_chrome_trace(self):
+        """
+        Build a Chrome Trace Event document from the recorded spans.
+
+        Returns:
+            dict: Document with a 'traceEvents' list, loadable by Perfetto
+        """
+        pid = os.getpid()
+        origin = self._origin_ns
+        events = [
+            {'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+             'args': {'name': 'rps-game'}}
+        ]
+        for tid, thread_name in list(self._thread_names.items()):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': thread_name}})
+
+        for name, start_ns, dur_ns, tid, args in list(self._events):
+            event = {
+                'name': name,
+                'ph': 'X',
+                'ts': (start_ns - origin) / 1000.0,
+                'dur': dur_ns / 1000.0,
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = args
+            events.append(event)
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path):
+        """
+        Write the recorded spans as Chrome Trace Event JSON.
+
+        Args:
+            path: Output file path (open it in https://ui.perfetto.dev)
+
+        Returns:
+            int: Number of spans written
+        """
+        document = self.to_chrome_trace()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(document, f, default=str)
+        count = len(self._events)
+        log.info("Wrote %d trace spans to %s", count, path)
+        return count
+
+
+# Shared tracer used by the main loop and worker threads (disabled by default)
+tracer = Tracer()
@@ -2,26 +2,74 @@
 Main entry point for the RPS game.
 Handles the main game loop and coordinates all modules.
 """
-import cv2
-from config import log, WINDOW_NAME
-from game_state import GamePhase, GameState
-from detection.yolo_handler import initialize_model_and_capture, process_detections
-from detection.hand_tracking import update_player_detection
-from game.phases import update_game_phase
-from game.player_timeout import PlayerTimeoutManager
-from ui.bounding_boxes import draw_custom_bounding_boxes
-from ui.hud import draw_hud
-from ui.display import resize_to_window
+import argparse
+import sys
+from clock import SimulatedClock, SystemClock
+from config import log, setup_logging, WINDOW_NAME
+from game_state import GameState
+from game.event_log import event_log
+from game.phases import update_game
+from frame_view import build_frame_view
+from instrumentation.tracer import tracer
+from instrumentation.latency import LatencyMonitor
 
+# cv2, numpy and ultralytics are imported once the arguments are parsed, so
+# --help and a bad argument return immediately
 
-def handle_keyboard_input(key, game_state, timeout_manager):
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+    
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Rock-Paper-Scissors game with YOLO hand tracking.")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="Record pipeline spans and write Chrome Trace JSON to FILE "
+                             "(press 'T' to write on demand, also written on exit)")
+    parser.add_argument('--trace-capacity', type=int, default=tracer.DEFAULT_CAPACITY,
+                        help="Number of most recent spans kept in the trace ring buffer")
+    parser.add_argument('--latency-report', type=int, default=0, metavar='N',
+                        help="Log the capture-to-display latency distribution every N frames "
+                             "(always logged on exit)")
+    parser.add_argument('--timestamp-overlay', action='store_true',
+                        help="Draw frame sequence number and capture/display times on each frame "
+                             "for filming glass-to-glass latency")
+    parser.add_argument('--events', metavar='DIR',
+                        help="Append game events (registrations, locks, round results, disconnects) "
+                             "to JSONL segment files in DIR")
+    parser.add_argument('--leaderboard', metavar='DB',
+                        help="Store matches, player sessions and rounds in the SQLite database DB "
+                             "and show the best sessions during registration")
+    parser.add_argument('--snapshot', metavar='FILE',
+                        help="Save running matches to FILE every second and resume them on the next start "
+                             "if the game crashed less than a disconnect timeout ago")
+    parser.add_argument('--record', metavar='DIR',
+                        help="Record per-frame detections to DIR for later replay")
+    parser.add_argument('--replay', metavar='DIR',
+                        help="Replay recorded detections from DIR instead of running the model and webcam")
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help="Replay speed relative to the recording (0 = as fast as possible)")
+    parser.add_argument('--max-matches', type=int, default=1,
+                        help="Number of matches that can be played at the same time in front of the camera")
+    parser.add_argument('--max-pair-distance', type=float, default=None, metavar='PIXELS',
+                        help="Only pair neighbouring players whose hands are at most PIXELS apart")
+    return parser.parse_args(argv)
+
+
+def handle_keyboard_input(key, game_state, trace_path=None, now=None):
     """
     Handle keyboard input and perform corresponding actions.
     
     Args:
         key: Key code from cv2.waitKey()
         game_state: Current game state object
-        timeout_manager: PlayerTimeoutManager instance
+        trace_path: Output path for the trace dump, None if tracing is off
+        now: Frame timestamp (defaults to the current time)
     
     Returns:
         bool: True if the application should continue, False if it should quit
@@ -33,75 +81,168 @@ def handle_keyboard_input(key, game_state, timeout_manager):
         return False
     elif key_char == ord('r'):
         log.info("Reset key pressed. Resetting game state.")
-        game_state.reset_game_state()
-        timeout_manager.reset()
+        game_state.reset_game_state(now)
     elif key_char == ord('h'):
         log.info("Help key pressed. Toggling help UI.")
         game_state.help_ui_visible = not game_state.help_ui_visible
+    elif key_char == ord('t') and trace_path:
+        log.info("Trace key pressed. Writing trace file.")
+        tracer.write(trace_path)
 
     return True
 
 
-def main():
-    """Main game loop."""
+def open_frame_source(args, latency_monitor):
+    """
+    Open the live webcam source or a detection replay.
+    
+    Args:
+        args: Parsed command line arguments
+        latency_monitor: LatencyMonitor stamping each frame
+    
+    Returns:
+        tuple: (frames iterator, width, height, release callable), or None on failure
+    """
+    import cv2
+    from detection.recording import DetectionReplay
+    from detection.yolo_handler import initialize_model_and_capture, track_frames
+    from ui.display import create_window
+    
+    if args.replay:
+        replay = DetectionReplay(args.replay)
+        w, h = replay.frame_size
+        create_window(WINDOW_NAME, w, h)
+        log.info("Replaying %d recorded frames from %s.", len(replay), args.replay)
+        frames = replay.frames(latency_monitor.stamp_capture, args.replay_speed, latency_monitor.clock)
+        return frames, w, h, lambda: None
+    
     # Initialize model and capture
     model, w, h = initialize_model_and_capture()
-    game_state = GameState()
-    timeout_manager = PlayerTimeoutManager()
-    
-    # Configuration
-    box_padding = 0  # Adjust this to change bounding box size (pixels to expand)
     
     # Open webcam
     cap = cv2.VideoCapture(0)
     if not cap.isOpened():
         log.error("Failed to open webcam for tracking.")
-        return
+        return None
     
     log.info("Starting tracking loop with manual frame capture.")
+    return track_frames(model, cap, latency_monitor.stamp_capture), w, h, cap.release
+
+
+def main(argv=None):
+    """Main game loop."""
+    args = parse_args(argv)
+    setup_logging()
+    import cv2
+    from detection.recording import DetectionRecorder
+    from detection.yolo_handler import process_detections
+    from ui.bounding_boxes import draw_custom_bounding_boxes
+    from ui.hud import draw_hud, draw_timestamp_overlay
+    from ui.display import resize_to_window
+    
+    if args.trace:
+        tracer.enable(args.trace_capacity)
+
+    # Replays run game logic on the recorded timestamps
+    clock = SimulatedClock() if args.replay else SystemClock()
+    latency_monitor = LatencyMonitor(clock=clock)
+    
+    # Configuration
+    box_padding = 0  # Adjust this to change bounding box size (pixels to expand)
+    
+    source = open_frame_source(args, latency_monitor)
+    if source is None:
+        return
+    frames, w, h, release = source
+    recorder = DetectionRecorder(args.record, w, h) if args.record else None
+    if args.events:
+        event_log.open(args.events)
+    leaderboard = None
+    if args.leaderboard:
+        from game.leaderboard import Leaderboard
+        leaderboard = Leaderboard(args.leaderboard)
+        event_log.attach(leaderboard)
+    # Restored after the event sinks are attached, so they receive the match_restored events
+    game_state = None
+    if args.snapshot:
+        from game.snapshot import SnapshotWriter, load_snapshot, restore_game_state
+        snapshot = load_snapshot(args.snapshot, clock.now())
+        if snapshot is not None:
+            game_state = restore_game_state(snapshot, clock.now(), args.max_matches)
+    if game_state is None:
+        game_state = GameState(clock.now(), args.max_matches)
+    game_state.max_pair_distance = args.max_pair_distance
+    snapshot_writer = SnapshotWriter(args.snapshot) if args.snapshot else None
     
     try:
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                log.warning("Failed to read frame from webcam.")
-                break
-            
-            # Run YOLO tracking
-            results = model.track(frame, persist=True, verbose=False)
-            img = frame.copy()
+            with tracer.span('frame'):
+                item = next(frames, None)
+                if item is None:
+                    break
+                stamp, frame, results = item
+                now = stamp.capture_wall_time  # single timestamp for all logic and rendering of this frame
+                img = frame.copy()
             
-            # Process each result
-            for result in results:
-                # Draw bounding boxes
-                img = draw_custom_bounding_boxes(img, result, game_state, box_padding)
+                # Process each result
+                for result in results:
+                    if recorder:
+                        recorder.record(result, stamp.capture_wall_time)
+
+                    # Process detections
+                    with tracer.span('process_detections'):
+                        centers_by_id = {}
+                        signs_by_id = process_detections(result, img.shape[1], centers_by_id)
+                
+                    # Update running matches and register new players
+                    with tracer.span('game_logic', phase=game_state.phase.value,
+                                     matches=len(game_state.matches)):
+                        update_game(signs_by_id, game_state, now, centers_by_id)
+                        if snapshot_writer:
+                            snapshot_writer.maybe_write(game_state, now)
                 
-                # Process detections
-                signs_by_id = process_detections(result, img.shape[1])
+                    # Derive what to show once, renderers only read the view
+                    with tracer.span('frame_view'):
+                        view = build_frame_view(game_state, now, leaderboard.top if leaderboard else ())
                 
-                # Update game state based on phase
-                if game_state.phase == GamePhase.DETECTION:
-                    update_player_detection(signs_by_id, game_state)
-                else:
-                    update_game_phase(signs_by_id, game_state, timeout_manager)
+                    # Draw bounding boxes
+                    with tracer.span('draw_boxes'):
+                        img = draw_custom_bounding_boxes(img, result, view, box_padding)
                 
-                # Draw HUD
-                img = draw_hud(img, game_state, timeout_manager)
+                    # Draw HUD
+                    with tracer.span('draw_hud'):
+                        img = draw_hud(img, view)
+                        if args.timestamp_overlay:
+                            img = draw_timestamp_overlay(img, stamp)
                 
-                # Display image
-                display_img = resize_to_window(img, WINDOW_NAME, w, h)
-                cv2.imshow(WINDOW_NAME, display_img)
+                    # Display image
+                    with tracer.span('display', seq=stamp.seq):
+                        display_img = resize_to_window(img, WINDOW_NAME, w, h)
+                        cv2.imshow(WINDOW_NAME, display_img)
                 
-                # Handle keyboard input
-                key = cv2.waitKey(1)
-                if key != -1:  # Only process if a key was pressed
-                    if not handle_keyboard_input(key, game_state, timeout_manager):
-                        return
+                    # Handle keyboard input (also paints the window)
+                    with tracer.span('wait_key'):
+                        key = cv2.waitKey(1)
+                    latency_monitor.mark_displayed(stamp)
+                    if args.latency_report and (stamp.seq + 1) % args.latency_report == 0:
+                        latency_monitor.report()
+                    if key != -1:  # Only process if a key was pressed
+                        if not handle_keyboard_input(key, game_state, args.trace, now):
+                            return
     
     finally:
-        cap.release()
+        release()
         cv2.destroyAllWindows()
         log.info("Tracking loop ended.")
+        if recorder:
+            recorder.close()
+        event_log.close()
+        if snapshot_writer:
+            # Keep the snapshot only if the loop ended with an exception
+            snapshot_writer.close(remove=sys.exc_info()[0] is None)
+        latency_monitor.report()
+        if args.trace:
+            tracer.write(args.trace)
 
 
 if __name__ == "__main__":
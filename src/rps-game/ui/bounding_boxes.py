@@ -3,45 +3,7 @@ Bounding box drawing module.
 Handles drawing of detection boxes with lock state visualization.
 """
 import cv2
-import time
-from config import CLASS_NAMES, CLASS_COLORS, BOX_COLOR, TEXT_FONT, THUMB_UP
-from detection.hand_tracking import get_pending_hand_lock_state, get_lock_progress
-from game_state import GamePhase, GameState
-
-
-def get_lock_progress_for_track(track_id, class_name, game_state):
-    """
-    Get lock progress percentage for a tracked detection.
-    Handles both detection and game phases uniformly.
-    
-    Args:
-        track_id: Tracking ID of the detection
-        class_name: Detected class name
-        game_state: Current game state object
-    
-    Returns:
-        float: Progress percentage (0.0 to 100.0)
-    """
-    if game_state.phase == GamePhase.DETECTION:
-        if track_id in game_state.pending_hands:
-            return get_lock_progress(track_id, game_state)
-        return 100.0  # Not tracking, show 100%
-
-    elif game_state.phase == GamePhase.GAME:
-        # Check if this track_id belongs to a player and is currently locking
-        if game_state.p1.id == track_id:
-            if game_state.p1.locked == class_name and game_state.p1.lock_start_time:
-                elapsed = time.time() - game_state.p1.lock_start_time
-                progress = min(100, (elapsed / game_state.lock_duration) * 100)
-                return progress
-        elif game_state.p2.id == track_id:
-            if game_state.p2.locked == class_name and game_state.p2.lock_start_time:
-                elapsed = time.time() - game_state.p2.lock_start_time
-                progress = min(100, (elapsed / game_state.lock_duration) * 100)
-                return progress
-        return 100.0  # Not locking, show 100%
-    
-    return 100.0
+from config import CLASS_NAMES, CLASS_COLORS, BOX_COLOR, TEXT_FONT
 
 
 def draw_progress_bar(img, x, y, progress_percent, bar_length=12, 
@@ -99,14 +61,13 @@ def draw_lock_progress_bar(img, x1, y2, progress_percent):
     return draw_progress_bar(img, bar_x, bar_y, progress_percent)
 
 
-def get_box_color_and_thickness(track_id, class_name, game_state):
+def get_box_color_and_thickness(track_view, class_name):
     """
-    Determine box color and thickness based on phase and lock state.
+    Determine box color and thickness based on lock state.
     
     Args:
-        track_id: Tracking ID of the detection
+        track_view: TrackView of the detection, or None if untracked
         class_name: Detected class name
-        game_state: Current game state object
     
     Returns:
         tuple: (color, thickness)
@@ -114,8 +75,9 @@ def get_box_color_and_thickness(track_id, class_name, game_state):
     color = CLASS_COLORS.get(class_name, BOX_COLOR)
     thickness = 1
     
-    if game_state.phase == 'detection' and track_id in game_state.pending_hands:
-        lock_state = get_pending_hand_lock_state(track_id, game_state)
+    # Pending hands are colored by lock state while registering
+    if track_view is not None and track_view.slot is None:
+        lock_state = track_view.lock_state
         if lock_state == 'locking':
             color = (0, 255, 255)  # Yellow for locking
             thickness = 3
@@ -132,7 +94,7 @@ def get_box_color_and_thickness(track_id, class_name, game_state):
     return color, thickness
 
 
-def build_detection_label(class_name, conf, track_id, game_state: GameState):
+def build_detection_label(class_name, conf, track_id, track_view):
     """
     Build label text for a detection box.
     
@@ -140,7 +102,7 @@ def build_detection_label(class_name, conf, track_id, game_state: GameState):
         class_name: Detected class name
         conf: Confidence score
         track_id: Tracking ID
-        game_state: Current game state object
+        track_view: TrackView of the detection, or None
     
     Returns:
         str: Label text
@@ -148,23 +110,23 @@ def build_detection_label(class_name, conf, track_id, game_state: GameState):
     label = f"{class_name} {conf:.2f}"
     
     if track_id is not None:
-        if game_state.p1.id == track_id:
-            return f"P1 {label}"
-        elif game_state.p2.id == track_id:
-            return f"P2 {label}"
-        else:
+        if track_view is None or track_view.slot is None:
             return f"ID:{track_id} {label}"
+        elif track_view.slot == 'READY':
+            return f"READY ID:{track_id} {label}"
+        else:
+            return f"{track_view.slot} {label}"
     return label
 
 
-def draw_custom_bounding_boxes(img, result, game_state : GameState, box_padding):
+def draw_custom_bounding_boxes(img, result, view, box_padding):
     """
     Draw custom bounding boxes with lock state visualization.
     
     Args:
         img: Image to draw on
         result: YOLO result object
-        game_state: Current game state object
+        view: FrameView of the frame
         box_padding: Padding to add to bounding boxes (pixels)
     
     Returns:
@@ -190,30 +152,24 @@ def draw_custom_bounding_boxes(img, result, game_state : GameState, box_padding)
         track_id = None
         if hasattr(box, 'id') and box.id is not None:
             track_id = int(box.id[0].cpu().numpy())
-        
-
-       #if game_state.phase == GamePhase.GAME and game_state.p1.id != track_id and game_state.p2.id != track_id:
-       #    continue  # Skip drawing boxes not belonging to players
+        track_view = view.tracks.get(track_id)
 
         # Get color and thickness
-        color, thickness = get_box_color_and_thickness(track_id, class_name, game_state)
+        color, thickness = get_box_color_and_thickness(track_view, class_name)
         
         # Draw box
         cv2.rectangle(img, (int(x1), int(y1)), (int(x2), int(y2)), color, thickness)
         
         # Build label
-        label = build_detection_label(class_name, conf, track_id, game_state)
+        label = build_detection_label(class_name, conf, track_id, track_view)
         # Draw label
         cv2.putText(img, label, (int(x1), int(y1) - 10),TEXT_FONT, 0.5, color, 1)
         
         # Draw unified lock progress bar (always shown, 100% if not locking)
         if track_id is not None:
-            progress = get_lock_progress_for_track(track_id, class_name, game_state)
+            progress = track_view.progress if track_view is not None else 100.0
             draw_lock_progress_bar(img, x1, y2, progress)
-            if track_id == game_state.p1.id:
-                cv2.putText(img, f"SCORE {game_state.p1.score}", (int(x1), int(y2) - 10),  TEXT_FONT, 0.5, color, 1)
-            if track_id == game_state.p2.id:
-                cv2.putText(img, f"SCORE {game_state.p2.score}", (int(x1), int(y2) - 10),  TEXT_FONT, 0.5, color, 1)
+            if track_view is not None and track_view.score is not None:
+                cv2.putText(img, f"SCORE {track_view.score}", (int(x1), int(y2) - 10),  TEXT_FONT, 0.5, color, 1)
     
     return img
-
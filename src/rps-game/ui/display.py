@@ -113,23 +113,33 @@ def display_bottom_centered_info(frame, text, bottom_offset=30):
     return draw_text_with_transparent_bg(frame, text, (x, y))
 
 
-def resize_to_window(img, window_name, original_w, original_h):
+def create_window(window_name, w, h):
     """
-    Resize image to fit window while maintaining aspect ratio.
+    Create a resizable OpenCV window.
     
     Args:
-        img: Image to resize
         window_name: OpenCV window name
+        w: Initial window width
+        h: Initial window height
+    """
+    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+    cv2.resizeWindow(window_name, w, h)
+
+
+def fit_to_window(img, win_w, win_h, original_w, original_h):
+    """
+    Scale image into a window-sized canvas while maintaining aspect ratio.
+    
+    Args:
+        img: Image to resize
+        win_w: Window width in pixels
+        win_h: Window height in pixels
         original_w: Original image width
         original_h: Original image height
     
     Returns:
         Resized image with padding if needed
     """
-    rect = cv2.getWindowImageRect(window_name)
-    win_w = rect[2]
-    win_h = rect[3]
-    
     if win_w > 0 and win_h > 0:
         scale = min(win_w / original_w, win_h / original_h)
         new_w = int(original_w * scale)
@@ -144,3 +154,19 @@ def resize_to_window(img, window_name, original_w, original_h):
     
     return img
 
+
+def resize_to_window(img, window_name, original_w, original_h):
+    """
+    Resize image to fit window while maintaining aspect ratio.
+    
+    Args:
+        img: Image to resize
+        window_name: OpenCV window name
+        original_w: Original image width
+        original_h: Original image height
+    
+    Returns:
+        Resized image with padding if needed
+    """
+    rect = cv2.getWindowImageRect(window_name)
+    return fit_to_window(img, rect[2], rect[3], original_w, original_h)
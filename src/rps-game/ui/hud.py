@@ -9,19 +9,21 @@ from config import (HEADING1_HEIGHT, HEADING2_HEIGHT, HEADING3_HEIGHT,
 from ui.display import (display_info, display_centered_info,
                        display_bottom_info, display_bottom_centered_info)
 from ui.bounding_boxes import draw_progress_bar
-from game_state import GamePhase, GameState
+from game_state import GamePhase
+from frame_view import FrameView, MatchView
 
-def draw_help_ui(img, game_state: GameState):
+def draw_help_ui(img, view: FrameView):
     """
     Draw help UI overlay.
     
     Args:
         img: Image to draw on
+        view: FrameView of the frame
     
     Returns:
         Modified image
     """
-    if not game_state.help_ui_visible:
+    if not view.help_ui_visible:
         return display_bottom_info(img, "Press 'H' for Help", (10, HEADING2_HEIGHT))
     
     h_img, w_img = img.shape[:2]
@@ -37,20 +39,17 @@ def draw_help_ui(img, game_state: GameState):
     
     return img
 
-def draw_detection_phase_hud(img, game_state):
+def draw_detection_phase_hud(img, view: FrameView):
     """
     Draw HUD for detection phase.
     
     Args:
         img: Image to draw on
-        game_state: Current game state object
+        view: FrameView of the frame
     
     Returns:
         Modified image
     """
-    players = game_state.players
-    pending_hands = game_state.pending_hands
-    
     img = display_centered_info(img, "Player Detection Phase - Lock to Register",
                                HEADING1_HEIGHT)
     
@@ -62,8 +61,7 @@ def draw_detection_phase_hud(img, game_state):
     img = display_info(img, "Pending Hands:", (10, y_offset))
     y_offset += 30
     
-    for track_id, hand_data in pending_hands.items():
-        sign = hand_data['sign']
+    for track_id, sign in view.pending_hands:
         status = f"ID:{track_id} - {sign}"
         img = display_info(img, status, (10, y_offset))
         y_offset += 25
@@ -71,26 +69,49 @@ def draw_detection_phase_hud(img, game_state):
     # Instructions
     img = display_bottom_centered_info(img, "Show a THUMBS UP and hold position to register", HEADING1_HEIGHT)
     
+    return draw_leaderboard(img, view)
+
+
+def draw_leaderboard(img, view: FrameView):
+    """
+    Draw the best player sessions in the top right corner.
+    
+    Args:
+        img: Image to draw on
+        view: FrameView of the frame
+    
+    Returns:
+        Modified image
+    """
+    if not view.leaderboard:
+        return img
+    
+    x = img.shape[1] - 220
+    y_offset = HEADING2_HEIGHT + 10
+    img = display_info(img, "Leaderboard:", (x, y_offset))
+    for rank, entry in enumerate(view.leaderboard, start=1):
+        y_offset += 25
+        img = display_info(img, f"{rank}. Session {entry.session_id} - {entry.wins} wins", (x, y_offset))
     return img
 
 
-def draw_timeout_timer(img, timeout_manager):
+def draw_timeout_timer(img, match_view: MatchView):
     """
     Draw timeout timer in center bottom of screen.
     
     Args:
         img: Image to draw on
-        timeout_manager: PlayerTimeoutManager instance
+        match_view: MatchView of the match whose timeout is shown
     
     Returns:
         Modified image
     """
-    if not timeout_manager.is_active():
+    if not match_view.timeout_active:
         return img
     
     h_img, w_img = img.shape[:2]
-    remaining_time = timeout_manager.get_remaining_time()
-    progress = timeout_manager.get_progress_percent()
+    remaining_time = match_view.timeout_remaining
+    progress = match_view.timeout_progress
     
     # Position: center bottom
     bar_length = 20
@@ -103,7 +124,7 @@ def draw_timeout_timer(img, timeout_manager):
     
     # Draw time remaining text
     time_text = f"Player not visible: {remaining_time:.1f}s"
-    if timeout_manager.should_show_warning():
+    if match_view.timeout_warning:
         time_text = f"WARNING: Resetting in {remaining_time:.1f}s"
     
     img = display_bottom_centered_info(img, time_text, HEADING1_HEIGHT)
@@ -111,66 +132,153 @@ def draw_timeout_timer(img, timeout_manager):
     return img
 
 
-def draw_game_phase_hud(img, game_state: GameState, timeout_manager):
+def draw_match_hud(img, match_view: MatchView):
     """
-    Draw HUD for game phase.
+    Draw HUD of a single match using the whole screen.
     
     Args:
         img: Image to draw on
-        game_state: Current game state object
-        timeout_manager: PlayerTimeoutManager instance
+        match_view: MatchView of the match
     
     Returns:
         Modified image
     """
     h_img, w_img = img.shape[:2]
-    p1 = game_state.p1
-    p2 = game_state.p2
     
-    if not game_state.game_active:
+    if not match_view.game_active:
         img = display_centered_info(img, "Game Ready - Show OK to begin",
                                    HEADING1_HEIGHT)
     else:
-        elapsed_time = int(time.time() - game_state.game_start_time)
-        if p1.id is not None:
-            img = display_info(img, f"Player 1 ID: {p1.id}: {p1.score}", (10, HEADING1_HEIGHT))
-        if p2.id is not None:
-            img = display_info(img, f"Player 2 ID: {p2.id}: {p2.score}", (10, HEADING3_HEIGHT))
+        elapsed_time = int(match_view.elapsed_time)
+        img = display_info(img, f"Player 1 ID: {match_view.p1_id}: {match_view.p1_score}", (10, HEADING1_HEIGHT))
+        img = display_info(img, f"Player 2 ID: {match_view.p2_id}: {match_view.p2_score}", (10, HEADING3_HEIGHT))
         
         img = display_info(img, f"Time: {elapsed_time}s", (w_img//2 - 100, HEADING2_HEIGHT))
         
         # Display lock timer when players are locking
-        if p1.lock_start_time is not None:
-            elapsed = time.time() - p1.lock_start_time
-            remaining = max(0, game_state.lock_duration - elapsed)
-            img = display_centered_info(img, f"Round: {remaining:.1f}s", HEADING3_HEIGHT)
+        if match_view.round_remaining is not None:
+            img = display_centered_info(img, f"Round: {match_view.round_remaining:.1f}s", HEADING3_HEIGHT)
         
-        if game_state.round_result:
-            img = display_centered_info(img, game_state.round_result, HEADING4_HEIGHT)
+        if match_view.round_result:
+            img = display_centered_info(img, match_view.round_result, HEADING4_HEIGHT)
     
     # Draw timeout timer if active
-    img = draw_timeout_timer(img, timeout_manager)
+    img = draw_timeout_timer(img, match_view)
+    
+    return img
+
+
+def draw_match_list_hud(img, view: FrameView):
+    """
+    Draw one status line per match when several matches are running.
+    
+    Args:
+        img: Image to draw on
+        view: FrameView of the frame
+    
+    Returns:
+        Modified image
+    """
+    y_offset = HEADING1_HEIGHT
+    
+    for match_view in view.matches:
+        status = (f"Match {match_view.match_id}: P1 ID {match_view.p1_id}: {match_view.p1_score}"
+                  f" - P2 ID {match_view.p2_id}: {match_view.p2_score}")
+        if match_view.timeout_active:
+            status += f" (player not visible: {match_view.timeout_remaining:.1f}s)"
+        elif match_view.round_remaining is not None:
+            status += f" (round: {match_view.round_remaining:.1f}s)"
+        img = display_info(img, status, (10, y_offset))
+        y_offset += 25
+        if match_view.round_result:
+            img = display_info(img, f"  {match_view.round_result}", (10, y_offset))
+            y_offset += 25
+    
+    if view.registration_open:
+        img = display_bottom_centered_info(img, "Show a THUMBS UP and hold position to start another match",
+                                           HEADING1_HEIGHT)
     
     return img
 
 
-def draw_hud(img, game_state, timeout_manager=None):
+def draw_game_phase_hud(img, view: FrameView):
+    """
+    Draw HUD for game phase.
+    
+    Args:
+        img: Image to draw on
+        view: FrameView of the frame
+    
+    Returns:
+        Modified image
+    """
+    if view.max_matches == 1 and len(view.matches) == 1:
+        return draw_match_hud(img, view.matches[0])
+    return draw_match_list_hud(img, view)
+
+
+def draw_hud(img, view: FrameView):
     """
     Draw the main HUD based on current game phase.
     
     Args:
         img: Image to draw on
-        game_state: Current game state object
-        timeout_manager: PlayerTimeoutManager instance (optional)
+        view: FrameView of the frame
     
     Returns:
         Modified image
     """
 
-    img = draw_help_ui(img, game_state)
+    img = draw_help_ui(img, view)
 
-    if game_state.phase == GamePhase.DETECTION:
-        return draw_detection_phase_hud(img, game_state)
+    if view.phase == GamePhase.DETECTION:
+        return draw_detection_phase_hud(img, view)
     else:
-        return draw_game_phase_hud(img, game_state, timeout_manager)
+        return draw_game_phase_hud(img, view)
+
+
+
+def format_wall_time(timestamp):
+    """
+    Format a wall-clock timestamp with millisecond precision.
+    
+    Args:
+        timestamp: Seconds since the epoch
+    
+    Returns:
+        str: Time as HH:MM:SS.mmm
+    """
+    millis = int((timestamp % 1) * 1000)
+    return f"{time.strftime('%H:%M:%S', time.localtime(timestamp))}.{millis:03d}"
+
 
+def draw_timestamp_overlay(img, stamp):
+    """
+    Draw frame sequence number, capture time and display time in the top right corner.
+    
+    Filming the screen together with this overlay (or pointing the webcam at the
+    screen) shows both the time a frame was shown and the capture time of the
+    frame visible in it, which gives the real glass-to-glass latency.
+    
+    Args:
+        img: Image to draw on
+        stamp: FrameStamp of the frame being drawn
+    
+    Returns:
+        Modified image
+    """
+    h_img, w_img = img.shape[:2]
+    lines = [
+        f"#{stamp.seq} CAP {format_wall_time(stamp.capture_wall_time)}",
+        f"SHOW {format_wall_time(time.time())}",
+    ]
+    scale = 0.8
+    thickness = 2
+    y = HEADING1_HEIGHT
+    for text in lines:
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        x = w_img - text_w - 10
+        cv2.rectangle(img, (x - 5, y - text_h - 5), (x + text_w + 5, y + baseline + 5), (0, 0, 0), -1)
+        cv2.putText(img, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), thickness)
+        y += text_h + baseline + 12
+    return img
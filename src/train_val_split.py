@@ -1,5 +1,7 @@
-# Split between train and val folders
+# Split a YOLO dataset between train, validation and test folders
 
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import random
 import os
@@ -7,80 +9,230 @@ import sys
 import shutil
 import argparse
 
-
-# Define and parse user input arguments
-
-parser = argparse.ArgumentParser()
-parser.add_argument('--datapath', help='Path to data folder containing image and annotation files',
-                    required=True)
-parser.add_argument('--train_pct', help='Ratio of images to go to train folder; \
-                    the rest go to validation folder (example: ".8")',
-                    default=.8)
-
-args = parser.parse_args()
-
-data_path = args.datapath
-train_percent = float(args.train_pct)
-
-# Check for valid entries
-if not os.path.isdir(data_path):
-   print(f'Directory specified by --datapath \"{data_path}\" not found. Verify the path is correct (and uses double back slashes if on Windows) and try again.')
-   sys.exit(0)
-if train_percent < .01 or train_percent > 0.99:
-   print('Invalid entry for train_pct. Please enter a number between .01 and .99.')
-   sys.exit(0)
-val_percent = 1 - train_percent
-
-# Define path to input dataset 
-input_image_path = os.path.join(data_path,'images')
-input_label_path = os.path.join(data_path,'labels')
-
-# Define paths to image and annotation folders
-cwd = os.getcwd()
-train_img_path = os.path.join(cwd,f'{args.datapath}/split/train/images')
-train_txt_path = os.path.join(cwd,f'{args.datapath}/split/train/labels')
-val_img_path = os.path.join(cwd,f'{args.datapath}/split/validation/images')
-val_txt_path = os.path.join(cwd,f'{args.datapath}/split/validation/labels')
-
-# Create folders if they don't already exist
-for dir_path in [train_img_path, train_txt_path, val_img_path, val_txt_path]:
-   if not os.path.exists(dir_path):
-      os.makedirs(dir_path)
-      print(f'Created folder at {dir_path}.')
-
-
-# Get list of all images and annotation files
-img_file_list = [path for path in Path(input_image_path).rglob('*')]
-txt_file_list = [path for path in Path(input_label_path).rglob('*')]
-
-print(f'Number of image files: {len(img_file_list)}')
-print(f'Number of annotation files: {len(txt_file_list)}')
-
-# Determine number of files to move to each folder
-file_num = len(img_file_list)
-train_num = int(file_num*train_percent)
-val_num = file_num - train_num
-print('Images moving to train: %d' % train_num)
-print('Images moving to validation: %d' % val_num)
-
-# Select files randomly and copy them to train or val folders
-for i, set_num in enumerate([train_num, val_num]):
-  for ii in range(set_num):
-    img_path = random.choice(img_file_list)
-    img_fn = img_path.name
-    base_fn = img_path.stem
-    txt_fn = base_fn + '.txt'
-    txt_path = os.path.join(input_label_path,txt_fn)
-
-    if i == 0: # Copy first set of files to train folders
-      new_img_path, new_txt_path = train_img_path, train_txt_path
-    elif i == 1: # Copy second set of files to the validation folders
-      new_img_path, new_txt_path = val_img_path, val_txt_path
-
-    shutil.copy(img_path, os.path.join(new_img_path,img_fn))
-    #os.rename(img_path, os.path.join(new_img_path,img_fn))
-    if os.path.exists(txt_path): # If txt path does not exist, this is a background image, so skip txt file
-      shutil.copy(txt_path,os.path.join(new_txt_path,txt_fn))
-      #os.rename(txt_path,os.path.join(new_txt_path,txt_fn))
-
-    img_file_list.remove(img_path)
\ No newline at end of file
+SPLIT_NAMES = ('train', 'validation', 'test')
+MODES = ('hardlink', 'symlink', 'copy', 'list')
+BACKGROUND = -1  # Stratum of images without labels
+RATIO_TOLERANCE = 1e-9  # Rounding error allowed when the ratios sum to 1
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--datapath', help='Path to data folder containing image and annotation files',
+                        required=True)
+    parser.add_argument('--train_pct', type=float, default=.8,
+                        help='Ratio of images to go to train folder (example: ".8")')
+    parser.add_argument('--test_pct', type=float, default=0.0,
+                        help='Ratio of images to go to test folder; the rest go to validation folder')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the shuffle, the same seed always gives the same split')
+    parser.add_argument('--mode', choices=MODES, default='hardlink',
+                        help='hardlink/symlink/copy files into split folders, or write YOLO list files '
+                             '(split/train.txt, ...) referencing the original images')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Threads used to copy files')
+    return parser.parse_args(argv)
+
+
+def find_samples(data_path):
+    """
+    List the images of a dataset with their label files.
+
+    Args:
+        data_path: Folder containing 'images' and 'labels' folders
+
+    Returns:
+        list: (image path, label path or None) tuples, sorted by image path
+    """
+    label_dir = Path(data_path) / 'labels'
+    samples = []
+    for img_path in sorted(p for p in (Path(data_path) / 'images').rglob('*') if p.is_file()):
+        txt_path = label_dir / f'{img_path.stem}.txt'
+        # If the txt file does not exist, this is a background image
+        samples.append((img_path, txt_path if txt_path.exists() else None))
+    return samples
+
+
+def main_class(txt_path):
+    """
+    Get the most frequent class of a YOLO label file.
+
+    Args:
+        txt_path: Label file, or None for a background image
+
+    Returns:
+        int: Class index, BACKGROUND if the image has no objects
+    """
+    if txt_path is None:
+        return BACKGROUND
+    with open(txt_path) as f:
+        classes = Counter(int(line.split()[0]) for line in f if line.strip())
+    return classes.most_common(1)[0][0] if classes else BACKGROUND
+
+
+def split_counts(total, ratios):
+    """
+    Divide a number of samples between splits by ratio, largest remainders first.
+
+    Args:
+        total: Number of samples
+        ratios: Ratio of each split, summing to 1
+
+    Returns:
+        list: Number of samples of each split, summing to total
+    """
+    exact = [total * ratio for ratio in ratios]
+    counts = [int(value) for value in exact]
+    by_remainder = sorted(range(len(ratios)), key=lambda i: exact[i] - counts[i], reverse=True)
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def stratified_split(samples, ratios, seed=0):
+    """
+    Shuffle each class once and cut it by ratio, so every split has the same class balance.
+
+    Args:
+        samples: (image path, label path) tuples from find_samples
+        ratios: Ratio of each split, summing to 1
+        seed: Seed of the shuffle
+
+    Returns:
+        tuple: (one list of samples per split, one Counter of samples per class per split)
+    """
+    strata = defaultdict(list)
+    for sample in samples:
+        strata[main_class(sample[1])].append(sample)
+
+    rng = random.Random(seed)
+    splits = [[] for _ in ratios]
+    classes = [Counter() for _ in ratios]
+    for cls in sorted(strata):
+        members = strata[cls]
+        rng.shuffle(members)
+        start = 0
+        for split, split_classes, count in zip(splits, classes, split_counts(len(members), ratios)):
+            split.extend(members[start:start + count])
+            if count:
+                split_classes[cls] = count
+            start += count
+    return splits, classes
+
+
+def place_file(src, dst, mode):
+    """
+    Make a file available at a new path without copying it when possible.
+
+    Hardlinks fall back to a copy across file systems.
+
+    Args:
+        src: Source file
+        dst: Destination path, replaced if it exists
+        mode: 'hardlink', 'symlink' or 'copy'
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if mode == 'symlink':
+        os.symlink(os.path.abspath(src), dst)
+        return
+    if mode == 'hardlink':
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+def materialize(splits, split_path, mode, workers=8):
+    """
+    Write the splits as folders of linked or copied files, or as YOLO list files.
+
+    The split folders and list files of an earlier run are removed first, so
+    no file of a split made with another seed or ratio is left behind.
+
+    Args:
+        splits: One list of samples per split, in SPLIT_NAMES order
+        split_path: Output folder
+        mode: One of MODES
+        workers: Threads used to place files
+
+    Returns:
+        int: Number of files placed or listed
+    """
+    os.makedirs(split_path, exist_ok=True)
+    for name in SPLIT_NAMES:
+        list_path = os.path.join(split_path, f'{name}.txt')
+        if os.path.exists(list_path):
+            os.remove(list_path)
+        # Removing links and copies leaves the original files untouched
+        if os.path.isdir(os.path.join(split_path, name)):
+            shutil.rmtree(os.path.join(split_path, name))
+    if mode == 'list':
+        # YOLO finds the labels by replacing 'images' with 'labels' in each path
+        for name, samples in zip(SPLIT_NAMES, splits):
+            if samples:
+                with open(os.path.join(split_path, f'{name}.txt'), 'w') as f:
+                    f.writelines(f'{img_path.resolve()}\n' for img_path, _ in samples)
+        return sum(len(samples) for samples in splits)
+
+    jobs = []
+    for name, samples in zip(SPLIT_NAMES, splits):
+        if not samples:
+            continue
+        img_dir = os.path.join(split_path, name, 'images')
+        txt_dir = os.path.join(split_path, name, 'labels')
+        for dir_path in (img_dir, txt_dir):
+            if not os.path.exists(dir_path):
+                os.makedirs(dir_path)
+                print(f'Created folder at {dir_path}.')
+        for img_path, txt_path in samples:
+            jobs.append((img_path, os.path.join(img_dir, img_path.name)))
+            if txt_path is not None:
+                jobs.append((txt_path, os.path.join(txt_dir, txt_path.name)))
+
+    # Links are metadata operations, threads mostly help copies
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for _ in executor.map(lambda job: place_file(*job, mode), jobs):
+            pass
+    return len(jobs)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    data_path = args.datapath
+
+    # Check for valid entries
+    if not os.path.isdir(data_path):
+        print(f'Directory specified by --datapath \"{data_path}\" not found. Verify the path is correct (and uses double back slashes if on Windows) and try again.')
+        sys.exit(0)
+    val_percent = 1 - args.train_pct - args.test_pct
+    if args.train_pct < .01 or args.test_pct < 0 or val_percent < -RATIO_TOLERANCE:
+        print('Invalid entry for train_pct/test_pct. Please enter ratios above 0 whose sum is at most 1.')
+        sys.exit(0)
+    val_percent = max(0.0, val_percent)
+    ratios = (args.train_pct, val_percent, args.test_pct)
+
+    samples = find_samples(data_path)
+    print(f'Number of image files: {len(samples)}')
+    print(f'Number of annotation files: {sum(txt_path is not None for _, txt_path in samples)}')
+
+    splits, classes = stratified_split(samples, ratios, args.seed)
+    for name, split, split_classes in zip(SPLIT_NAMES, splits, classes):
+        print(f'Images going to {name}: {len(split)} {dict(sorted(split_classes.items()))}')
+
+    count = materialize(splits, os.path.join(data_path, 'split'), args.mode, args.workers)
+    print(f'Placed {count} files ({args.mode}) in {os.path.join(data_path, "split")}')
+
+
+if __name__ == '__main__':
+    main()
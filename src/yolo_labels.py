@@ -0,0 +1,68 @@
+# YOLO label helpers shared by the dataset tools
+
+import os
+
+
+def box_to_yolo(x, y, w, h, img_w, img_h):
+    """
+    Convert a pixel box to normalized YOLO coordinates, clipped to the image.
+
+    Args:
+        x, y: Top left corner in pixels
+        w, h: Size in pixels
+        img_w, img_h: Image size in pixels
+
+    Returns:
+        tuple: (center x, center y, width, height) between 0 and 1
+    """
+    x1 = min(max(x, 0), img_w)
+    y1 = min(max(y, 0), img_h)
+    x2 = min(max(x + w, 0), img_w)
+    y2 = min(max(y + h, 0), img_h)
+    return ((x1 + x2) / 2 / img_w, (y1 + y2) / 2 / img_h, (x2 - x1) / img_w, (y2 - y1) / img_h)
+
+
+def format_label_line(class_id, box):
+    """
+    Format one YOLO label line.
+
+    Args:
+        class_id: Class index
+        box: Normalized (center x, center y, width, height)
+
+    Returns:
+        str: Label line without newline
+    """
+    return f"{class_id} {box[0]:.6f} {box[1]:.6f} {box[2]:.6f} {box[3]:.6f}"
+
+
+def label_path_for(image_path):
+    """
+    Get the label file of an image, following the YOLO layout (.../images/x.png -> .../labels/x.txt).
+
+    Args:
+        image_path: Image file
+
+    Returns:
+        str: Label file path
+    """
+    directory, name = os.path.split(image_path)
+    parent, folder = os.path.split(directory)
+    if folder == 'images':
+        directory = os.path.join(parent, 'labels')
+    return os.path.join(directory, os.path.splitext(name)[0] + '.txt')
+
+
+def write_label(path, lines):
+    """
+    Write a YOLO label file, creating its folder if needed. No lines writes an empty (background) label.
+
+    Args:
+        path: Label file
+        lines: Label lines from format_label_line
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(''.join(f"{line}\n" for line in lines))
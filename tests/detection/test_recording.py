@@ -0,0 +1,78 @@
+"""
+Unit tests for detection recording and replay.
+
+Records synthetic tracking results, replays them from the memory-mapped
+segments and checks that the game sees the same detections.
+"""
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from detection.recording import (DetectionRecorder, DetectionReplay, RecordedBoxes,
+                                 RecordedResult, NO_TRACK_ID)
+from detection.yolo_handler import process_detections
+from config import CLASS_NAMES
+
+
+def make_result(track_ids, class_ids):
+    """Build a recorded result with one box per track ID."""
+    count = len(track_ids)
+    xyxy = np.tile(np.array([[10, 20, 110, 220]], dtype=np.float32), (count, 1))
+    conf = np.full(count, 0.9, dtype=np.float16)
+    return RecordedResult(RecordedBoxes(xyxy, conf, np.array(class_ids, dtype=np.uint8),
+                                        np.array(track_ids, dtype=np.int32)), (480, 640), 0.0)
+
+
+class TestDetectionRecording(unittest.TestCase):
+    """Test cases for DetectionRecorder and DetectionReplay."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def record(self, frames, segment_frames=2):
+        recorder = DetectionRecorder(self.tmp.name, 640, 480, segment_frames=segment_frames)
+        for i, result in enumerate(frames):
+            recorder.record(result, 100.0 + i)
+        recorder.close()
+        return recorder
+
+    def test_round_trip_preserves_detections(self):
+        """Replayed results produce the same signs as the recorded ones."""
+        frames = [make_result([1, 2], [0, 1]), make_result([], []), make_result([3], [2])]
+        recorder = self.record(frames)
+        self.assertEqual(len(recorder.meta['segments']), 2)
+
+        replay = DetectionReplay(self.tmp.name)
+        self.assertEqual(len(replay), 3)
+        self.assertEqual(replay.frame_size, (640, 480))
+
+        replayed = list(replay.results())
+        for original, result in zip(frames, replayed):
+            self.assertEqual(process_detections(result, 640), process_detections(original, 640))
+        self.assertEqual([r.timestamp for r in replayed], [100.0, 101.0, 102.0])
+        self.assertEqual(process_detections(replayed[0], 640), {1: CLASS_NAMES[0], 2: CLASS_NAMES[1]})
+
+    def test_columns_are_memory_mapped(self):
+        """Segments are opened as read-only memory maps."""
+        self.record([make_result([1], [0])])
+        replay = DetectionReplay(self.tmp.name)
+        segment = replay.load_segment(replay.meta['segments'][0])
+        self.assertIsInstance(segment['boxes'], np.memmap)
+
+    def test_untracked_boxes_have_no_id(self):
+        """Boxes recorded without track IDs replay with id None."""
+        self.record([make_result([NO_TRACK_ID], [0])])
+        result = next(DetectionReplay(self.tmp.name).results())
+        self.assertIsNone(next(iter(result.boxes)).id)
+        self.assertEqual(process_detections(result, 640), {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+"""
+Unit tests for the match event log.
+
+Covers batched writes, segment rotation and retention, the closed no-op
+path and the events emitted while a match is played.
+"""
+import logging
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from clock import SimulatedClock
+from config import log, PAPER, ROCK, THUMB_UP
+from game.event_log import EventLog, event_log, read_events, segment_paths
+from game.phases import update_game
+from game_state import GameState
+
+
+class TestEventLog(unittest.TestCase):
+    """Test cases for the EventLog class."""
+
+    def setUp(self):
+        self.previous_level = log.level
+        log.setLevel(logging.ERROR)
+        self.addCleanup(log.setLevel, self.previous_level)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_closed_log_drops_events(self):
+        """Events emitted before open are not kept."""
+        events = EventLog()
+        events.emit('round_result', 1.0, winner='Tie')
+        self.assertEqual(len(events._pending), 0)
+
+    def test_events_are_written_on_close(self):
+        """Pending events are written in order when the log is closed."""
+        events = EventLog()
+        events.open(self.directory, flush_interval=60)
+        for i in range(3):
+            events.emit('round_result', float(i), match_id=1, winner='Tie')
+        events.close()
+
+        written = list(read_events(self.directory))
+        self.assertEqual([e['t'] for e in written], [0.0, 1.0, 2.0])
+        self.assertEqual(written[0], {'t': 0.0, 'event': 'round_result', 'match_id': 1, 'winner': 'Tie'})
+
+    def test_segments_rotate_and_old_ones_are_deleted(self):
+        """A full segment is followed by a new one, beyond max_segments the oldest go."""
+        events = EventLog()
+        events.open(self.directory, max_bytes=1, max_segments=2, flush_interval=60)
+        for i in range(4):
+            events.emit('game_reset', float(i))
+            events._write_pending()
+        events.close()
+
+        names = [os.path.basename(path) for path in segment_paths(self.directory)]
+        self.assertEqual(names, ['events-00002.jsonl', 'events-00003.jsonl'])
+        self.assertEqual([e['t'] for e in read_events(self.directory)], [2.0, 3.0])
+
+        # Reopening appends new segments after the existing ones
+        events.open(self.directory, flush_interval=60)
+        events.emit('game_reset', 4.0)
+        events.close()
+        self.assertEqual(os.path.basename(segment_paths(self.directory)[-1]), 'events-00004.jsonl')
+
+    def test_match_events(self):
+        """Registration, match start and round results are recorded."""
+        clock = SimulatedClock(100.0)
+        game_state = GameState(clock.now())
+        event_log.open(self.directory, flush_interval=60)
+        self.addCleanup(event_log.close)
+
+        for signs, seconds in (({1: THUMB_UP, 2: THUMB_UP}, 4.0), ({1: ROCK, 2: PAPER}, 6.0)):
+            for _ in range(int(seconds * 2)):
+                update_game(signs, game_state, clock.advance(0.5))
+        event_log.close()
+
+        written = list(read_events(self.directory))
+        types = [e['event'] for e in written]
+        self.assertEqual(types[:5], ['registration_lock_started', 'registration_lock_started',
+                                     'player_registered', 'player_registered', 'match_started'])
+        result = next(e for e in written if e['event'] == 'round_result')
+        self.assertEqual((result['p1_sign'], result['p2_sign'], result['winner']), (ROCK, PAPER, 'Player 2 Wins'))
+        self.assertEqual((result['round'], result['p2_score']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
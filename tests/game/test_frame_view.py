@@ -0,0 +1,102 @@
+"""
+Unit tests for the per-frame view used by the renderers.
+
+Covers lock states and progress derived once per frame, slots of
+registered and match players, and immutability of the view.
+"""
+import logging
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from config import log, PAPER, ROCK, THUMB_UP
+from detection.hand_tracking import get_lock_progress, get_pending_hand_lock_state
+from frame_view import build_frame_view, player_lock_progress
+from game.phases import update_game
+from game_state import GameState, Player
+from ui.bounding_boxes import build_detection_label, get_box_color_and_thickness
+
+
+class TestFrameView(unittest.TestCase):
+    """Derived state computed once per frame."""
+
+    def setUp(self):
+        self.previous_level = log.level
+        log.setLevel(logging.ERROR)
+        self.addCleanup(log.setLevel, self.previous_level)
+
+    def test_pending_hands_match_lock_helpers(self):
+        """Lock states and progress agree with the per-hand helpers."""
+        game_state = GameState(0.0)
+        signs = {1: THUMB_UP, 2: ROCK, 3: THUMB_UP}
+        update_game(signs, game_state, 1.0)
+        update_game(signs, game_state, 2.0)
+        update_game({1: THUMB_UP, 2: ROCK, 3: PAPER}, game_state, 2.5)
+
+        # Hand 1 starts locking at 2.5, hand 2 holds an invalid sign, hand 3 switched sign
+        for now in (2.5, 3.0, 2.5 + game_state.lock_duration):
+            view = build_frame_view(game_state, now)
+            for track_id in (1, 2, 3):
+                with self.subTest(now=now, track_id=track_id):
+                    track = view.tracks[track_id]
+                    self.assertEqual(track.lock_state, get_pending_hand_lock_state(track_id, game_state, now))
+                    self.assertEqual(track.progress, get_lock_progress(track_id, game_state, now))
+        self.assertEqual([t.lock_state for t in view.tracks.values()], ['locked_ok', 'locked_invalid', 'locked_invalid'])
+        self.assertEqual(view.pending_hands, ((1, THUMB_UP), (2, ROCK), (3, PAPER)))
+
+    def test_box_colors_follow_lock_state(self):
+        """Pending hands get lock colors, other hands keep their class color."""
+        game_state = GameState(0.0)
+        update_game({1: THUMB_UP}, game_state, 1.0)
+        update_game({1: THUMB_UP}, game_state, 2.0)
+        view = build_frame_view(game_state, 2.5)
+
+        self.assertEqual(get_box_color_and_thickness(view.tracks[1], THUMB_UP), ((0, 255, 255), 3))
+        self.assertEqual(get_box_color_and_thickness(None, ROCK)[1], 1)
+
+    def test_match_players(self):
+        """Match players carry their slot, score and round progress."""
+        game_state = GameState(0.0)
+        thumbs = {1: THUMB_UP, 2: THUMB_UP}
+        for now in (1.0, 2.0, 3.0, 3.0 + game_state.lock_duration):
+            update_game(thumbs, game_state, now)
+        update_game({1: ROCK, 2: PAPER}, game_state, 6.0)
+        update_game({1: ROCK, 2: PAPER}, game_state, 7.0)
+        update_game({1: ROCK, 2: PAPER}, game_state, 8.0)
+
+        view = build_frame_view(game_state, 8.0)
+        p1, p2 = view.tracks[1], view.tracks[2]
+        self.assertEqual((p1.slot, p2.slot), ('P1', 'P2'))
+        self.assertEqual(build_detection_label(ROCK, 0.9, 1, p1), f"P1 {ROCK} 0.90")
+        self.assertEqual(p1.progress, 100 / game_state.lock_duration)
+        self.assertEqual(view.matches[0].round_remaining, game_state.lock_duration - 1)
+        self.assertEqual((view.matches[0].p1_score, view.matches[0].p2_score), (0, 0))
+
+    def test_lock_started_at_time_zero(self):
+        """A lock starting at 0.0, as on a simulated clock, still reports its progress."""
+        player = Player()
+        player.locked = ROCK
+        player.lock_start_time = 0.0
+        self.assertEqual(player_lock_progress(player, 4.0, 1.0), 25.0)
+        player.lock_start_time = None
+        self.assertEqual(player_lock_progress(player, 4.0, 1.0), 100.0)
+
+    def test_view_is_immutable(self):
+        """Renderers cannot change the view or reach back into the game state."""
+        game_state = GameState(0.0)
+        update_game({1: ROCK}, game_state, 1.0)
+        view = build_frame_view(game_state, 1.0)
+
+        with self.assertRaises(AttributeError):
+            view.phase = None
+        with self.assertRaises(TypeError):
+            view.tracks[2] = view.tracks[1]
+        update_game({1: ROCK, 2: ROCK}, game_state, 2.0)
+        self.assertNotIn(2, view.tracks)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
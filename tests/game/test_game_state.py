@@ -0,0 +1,60 @@
+"""
+Unit tests for the game state containers.
+
+Covers the pending-hand table and the fixed attribute sets of the state classes.
+"""
+import math
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from config import NO_SIGN, ROCK, SIGN_CODES, THUMB_UP
+from game_state import GameState, PendingHands, Player
+
+
+class TestPendingHands(unittest.TestCase):
+    """Column-wise pending-hand table."""
+
+    def test_add_and_lookup(self):
+        """Rows start unlocked and expose sign names and centers."""
+        pending_hands = PendingHands()
+        row = pending_hands.add(7, SIGN_CODES[ROCK], 1.0, (10.0, 20.0))
+        pending_hands.add(8, SIGN_CODES[THUMB_UP], 1.0)
+
+        self.assertEqual(len(pending_hands), 2)
+        self.assertIn(7, pending_hands)
+        self.assertEqual(list(pending_hands), [7, 8])
+        self.assertEqual(pending_hands.sign_name(7), ROCK)
+        self.assertEqual(pending_hands.center(7), (10.0, 20.0))
+        self.assertIsNone(pending_hands.center(8))
+        self.assertEqual(pending_hands.locked[row], NO_SIGN)
+        self.assertTrue(math.isnan(pending_hands.lock_start_time[row]))
+
+    def test_removed_rows_are_reused(self):
+        """The table does not grow when hands come and go."""
+        pending_hands = PendingHands()
+        for track_id in range(4):
+            pending_hands.add(track_id, SIGN_CODES[ROCK], 1.0)
+        pending_hands.remove(1)
+        pending_hands.clear()
+        for track_id in range(10, 14):
+            pending_hands.add(track_id, SIGN_CODES[THUMB_UP], 2.0)
+
+        self.assertEqual(len(pending_hands.track_id), 4)
+        self.assertEqual(sorted(pending_hands), [10, 11, 12, 13])
+        self.assertEqual({pending_hands.sign_name(t) for t in pending_hands}, {THUMB_UP})
+
+    def test_state_classes_use_slots(self):
+        """State objects reject unknown attributes instead of growing a __dict__."""
+        for obj in (GameState(0.0), Player()):
+            with self.subTest(cls=type(obj).__name__):
+                self.assertFalse(hasattr(obj, '__dict__'))
+                with self.assertRaises(AttributeError):
+                    obj.unknown_attribute = 1
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,85 @@
+"""
+Unit tests for the SQLite leaderboard.
+
+Covers applying event batches, end reasons, the cached top sessions and
+persistence across restarts.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from config import log, PAPER, ROCK, SCISSOR
+from game.leaderboard import Leaderboard
+
+
+def round_result(now, match_id, number, p1_score, p2_score):
+    """round_result event as emitted by the game phase."""
+    return (now, 'round_result', {'match_id': match_id, 'round': number, 'p1_id': 1, 'p2_id': 2,
+                                  'p1_sign': ROCK, 'p2_sign': SCISSOR if p1_score else PAPER,
+                                  'winner': 'Player 1 Wins', 'p1_score': p1_score, 'p2_score': p2_score})
+
+
+class TestLeaderboard(unittest.TestCase):
+    """Test cases for the Leaderboard class."""
+
+    def setUp(self):
+        self.previous_level = log.level
+        log.setLevel(logging.ERROR)
+        self.addCleanup(log.setLevel, self.previous_level)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'scores.db')
+
+    def test_batch_is_stored(self):
+        """A match with rounds and a timeout is stored with sessions and end reason."""
+        leaderboard = Leaderboard(self.path)
+        leaderboard.write([
+            (10.0, 'match_started', {'match_id': 1, 'p1_id': 1, 'p2_id': 2}),
+            round_result(15.0, 1, 1, 1, 0),
+            round_result(20.0, 1, 2, 2, 0),
+            (90.0, 'match_timed_out', {'match_id': 1}),
+            (90.0, 'match_ended', {'match_id': 1, 'rounds': 2, 'p1_score': 2, 'p2_score': 0}),
+        ])
+        self.assertEqual([(e.track_id, e.wins) for e in leaderboard.top], [(1, 2)])
+        leaderboard.close()
+
+        connection = sqlite3.connect(self.path)
+        self.assertEqual(connection.execute('PRAGMA journal_mode').fetchone(), ('wal',))
+        self.assertEqual(connection.execute('SELECT rounds, ended_at, end_reason FROM matches').fetchall(),
+                         [(2, 90.0, 'timeout')])
+        self.assertEqual(connection.execute('SELECT slot, track_id, wins FROM sessions ORDER BY slot').fetchall(),
+                         [(1, 1, 2), (2, 2, 0)])
+        self.assertEqual(connection.execute('SELECT COUNT(*) FROM rounds').fetchone(), (2,))
+        connection.close()
+
+    def test_match_ids_restart_after_reset(self):
+        """Live match IDs reused after a reset map to new rows, and scores survive a restart."""
+        leaderboard = Leaderboard(self.path, size=2)
+        leaderboard.write([
+            (10.0, 'match_started', {'match_id': 1, 'p1_id': 1, 'p2_id': 2}),
+            round_result(15.0, 1, 1, 1, 0),
+            (16.0, 'game_reset', {}),
+            (20.0, 'match_started', {'match_id': 1, 'p1_id': 5, 'p2_id': 6}),
+            round_result(25.0, 1, 1, 0, 1),
+            round_result(30.0, 1, 2, 0, 2),
+        ])
+        leaderboard.close()
+
+        reopened = Leaderboard(self.path, size=2)
+        self.addCleanup(reopened.close)
+        self.assertEqual([(e.track_id, e.wins) for e in reopened.top], [(6, 2), (1, 1)])
+        connection = sqlite3.connect(self.path)
+        self.assertEqual(connection.execute('SELECT end_reason FROM matches ORDER BY id').fetchall(),
+                         [('reset',), ('closed',)])
+        connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
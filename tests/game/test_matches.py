@@ -0,0 +1,118 @@
+"""
+Unit tests for concurrent matches.
+
+Covers pairing of neighbouring players, the track ID index and
+ending one match without affecting the others.
+"""
+import logging
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from clock import SimulatedClock
+from config import log, PAPER, ROCK, SCISSOR, THUMB_DOWN, THUMB_UP
+from game.phases import update_game
+from game_state import GamePhase, GameState
+
+
+class TestMatches(unittest.TestCase):
+    """Several matches played in the same camera frame."""
+
+    def setUp(self):
+        self.previous_level = log.level
+        log.setLevel(logging.ERROR)
+        self.addCleanup(log.setLevel, self.previous_level)
+        self.clock = SimulatedClock(1024.0)
+
+    def hold(self, game_state, signs_by_id, seconds, centers_by_id=None):
+        """Show the same signs for `seconds` in steps of 0.5 seconds."""
+        for _ in range(int(seconds * 2)):
+            update_game(signs_by_id, game_state, self.clock.advance(0.5), centers_by_id)
+
+    def register(self, game_state, centers_by_id):
+        """Register every hand in centers_by_id with a held THUMBS UP."""
+        thumbs = {track_id: THUMB_UP for track_id in centers_by_id}
+        self.hold(game_state, thumbs, game_state.lock_duration + 1.5, centers_by_id)
+
+    def test_neighbouring_players_are_paired(self):
+        """Hands are paired left to right, regardless of track ID order."""
+        game_state = GameState(self.clock.now(), max_matches=2)
+        centers = {1: (100, 300), 2: (900, 300), 3: (300, 300), 4: (1100, 300)}
+        self.register(game_state, centers)
+
+        self.assertEqual(game_state.phase, GamePhase.GAME)
+        self.assertEqual(len(game_state.matches), 2)
+        pairs = [(match.p1.id, match.p2.id) for match in game_state.matches]
+        self.assertEqual(sorted(pairs), [(1, 3), (2, 4)])
+        for track_id in centers:
+            self.assertEqual(game_state.match_for_track(track_id).player_for(track_id).id, track_id)
+        self.assertFalse(game_state.registration_open())
+
+    def test_max_pair_distance_skips_distant_hands(self):
+        """Hands too far apart wait for a closer opponent."""
+        game_state = GameState(self.clock.now(), max_matches=2)
+        game_state.max_pair_distance = 300
+        centers = {1: (100, 300), 2: (800, 300), 3: (1000, 300)}
+        self.register(game_state, centers)
+
+        self.assertEqual(len(game_state.matches), 1)
+        self.assertEqual((game_state.matches[0].p1.id, game_state.matches[0].p2.id), (2, 3))
+        self.assertIn(1, game_state.ready_players)
+
+    def test_ending_one_match_keeps_the_other(self):
+        """A match stopped with THUMBS DOWN frees its players only."""
+        game_state = GameState(self.clock.now(), max_matches=2)
+        centers = {1: (100, 300), 2: (300, 300), 3: (900, 300), 4: (1100, 300)}
+        self.register(game_state, centers)
+        first, second = sorted(game_state.matches, key=lambda m: m.p1.id)
+
+        signs = {1: THUMB_DOWN, 2: THUMB_DOWN, 3: ROCK, 4: SCISSOR}
+        self.hold(game_state, signs, game_state.lock_duration + 1.0)
+
+        self.assertEqual(game_state.matches, [second])
+        self.assertIsNone(game_state.match_for_track(1))
+        self.assertIs(game_state.match_for_track(3), second)
+        self.assertEqual(second.p1.score, 1)
+        self.assertEqual(game_state.phase, GamePhase.GAME)
+        self.assertTrue(game_state.registration_open())
+
+    def test_single_match_returns_to_detection(self):
+        """With one match allowed, ending it returns to detection."""
+        game_state = GameState(self.clock.now())
+        self.register(game_state, {1: (100, 300), 2: (300, 300)})
+        self.assertEqual(game_state.phase, GamePhase.GAME)
+        self.assertFalse(game_state.registration_open())
+
+        self.hold(game_state, {1: PAPER, 2: ROCK, 3: THUMB_UP}, game_state.lock_duration + 1.0)
+        self.assertEqual(game_state.matches[0].p1.score, 1)
+        self.assertEqual(len(game_state.pending_hands), 0)
+
+        self.hold(game_state, {1: THUMB_DOWN, 2: THUMB_DOWN}, game_state.lock_duration + 1.0)
+        self.assertEqual(game_state.phase, GamePhase.DETECTION)
+        self.assertEqual(game_state.matches, [])
+        self.assertEqual(game_state.match_by_track_id, {})
+
+    def test_ending_the_last_match_keeps_registrations(self):
+        """A player registered while the only match ran is still ready after it stops."""
+        game_state = GameState(self.clock.now(), max_matches=2)
+        self.register(game_state, {1: (100, 300), 2: (300, 300)})
+        self.register(game_state, {3: (900, 300)})
+        self.assertEqual(len(game_state.matches), 1)
+        self.assertIn(3, game_state.ready_players)
+        lock_duration = game_state.lock_duration
+
+        signs = {1: THUMB_DOWN, 2: THUMB_DOWN, 3: THUMB_UP}
+        self.hold(game_state, signs, game_state.lock_duration + 1.0)
+
+        self.assertEqual(game_state.matches, [])
+        self.assertEqual(game_state.phase, GamePhase.DETECTION)
+        self.assertEqual(list(game_state.ready_players), [3])
+        self.assertEqual(game_state.lock_duration, lock_duration)
+        self.assertEqual(game_state.match_by_track_id, {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
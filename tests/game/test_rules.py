@@ -2,8 +2,11 @@
 Unit tests for the RPS game rules module.
 
 This module contains comprehensive tests for the get_rps_winner function,
-covering all possible combinations of Rock, Paper, Scissor, and Gun signs.
+covering all possible combinations of Rock, Paper, Scissor, and Gun signs,
+and for the compiled rule sets and their bulk evaluation API.
 """
+import json
+import tempfile
 import unittest
 import sys
 from pathlib import Path
@@ -11,8 +14,10 @@ from pathlib import Path
 # Add the src/rps-game directory to the path to allow imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
 
-from game.rules import get_rps_winner
-from config import ROCK, PAPER, SCISSOR, GUN
+import numpy as np
+from game.rules import (get_rps_winner, load_rule_set, RuleSet, RULE_SETS, LIZARD, SPOCK,
+                        NO_OUTCOME, TIE, P1_WINS, P2_WINS, OUTCOME_LABELS)
+from config import ROCK, PAPER, SCISSOR, GUN, THUMB_UP, CLASS_NAMES
 
 
 class TestRPSRulesParameterized(unittest.TestCase):
@@ -65,6 +70,68 @@ class TestRPSRulesParameterized(unittest.TestCase):
                 )
 
 
+class TestRuleSets(unittest.TestCase):
+    """Data-driven rule sets and the bulk evaluation API."""
+
+    def test_bulk_matches_single_pair(self):
+        """Every pair evaluates the same through the matrix and the single-pair path."""
+        for rule_set in RULE_SETS.values():
+            pairs = [(s1, s2) for s1 in rule_set.signs for s2 in rule_set.signs]
+            outcomes = rule_set.evaluate(rule_set.encode([p[0] for p in pairs]),
+                                         rule_set.encode([p[1] for p in pairs]))
+            for (sign1, sign2), outcome in zip(pairs, outcomes):
+                with self.subTest(rule_set=rule_set.name, sign1=sign1, sign2=sign2):
+                    self.assertEqual(OUTCOME_LABELS[int(outcome)], rule_set.winner(sign1, sign2))
+
+    def test_lizard_spock(self):
+        """Each sign beats exactly two others."""
+        rule_set = RULE_SETS['lizard-spock']
+        self.assertEqual(rule_set.winner(SPOCK, SCISSOR), 'Player 1 Wins')
+        self.assertEqual(rule_set.winner(ROCK, LIZARD), 'Player 1 Wins')
+        self.assertEqual(rule_set.winner(LIZARD, SCISSOR), 'Player 2 Wins')
+        self.assertEqual(((rule_set.outcomes == P1_WINS).sum(axis=1)[:-1]).tolist(), [2] * 5)
+
+    def test_unknown_signs(self):
+        """Signs outside the rule set have no outcome in bulk and raise for single pairs."""
+        rule_set = RULE_SETS['classic']
+        codes1 = np.asarray(rule_set.encode(np.array([ROCK, GUN, THUMB_UP])))
+        codes2 = rule_set.encode([SCISSOR, ROCK, ROCK])
+        self.assertEqual(codes1.tolist(), [rule_set.codes[ROCK], -1, -1])
+        self.assertEqual(rule_set.evaluate(codes1, codes2).tolist(), [P1_WINS, NO_OUTCOME, NO_OUTCOME])
+        with self.assertRaises(ValueError):
+            rule_set.winner(GUN, ROCK)
+
+    def test_tally_and_class_ids(self):
+        """Outcomes are counted from random class ID columns."""
+        rng = np.random.default_rng(0)
+        rule_set = RULE_SETS['house']
+        ids1 = rng.integers(0, len(CLASS_NAMES), 10000)
+        ids2 = rng.integers(0, len(CLASS_NAMES), 10000)
+        outcomes = rule_set.evaluate_class_ids(ids1, ids2)
+        i = int(np.argmax(outcomes == P2_WINS))
+        self.assertEqual(get_rps_winner(CLASS_NAMES[ids1[i]], CLASS_NAMES[ids2[i]]), 'Player 2 Wins')
+
+        tally = rule_set.tally(rule_set.class_codes[ids1], rule_set.class_codes[ids2])
+        self.assertEqual(sum(tally.values()), 10000)
+        self.assertEqual(tally['Tie'], int((outcomes == TIE).sum()))
+
+    def test_invalid_rule_sets(self):
+        """Contradictory or incomplete rule sets are rejected."""
+        with self.assertRaises(ValueError):
+            RuleSet('cycle', {ROCK: [PAPER], PAPER: [ROCK]})
+        with self.assertRaises(ValueError):
+            RuleSet('unknown', {ROCK: [SCISSOR]})
+
+    def test_load_rule_set(self):
+        """Rule sets load from JSON files."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "rules.json"
+            path.write_text(json.dumps({'name': 'json', 'beats': {ROCK: [SCISSOR], SCISSOR: [], PAPER: []}}))
+            rule_set = load_rule_set(path)
+        self.assertEqual(rule_set.winner(SCISSOR, ROCK), 'Player 2 Wins')
+        self.assertEqual(rule_set.winner(PAPER, ROCK), 'Tie')
+
+
 if __name__ == '__main__':
     # Configure test runner with verbosity
     unittest.main(verbosity=2)
@@ -0,0 +1,83 @@
+"""
+Unit tests for the injected frame clock and the game simulation.
+
+Covers lock timing driven by explicit frame timestamps and the
+determinism of fast-forward simulations.
+"""
+import logging
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from clock import SimulatedClock
+from config import log, ROCK, PAPER, THUMB_UP
+from detection.hand_tracking import update_player_detection
+from game.phases import update_game_phase
+from game.simulation import simulate, synthetic_sign_stream
+from game_state import GamePhase, GameState
+
+
+class TestFrameClock(unittest.TestCase):
+    """Game logic driven entirely by frame timestamps."""
+
+    def setUp(self):
+        self.previous_level = log.level
+        log.setLevel(logging.ERROR)
+        self.addCleanup(log.setLevel, self.previous_level)
+
+    def test_registration_and_round_follow_simulated_time(self):
+        """Locks complete exactly when the simulated lock duration has elapsed."""
+        # Time steps are powers of two so the arithmetic is exact
+        clock = SimulatedClock(1024.0)
+        game_state = GameState(clock.now())
+        thumbs = {1: THUMB_UP, 2: THUMB_UP}
+
+        # Frames: start tracking, remember the sign, start the lock, then hold for lock_duration
+        update_player_detection(thumbs, game_state, clock.now())
+        update_player_detection(thumbs, game_state, clock.advance(0.5))
+        update_player_detection(thumbs, game_state, clock.advance(0.5))
+        update_player_detection(thumbs, game_state, clock.advance(game_state.lock_duration - 0.25))
+        self.assertEqual(game_state.phase, GamePhase.DETECTION)
+        update_player_detection(thumbs, game_state, clock.advance(0.25))
+        self.assertEqual(game_state.phase, GamePhase.GAME)
+        match = game_state.matches[0]
+        self.assertEqual(match.game_start_time, clock.now())
+
+        signs = {1: ROCK, 2: PAPER}
+        update_game_phase(signs, game_state, clock.advance(0.5))
+        update_game_phase(signs, game_state, clock.advance(0.5))
+        update_game_phase(signs, game_state, clock.advance(game_state.lock_duration))
+        self.assertEqual(game_state.rounds_played, 1)
+        self.assertEqual(match.p2.score, 1)
+
+
+class TestSimulation(unittest.TestCase):
+    """Fast-forward simulation over synthetic sign streams."""
+
+    def setUp(self):
+        self.previous_level = log.level
+        log.setLevel(logging.ERROR)
+        self.addCleanup(log.setLevel, self.previous_level)
+
+    def run_simulation(self, seed):
+        stats = simulate(synthetic_sign_stream(30 * 60 * 20, fps=30.0, seed=seed), fps=30.0)
+        del stats['wall_seconds'], stats['frames_per_second']
+        return stats
+
+    def test_same_seed_gives_same_outcome(self):
+        """Simulations do not depend on the wall clock."""
+        self.assertEqual(self.run_simulation(3), self.run_simulation(3))
+
+    def test_simulation_plays_games(self):
+        """Synthetic streams register players and play rounds."""
+        stats = self.run_simulation(0)
+        self.assertEqual(stats['frames'], 36000)
+        self.assertGreater(stats['games_started'], 0)
+        self.assertGreater(stats['rounds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
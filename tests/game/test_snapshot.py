@@ -0,0 +1,151 @@
+"""
+Unit tests for game state snapshots.
+
+Covers atomic snapshot files, restoring matches with re-association of
+new track IDs by position, keeping the leaderboard rows of restored
+matches, and ignoring stale snapshots.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from clock import SimulatedClock
+from config import log, PAPER, ROCK, SCISSOR, THUMB_UP
+from game.event_log import event_log
+from game.leaderboard import Leaderboard
+from game.phases import update_game
+from game.snapshot import SnapshotWriter, capture_snapshot, load_snapshot, restore_game_state
+from game_state import GamePhase, GameState
+
+
+class TestSnapshot(unittest.TestCase):
+    """Save a running match, restart, and continue it."""
+
+    def setUp(self):
+        self.previous_level = log.level
+        log.setLevel(logging.ERROR)
+        self.addCleanup(log.setLevel, self.previous_level)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'game.snapshot')
+        self.clock = SimulatedClock(1024.0)
+
+    def hold(self, game_state, signs_by_id, seconds, centers_by_id=None):
+        """Show the same signs for `seconds` in steps of 0.5 seconds."""
+        for _ in range(int(seconds * 2)):
+            update_game(signs_by_id, game_state, self.clock.advance(0.5), centers_by_id)
+
+    def play_one_round(self):
+        """Register hands 1 (left) and 2 (right) and let player 1 win a round."""
+        game_state = GameState(self.clock.now())
+        centers = {1: (200, 300), 2: (900, 300)}
+        self.hold(game_state, {1: THUMB_UP, 2: THUMB_UP}, game_state.lock_duration + 1.5, centers)
+        self.hold(game_state, {1: ROCK, 2: SCISSOR}, game_state.lock_duration + 1.0, centers)
+        self.assertEqual(game_state.matches[0].p1.score, 1)
+        return game_state
+
+    def test_snapshot_file_is_replaced_atomically(self):
+        """The writer thread leaves a complete file and no temporary file."""
+        game_state = self.play_one_round()
+        writer = SnapshotWriter(self.path, interval=1.0)
+        writer.maybe_write(game_state, self.clock.now())
+        writer.maybe_write(game_state, self.clock.advance(0.5))  # Within the interval, skipped
+        writer.close()
+
+        self.assertEqual(writer.snapshots_written, 1)
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+        snapshot = load_snapshot(self.path, self.clock.now())
+        self.assertEqual(snapshot, capture_snapshot(game_state, self.clock.now() - 0.5))
+
+        # No match left: the file is removed
+        writer = SnapshotWriter(self.path)
+        writer.maybe_write(GameState(self.clock.now()), self.clock.now())
+        writer.close()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_restore_reassociates_by_position(self):
+        """New track IDs take over the restored players closest to their hands and keep the scores."""
+        snapshot = capture_snapshot(self.play_one_round(), self.clock.now())
+        game_state = restore_game_state(snapshot, self.clock.advance(3.0))
+        self.assertEqual(game_state.phase, GamePhase.GAME)
+        self.assertEqual(len(game_state.awaiting_players), 2)
+
+        # After the restart the tracker numbers the hands from 1 again, right hand first
+        centers = {1: (910, 310), 2: (190, 290)}
+        self.hold(game_state, {1: SCISSOR, 2: PAPER}, game_state.lock_duration + 1.0, centers)
+
+        match = game_state.matches[0]
+        self.assertEqual(game_state.awaiting_players, [])
+        self.assertEqual((match.p1.id, match.p2.id), (2, 1))
+        self.assertEqual((match.p1.score, match.p2.score), (1, 1))
+        self.assertEqual(match.rounds_played, 2)
+        self.assertEqual(len(game_state.pending_hands), 0)
+
+    def test_restored_match_keeps_its_leaderboard_rows(self):
+        """Rounds played after a restore are stored on the match and sessions of the crashed run."""
+        db_path = os.path.join(os.path.dirname(self.path), 'scores.db')
+        self.addCleanup(event_log.close)
+        event_log.attach(Leaderboard(db_path))
+        snapshot = capture_snapshot(self.play_one_round(), self.clock.now())
+        event_log.close()  # The crashed run's shutdown closes the live match
+
+        event_log.attach(Leaderboard(db_path))
+        game_state = restore_game_state(snapshot, self.clock.advance(3.0))
+        centers = {1: (910, 310), 2: (190, 290)}
+        self.hold(game_state, {1: SCISSOR, 2: PAPER}, game_state.lock_duration + 1.0, centers)
+        event_log.close()
+
+        connection = sqlite3.connect(db_path)
+        self.addCleanup(connection.close)
+        self.assertEqual(connection.execute('SELECT rounds, end_reason FROM matches').fetchall(), [(2, 'closed')])
+        self.assertEqual(connection.execute('SELECT slot, wins FROM sessions ORDER BY slot').fetchall(),
+                         [(1, 1), (2, 1)])
+        self.assertEqual(connection.execute('SELECT COUNT(*) FROM rounds').fetchone(), (2,))
+
+    def test_match_restored_twice_keeps_its_leaderboard_rows(self):
+        """A second restart finds the rows again, although the restored start time moved by the downtime."""
+        db_path = os.path.join(os.path.dirname(self.path), 'scores.db')
+        self.addCleanup(event_log.close)
+        event_log.attach(Leaderboard(db_path))
+        snapshot = capture_snapshot(self.play_one_round(), self.clock.now())
+        event_log.close()
+
+        centers = {1: (910, 310), 2: (190, 290)}
+        for signs in ({1: SCISSOR, 2: PAPER}, {1: PAPER, 2: ROCK}):
+            event_log.attach(Leaderboard(db_path))
+            game_state = restore_game_state(snapshot, self.clock.advance(3.0))
+            self.hold(game_state, signs, game_state.lock_duration + 1.0, centers)
+            snapshot = capture_snapshot(game_state, self.clock.now())
+            event_log.close()
+
+        connection = sqlite3.connect(db_path)
+        self.addCleanup(connection.close)
+        matches = connection.execute('SELECT rounds, end_reason, ended_at IS NOT NULL FROM matches').fetchall()
+        self.assertEqual(matches, [(3, 'closed', 1)])
+        self.assertEqual(connection.execute('SELECT slot, wins, ended_at IS NOT NULL FROM sessions ORDER BY slot')
+                         .fetchall(), [(1, 1, 1), (2, 2, 1)])
+        self.assertEqual(connection.execute('SELECT COUNT(*) FROM rounds').fetchone(), (3,))
+
+    def test_stale_snapshot_is_ignored(self):
+        """A snapshot older than the disconnect timeout starts a new game."""
+        game_state = self.play_one_round()
+        writer = SnapshotWriter(self.path)
+        writer.maybe_write(game_state, self.clock.now())
+        writer.close()
+
+        self.assertIsNotNone(load_snapshot(self.path, self.clock.now() + 1.0))
+        self.assertIsNone(load_snapshot(self.path, self.clock.now() + game_state.disconnect_timeout + 1.0))
+        with open(self.path, 'wb') as f:
+            f.write(b'truncated')
+        self.assertIsNone(load_snapshot(self.path, self.clock.now()))
+
+
+if __name__ == '__main__':
+    unittest.main()
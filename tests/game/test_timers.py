@@ -0,0 +1,107 @@
+"""
+Unit tests for the timer queue and the timeouts scheduled on it.
+
+Covers firing order, cancellation, and the disconnect and visibility
+timeouts of pending hands and matches.
+"""
+import logging
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from config import log, ROCK, THUMB_UP
+from detection.hand_tracking import update_player_detection
+from game.phases import update_game
+from game.player_timeout import PlayerTimeoutManager
+from game.timers import TimerQueue
+from game_state import GamePhase, GameState
+
+
+class TestTimerQueue(unittest.TestCase):
+    """Deadline ordering and cancellation."""
+
+    def test_fires_expired_timers_in_order(self):
+        """Only timers at or before now fire, earliest first."""
+        timers = TimerQueue()
+        fired = []
+        timers.schedule(3.0, lambda now, name: fired.append((now, name)), 'c')
+        timers.schedule(1.0, lambda now, name: fired.append((now, name)), 'a')
+        timers.schedule(2.0, lambda now, name: fired.append((now, name)), 'b')
+
+        self.assertEqual(timers.advance(0.5), 0)
+        self.assertEqual(timers.advance(2.0), 2)
+        self.assertEqual(fired, [(2.0, 'a'), (2.0, 'b')])
+        self.assertEqual(len(timers), 1)
+        self.assertEqual(timers.next_deadline(), 3.0)
+
+    def test_cancelled_timers_do_not_fire(self):
+        """Cancelled timers are skipped and compacted away."""
+        timers = TimerQueue()
+        fired = []
+        handles = [timers.schedule(float(i), lambda now, i: fired.append(i), i) for i in range(200)]
+        for handle in handles[:150]:
+            timers.cancel(handle)
+        timers.cancel(handles[0])  # Cancelling twice is harmless
+
+        self.assertEqual(len(timers), 50)
+        self.assertLess(len(timers._heap), 200)
+        timers.advance(1000.0)
+        self.assertEqual(fired, list(range(150, 200)))
+        self.assertEqual(len(timers), 0)
+
+
+class TestScheduledTimeouts(unittest.TestCase):
+    """Game timeouts driven by the timer queue."""
+
+    def setUp(self):
+        self.previous_level = log.level
+        log.setLevel(logging.ERROR)
+        self.addCleanup(log.setLevel, self.previous_level)
+
+    def test_pending_hand_disconnects_after_leaving_view(self):
+        """A hand is removed once it has been out of view for the disconnect timeout."""
+        game_state = GameState(0.0)
+        update_player_detection({1: ROCK, 2: ROCK}, game_state, 1.0)
+        self.assertEqual(len(game_state.timers), 0)
+
+        update_player_detection({2: ROCK}, game_state, 2.0)
+        self.assertEqual(len(game_state.timers), 1)  # Only the hand that left is scheduled
+        update_player_detection({2: ROCK}, game_state, 1.0 + game_state.disconnect_timeout - 1)
+        self.assertIn(1, game_state.pending_hands)
+        update_player_detection({2: ROCK}, game_state, 1.0 + game_state.disconnect_timeout)
+        self.assertNotIn(1, game_state.pending_hands)
+        self.assertIn(2, game_state.pending_hands)
+
+    def test_returning_hand_cancels_disconnect(self):
+        """A hand seen again keeps its place and its timer is cancelled."""
+        game_state = GameState(0.0)
+        update_player_detection({1: ROCK}, game_state, 1.0)
+        update_player_detection({}, game_state, 2.0)
+        update_player_detection({1: ROCK}, game_state, 3.0)
+        self.assertEqual(len(game_state.timers), 0)
+        update_player_detection({1: ROCK}, game_state, 1.0 + game_state.disconnect_timeout + 5)
+        self.assertIn(1, game_state.pending_hands)
+
+    def test_match_ends_on_visibility_timeout(self):
+        """A match ends when a player stays out of view for the timeout duration."""
+        game_state = GameState(0.0)
+        thumbs = {1: THUMB_UP, 2: THUMB_UP}
+        for now in (1.0, 2.0, 3.0, 3.0 + game_state.lock_duration):
+            update_game(thumbs, game_state, now)
+        self.assertEqual(game_state.phase, GamePhase.GAME)
+
+        start = 10.0
+        update_game({1: ROCK}, game_state, start)
+        update_game({1: ROCK}, game_state, start + PlayerTimeoutManager.TIMEOUT_DURATION - 1)
+        self.assertEqual(game_state.phase, GamePhase.GAME)
+        self.assertTrue(game_state.matches[0].timeout_manager.is_active())
+        update_game({1: ROCK}, game_state, start + PlayerTimeoutManager.TIMEOUT_DURATION)
+        self.assertEqual(game_state.phase, GamePhase.DETECTION)
+        self.assertEqual(len(game_state.timers), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,46 @@
+"""
+Unit tests for the frame latency monitor.
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from instrumentation.latency import FrameStamp, LatencyMonitor, percentile
+
+
+class TestLatencyMonitor(unittest.TestCase):
+    """Test cases for frame stamping and latency statistics."""
+
+    def test_sequence_numbers_increase(self):
+        """Each captured frame gets the next sequence number."""
+        monitor = LatencyMonitor()
+        seqs = [monitor.stamp_capture().seq for _ in range(3)]
+        self.assertEqual(seqs, [0, 1, 2])
+
+    def test_summary_uses_recent_window(self):
+        """Only the most recent frames contribute to the distribution."""
+        monitor = LatencyMonitor(window=2)
+        for capture_time in (0.0, 100.0, 100.0):
+            monitor.mark_displayed(FrameStamp(0, capture_time, 0.0))
+
+        stats = monitor.summary()
+        self.assertEqual(stats['frames'], 2)
+        self.assertLess(stats['max_ms'] - stats['min_ms'], 1000)
+
+    def test_empty_summary(self):
+        """No statistics are reported before any frame is displayed."""
+        self.assertEqual(LatencyMonitor().summary(), {'frames': 0})
+
+    def test_percentile_interpolates(self):
+        """Percentiles interpolate between neighbouring values."""
+        values = [0.0, 10.0, 20.0, 30.0]
+        self.assertEqual(percentile(values, 0.0), 0.0)
+        self.assertEqual(percentile(values, 1.0), 30.0)
+        self.assertAlmostEqual(percentile(values, 0.5), 15.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,112 @@
+"""
+Unit tests for queued logging.
+
+Covers per-call-site rate limiting, deferred message formatting, dropping
+records when the queue is full and flushing on stop.
+"""
+import logging
+import queue
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from instrumentation.log_queue import (NonBlockingQueueHandler, RateLimitFilter,
+                                       start_queued_logging, stop_queued_logging)
+
+
+def make_record(msg, args=(), lineno=10, created=0.0, level=logging.INFO):
+    """Log record from a fixed call site at a given time."""
+    record = logging.LogRecord('test', level, 'phases.py', lineno, msg, args, None)
+    record.created = created
+    return record
+
+
+class ListHandler(logging.Handler):
+    """Handler that keeps the formatted messages."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    """Test cases for the RateLimitFilter class."""
+
+    def test_call_site_is_limited_to_burst(self):
+        """A call site emits `burst` records, then one per refill period."""
+        rate_limit = RateLimitFilter(burst=3, interval=1.0)
+        allowed = [rate_limit.filter(make_record("tick", created=i * 0.01)) for i in range(10)]
+        self.assertEqual(allowed, [True] * 3 + [False] * 7)
+
+        record = make_record("tick", created=0.5)
+        self.assertTrue(rate_limit.filter(record))
+        self.assertEqual(record.getMessage(), "tick (7 similar messages suppressed)")
+
+    def test_call_sites_are_independent(self):
+        """Another line is not limited by a noisy one, and errors always pass."""
+        rate_limit = RateLimitFilter(burst=1, interval=1.0)
+        self.assertTrue(rate_limit.filter(make_record("a", lineno=10)))
+        self.assertFalse(rate_limit.filter(make_record("a", lineno=10)))
+        self.assertTrue(rate_limit.filter(make_record("b", lineno=20)))
+        self.assertTrue(rate_limit.filter(make_record("a", lineno=10, level=logging.ERROR)))
+
+
+class TestNonBlockingQueueHandler(unittest.TestCase):
+    """Test cases for the NonBlockingQueueHandler class."""
+
+    def test_plain_arguments_are_formatted_later(self):
+        """Records with plain arguments are queued unformatted."""
+        handler = NonBlockingQueueHandler(queue.Queue())
+        record = make_record("Round result: %s", ('Tie',))
+        prepared = handler.prepare(record)
+        self.assertIs(prepared, record)
+        self.assertEqual(prepared.args, ('Tie',))
+
+    def test_mutable_arguments_are_formatted_now(self):
+        """Objects that may change after the call are formatted before queueing."""
+        handler = NonBlockingQueueHandler(queue.Queue())
+        state = {'score': 1}
+        record = make_record("%s state: %s", ('P1', state))
+        prepared = handler.prepare(record)
+        state['score'] = 2
+        self.assertEqual(prepared.getMessage(), "P1 state: {'score': 1}")
+        self.assertEqual(record.args, ('P1', state))
+
+    def test_full_queue_drops_records(self):
+        """The caller never waits for a full queue."""
+        handler = NonBlockingQueueHandler(queue.Queue(2))
+        for i in range(5):
+            handler.handle(make_record("tick", lineno=i))
+        self.assertEqual(handler.queue.qsize(), 2)
+        self.assertEqual(handler.dropped, 3)
+
+
+class TestQueuedLogging(unittest.TestCase):
+    """Test cases for start_queued_logging and stop_queued_logging."""
+
+    def test_records_reach_handlers_in_background(self):
+        """Handlers move behind the queue and receive every record after stop."""
+        logger = logging.getLogger('test_log_queue.background')
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        target = ListHandler()
+        logger.addHandler(target)
+
+        listener = start_queued_logging(logger, burst=100)
+        self.assertIsInstance(logger.handlers[0], NonBlockingQueueHandler)
+        for i in range(20):
+            logger.info("Tracking new hand: ID %s", i)
+        stop_queued_logging(logger, listener)
+        stop_queued_logging(logger, listener)
+
+        self.assertEqual(target.messages, [f"Tracking new hand: ID {i}" for i in range(20)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
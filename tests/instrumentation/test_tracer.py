@@ -0,0 +1,83 @@
+"""
+Unit tests for the frame pipeline tracer.
+
+Covers span recording, the ring buffer bound, the disabled fast path and
+the Chrome Trace Event export format.
+"""
+import json
+import os
+import tempfile
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src/rps-game directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "rps-game"))
+
+from instrumentation.tracer import Tracer
+
+
+class TestTracer(unittest.TestCase):
+    """Test cases for the Tracer class."""
+
+    def test_disabled_tracer_records_nothing(self):
+        """Spans are ignored until tracing is enabled."""
+        tracer = Tracer()
+        with tracer.span('capture'):
+            pass
+        self.assertEqual(len(tracer), 0)
+
+    def test_span_is_exported_as_complete_event(self):
+        """Each span becomes one 'X' event with timestamp and duration."""
+        tracer = Tracer(enabled=True)
+        with tracer.span('game_logic', phase='detection'):
+            pass
+
+        events = [e for e in tracer.to_chrome_trace()['traceEvents'] if e['ph'] == 'X']
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['name'], 'game_logic')
+        self.assertEqual(events[0]['args'], {'phase': 'detection'})
+        self.assertGreaterEqual(events[0]['dur'], 0)
+
+    def test_ring_buffer_keeps_most_recent_spans(self):
+        """Only the last `capacity` spans are kept."""
+        tracer = Tracer(capacity=3, enabled=True)
+        for i in range(10):
+            tracer.instant(f"marker{i}")
+
+        names = [e['name'] for e in tracer.to_chrome_trace()['traceEvents'] if e['ph'] == 'X']
+        self.assertEqual(names, ['marker7', 'marker8', 'marker9'])
+
+    def test_worker_threads_get_named_tracks(self):
+        """Spans from other threads are exported with thread name metadata."""
+        tracer = Tracer(enabled=True)
+
+        def work():
+            with tracer.span('background'):
+                pass
+
+        thread = threading.Thread(target=work, name='writer')
+        thread.start()
+        thread.join()
+
+        events = tracer.to_chrome_trace()['traceEvents']
+        thread_names = [e['args']['name'] for e in events if e['name'] == 'thread_name']
+        self.assertIn('writer', thread_names)
+
+    def test_write_produces_valid_json(self):
+        """The written file is a loadable trace document."""
+        tracer = Tracer(enabled=True)
+        with tracer.span('frame'):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trace.json')
+            self.assertEqual(tracer.write(path), 1)
+            with open(path) as f:
+                document = json.load(f)
+        self.assertIn('traceEvents', document)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,57 @@
+"""
+Unit tests for the background image writer and YOLO label helpers.
+
+Covers ROI to YOLO box conversion, label paths and writing captures with
+their labels from the writer threads.
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the src directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from async_image_writer import AsyncImageWriter, encode_params
+from yolo_labels import box_to_yolo, format_label_line, label_path_for
+
+
+class TestYoloLabels(unittest.TestCase):
+    """Pixel boxes to YOLO label lines."""
+
+    def test_box_to_yolo(self):
+        """Boxes are normalized around their center and clipped to the image."""
+        self.assertEqual(box_to_yolo(10, 10, 300, 300, 1280, 720), (160 / 1280, 160 / 720, 300 / 1280, 300 / 720))
+        self.assertEqual(box_to_yolo(1180, -50, 200, 100, 1280, 720), (1230 / 1280, 25 / 720, 100 / 1280, 50 / 720))
+        self.assertEqual(format_label_line(2, (0.5, 0.25, 0.1, 0.2)), '2 0.500000 0.250000 0.100000 0.200000')
+        self.assertEqual(label_path_for(os.path.join('captured', 'images', 'a.png')),
+                         os.path.join('captured', 'labels', 'a.txt'))
+
+
+class TestAsyncImageWriter(unittest.TestCase):
+    """Captures written by the pool of writer threads."""
+
+    def test_images_and_labels_are_written(self):
+        """Every submitted image and label is on disk after close."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        writer = AsyncImageWriter(workers=3, queue_size=4, params=encode_params('png', 1))
+        frame = np.zeros((72, 128, 3), dtype=np.uint8)
+        for i in range(20):
+            frame[:] = i
+            path = os.path.join(tmp.name, 'images', f'{i}.png')
+            writer.submit(path, frame.copy(), label_path_for(path), [f'{i % 6} 0.5 0.5 0.2 0.2'])
+        writer.close()
+
+        self.assertEqual((writer.written, writer.failed), (20, 0))
+        self.assertEqual(int(cv2.imread(os.path.join(tmp.name, 'images', '7.png'))[0, 0, 0]), 7)
+        with open(os.path.join(tmp.name, 'labels', '7.txt')) as f:
+            self.assertEqual(f.read(), '1 0.5 0.5 0.2 0.2\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for the auto-labelling tool.
+
+Covers label files and confidence sidecars written from detector results,
+resuming after an interruption and the review list.
+"""
+import json
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src and src/rps-game directories to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "rps-game"))
+
+import auto_label
+from config import CLASS_NAMES, ROCK
+from detection.recording import RecordedBoxes, RecordedResult
+
+ROCK_ID = CLASS_NAMES.index(ROCK)
+
+
+class RecordedDetector:
+    """Detector returning one canned box per image, with the confidence encoded in the file name."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, paths, **kwargs):
+        self.batches.append(list(paths))
+        results = []
+        for path in paths:
+            conf = float(Path(path).stem.split('_')[1]) / 100
+            boxes = RecordedBoxes(np.array([[160, 120, 480, 360]], np.float32), np.array([conf], np.float16),
+                                  np.array([ROCK_ID], np.uint8), np.array([-1], np.int32))
+            results.append(RecordedResult(boxes, (480, 640), 0.0))
+        return results
+
+
+class TestAutoLabel(unittest.TestCase):
+    """Label a folder of captures in batches."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.image_dir = os.path.join(tmp.name, 'images')
+        os.makedirs(self.image_dir)
+        for conf in (95, 90, 40, 10):
+            Path(self.image_dir, f'img_{conf}.png').write_bytes(b'png')
+        self.label_dir = auto_label.default_label_dir(self.image_dir)
+        os.makedirs(self.label_dir)
+
+    def test_labels_sidecars_and_review(self):
+        """Boxes above conf are labelled, and uncertain or empty images are flagged for review."""
+        pending, _ = auto_label.pending_images(self.image_dir, self.label_dir)
+        flagged = auto_label.label_batch(RecordedDetector(), pending, self.label_dir, min_conf=0.25, review_conf=0.6)
+
+        self.assertEqual([review for _, review in flagged], [True, True, False, False])  # 10, 40, 90, 95
+        with open(os.path.join(self.label_dir, 'img_95.txt')) as f:
+            self.assertEqual(f.read(), f'{ROCK_ID} 0.500000 0.500000 0.500000 0.500000\n')
+        with open(os.path.join(self.label_dir, 'img_10.txt')) as f:
+            self.assertEqual(f.read(), '')  # Below conf, no box
+        with open(auto_label.sidecar_path(self.label_dir, 'img_40')) as f:
+            self.assertEqual(json.load(f)['detections'], [{'class': ROCK_ID, 'name': ROCK, 'conf': 0.3999}])
+        self.assertEqual(auto_label.write_review_list(self.label_dir), 2)
+        review_path = os.path.join(os.path.dirname(self.label_dir), 'review.txt')  # Outside labels/
+        with open(review_path) as f:
+            self.assertEqual([Path(line).name for line in f.read().split()], ['img_10.png', 'img_40.png'])
+        self.assertFalse(os.path.exists(os.path.join(self.label_dir, 'review.txt')))
+
+    def test_resume_skips_done_and_hand_labelled_images(self):
+        """Only images without a finished label are labelled again."""
+        detector = RecordedDetector()
+        auto_label.label_batch(detector, [os.path.join(self.image_dir, 'img_95.png')], self.label_dir)
+        Path(self.label_dir, 'img_90.txt').write_text(f'{ROCK_ID} 0.5 0.5 0.3 0.3\n')  # Labelled by hand
+        # Interrupted after the sidecar was written
+        auto_label.label_batch(detector, [os.path.join(self.image_dir, 'img_40.png')], self.label_dir)
+        os.remove(os.path.join(self.label_dir, 'img_40.txt'))
+
+        pending, done = auto_label.pending_images(self.image_dir, self.label_dir)
+        self.assertEqual([Path(path).name for path in pending], ['img_10.png', 'img_40.png'])
+        self.assertEqual(done, 1)
+        pending, _ = auto_label.pending_images(self.image_dir, self.label_dir, overwrite=True)
+        self.assertEqual(len(pending), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
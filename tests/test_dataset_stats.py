@@ -0,0 +1,83 @@
+"""
+Unit tests for the dataset inspection tool.
+
+Covers malformed label checks, the per class report and reparsing only
+changed files through the label index.
+"""
+import os
+import pickle
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import dataset_stats
+from config import CLASS_NAMES, PAPER, ROCK
+
+
+class TestDatasetStats(unittest.TestCase):
+    """Index and summarize a small labelled dataset."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.label_dir = Path(tmp.name) / 'labels'
+        self.label_dir.mkdir()
+        self.rock = CLASS_NAMES.index(ROCK)
+        self.paper = CLASS_NAMES.index(PAPER)
+        for i in range(10):
+            (self.label_dir / f'rock_{i}.txt').write_text(f'{self.rock} 0.5 0.5 0.2 0.4\n')
+        (self.label_dir / 'pair.txt').write_text(f'{self.rock} 0.25 0.5 0.2 0.4\n{self.paper} 0.75 0.5 0.4 0.2\n')
+        (self.label_dir / 'empty.txt').write_text('')
+
+    def test_malformed_lines_are_reported(self):
+        """Bad lines are reported with their line number and valid lines are kept."""
+        path = self.label_dir / 'bad.txt'
+        path.write_text(f'{self.rock} 0.5 0.5 0.2 0.2\n'
+                        f'{self.rock} 0.5 0.5 0.2 0.2\n'
+                        '99 0.5 0.5 0.2 0.2\n'
+                        f'{self.rock} 0.95 0.5 0.2 0.2\n'
+                        f'{self.rock} 0.5 0.5\n'
+                        f'{self.rock} a 0.5 0.2 0.2\n')
+        boxes, errors = dataset_stats.parse_label_file(path)
+        self.assertEqual(boxes, ((self.rock, 0.5, 0.5, 0.2, 0.2),))
+        self.assertEqual(errors, ('line 2: duplicate box', 'line 3: unknown class 99',
+                                  'line 4: box outside the image', 'line 5: 3 fields instead of 5',
+                                  'line 6: not a number'))
+
+    def test_report_and_incremental_index(self):
+        """The report counts boxes per class, and a rerun only reparses changed files."""
+        entries, reparsed = dataset_stats.build_index(self.label_dir, workers=1)
+        self.assertEqual(reparsed, 12)
+        report = dataset_stats.summarize(entries, image_files={'rock_0.png': None, 'extra.png': None})
+        self.assertEqual(report['files']['boxes'], 12)
+        self.assertEqual(report['files']['empty_labels'], 1)
+        self.assertEqual(report['files']['images_without_labels'], 1)
+        self.assertEqual(len(report['files']['labels_without_images']), 11)
+        rock = report['classes'][ROCK]
+        self.assertEqual((rock['boxes'], rock['images']), (11, 11))
+        self.assertAlmostEqual(rock['aspect'][50], 0.5)
+        self.assertEqual(report['classes'][PAPER]['boxes'], 1)
+        self.assertEqual(report['errors'], {})
+
+        _, reparsed = dataset_stats.build_index(self.label_dir, workers=1)
+        self.assertEqual(reparsed, 0)
+        (self.label_dir / 'rock_3.txt').write_text(f'{self.rock} 0.5 0.5 0.2 0.4\n{self.paper} 0.5 0.5 0.9 0.9\n')
+        (self.label_dir / 'rock_4.txt').unlink()
+        entries, reparsed = dataset_stats.build_index(self.label_dir, workers=1)
+        self.assertEqual(reparsed, 1)
+        self.assertEqual(len(entries), 11)
+        self.assertEqual(dataset_stats.summarize(entries)['classes'][PAPER]['boxes'], 2)
+
+        # An index file from another tool is ignored and rebuilt
+        with open(self.label_dir / dataset_stats.INDEX_FILE, 'wb') as f:
+            pickle.dump(['not', 'an', 'index'], f)
+        _, reparsed = dataset_stats.build_index(self.label_dir, workers=1)
+        self.assertEqual(reparsed, 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
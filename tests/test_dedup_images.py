@@ -0,0 +1,97 @@
+"""
+Unit tests for the near-duplicate image index.
+
+Covers perceptual hashes of similar images, multi-index hash lookups and finding,
+removing and checking duplicates with an incremental index.
+"""
+import os
+import random
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the src directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dedup_images import MultiIndexHash, HashIndex, check_images, find_duplicates, hamming, phash, remove_duplicates
+
+
+def scene(seed, shift=0, noise=0):
+    """Smooth random scene, optionally shifted by a few pixels and with sensor noise."""
+    rng = np.random.default_rng(seed)
+    image = cv2.resize(rng.integers(0, 255, (12, 16, 3), dtype=np.uint8), (320, 240), interpolation=cv2.INTER_CUBIC)
+    image = np.roll(image, shift, axis=1)
+    if noise:
+        image = cv2.add(image, rng.integers(0, noise, image.shape, dtype=np.uint8))
+    return image
+
+
+class TestPerceptualHash(unittest.TestCase):
+    """Hashes and the multi-index hash table."""
+
+    def test_similar_images_have_close_hashes(self):
+        """Noise and small shifts change few bits, another scene changes many."""
+        base = phash(scene(1))
+        self.assertLessEqual(hamming(base, phash(scene(1, shift=2, noise=8))), 6)
+        self.assertGreater(hamming(base, phash(scene(2))), 12)
+
+    def test_lookup_matches_brute_force(self):
+        """Queries return exactly the hashes within the distance."""
+        rng = random.Random(0)
+        values = [rng.getrandbits(64) for _ in range(500)]
+        values += [value ^ (1 << rng.randrange(64)) for value in values[:50]]
+        table = MultiIndexHash(max_distance=6)
+        for i, value in enumerate(values):
+            table.add(value, i)
+        for query in values[:20] + [value ^ 0b1011 for value in values[20:40]] + [rng.getrandbits(64)]:
+            for distance in (4, 6):
+                expected = sorted(i for i, value in enumerate(values) if hamming(query, value) <= distance)
+                self.assertEqual(sorted(i for _, i in table.query(query, distance)), expected)
+
+
+class TestHashIndex(unittest.TestCase):
+    """Duplicates of a capture folder."""
+
+    def test_find_remove_and_check(self):
+        """Runs of similar captures keep their first frame, and new captures are checked incrementally."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        image_dir = os.path.join(tmp.name, 'images')
+        os.makedirs(image_dir)
+        os.makedirs(os.path.join(tmp.name, 'labels'))
+        for i in range(4):
+            cv2.imwrite(os.path.join(image_dir, f'a_{i}.png'), scene(1, shift=i, noise=6))
+            Path(tmp.name, 'labels', f'a_{i}.txt').write_text('2 0.5 0.5 0.2 0.2\n')
+        cv2.imwrite(os.path.join(image_dir, 'b_0.png'), scene(2))
+
+        index = HashIndex(image_dir)
+        self.assertEqual(index.update(workers=1), 5)
+        duplicates = find_duplicates(index)
+        self.assertEqual([(name, kept) for name, kept, _ in duplicates],
+                         [('a_1.png', 'a_0.png'), ('a_2.png', 'a_0.png'), ('a_3.png', 'a_0.png')])
+        remove_duplicates(index, duplicates)
+        self.assertEqual(sorted(os.listdir(image_dir)), ['.phash_index.pkl', 'a_0.png', 'b_0.png'])
+        self.assertEqual(os.listdir(os.path.join(tmp.name, 'labels')), ['a_0.txt'])
+
+        index = HashIndex(image_dir)
+        self.assertEqual(index.update(workers=1), 0)
+        new_path = os.path.join(tmp.name, 'new.png')
+        cv2.imwrite(new_path, scene(2, shift=1, noise=4))
+        other_path = os.path.join(tmp.name, 'other.png')
+        cv2.imwrite(other_path, scene(3))
+        checked = check_images(index, [new_path, other_path])
+        self.assertEqual([(path, name) for path, name, _ in checked], [(new_path, 'b_0.png'), (other_path, None)])
+
+        # A new capture written into the indexed folder is indexed by update but does not match itself
+        capture_path = os.path.join(image_dir, 'capture.png')
+        cv2.imwrite(capture_path, scene(4))
+        self.assertEqual(index.update(workers=1), 1)
+        self.assertEqual(check_images(index, [capture_path]), [(capture_path, None, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for the cached evaluation tool.
+
+Covers inferring only images without cached predictions and the
+precision, recall, mAP and confusion matrix computed from the cache.
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src and src/rps-game directories to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "rps-game"))
+
+import eval_cache
+from config import CLASS_NAMES
+from detection.recording import RecordedBoxes, RecordedResult
+
+NUM_CLASSES = len(CLASS_NAMES)
+
+
+class RecordedDetector:
+    """Detector returning one box at the middle of each image, of the class written in the file."""
+
+    def __init__(self):
+        self.images = []
+
+    def predict(self, paths, **kwargs):
+        self.images.extend(Path(path).name for path in paths)
+        results = []
+        for path in paths:
+            cls = int(Path(path).read_bytes())
+            boxes = RecordedBoxes(np.array([[160, 120, 480, 360]], np.float32), np.array([0.9], np.float16),
+                                  np.array([cls], np.uint8), np.array([-1], np.int32))
+            results.append(RecordedResult(boxes, (480, 640), 0.0))
+        return results
+
+
+def prediction(cls, box, conf):
+    return np.array([[*box, conf, cls]], np.float32)
+
+
+def label(cls, box):
+    return np.array([[cls, *box]], np.float32)
+
+
+class TestEvalCache(unittest.TestCase):
+    """Evaluate from cached predictions."""
+
+    def test_only_new_or_changed_images_are_inferred(self):
+        """Unchanged images and copies reuse their cached predictions."""
+        with tempfile.TemporaryDirectory() as tmp:
+            image_dir = os.path.join(tmp, 'images')
+            os.makedirs(image_dir)
+            for name, cls in (('a.png', 0), ('b.png', 1), ('c.png', 0)):  # c is a copy of a
+                Path(image_dir, name).write_bytes(str(cls).encode())
+            paths = sorted(str(path) for path in Path(image_dir).iterdir())
+            key = eval_cache.settings_key('weights', 640, 0.7, 300)
+            cache = os.path.join(tmp, 'cache.pkl')
+
+            detector = RecordedDetector()
+            store = eval_cache.PredictionStore(cache)
+            digests, hashed = store.digests(paths)
+            self.assertEqual((hashed, eval_cache.infer_missing(detector, store, key, paths, digests)), (3, 2))
+            np.testing.assert_allclose(store.get(key, digests[0]), [[0.25, 0.25, 0.75, 0.75, 0.9, 0]], atol=1e-3)
+
+            Path(image_dir, 'b.png').write_bytes(b'2')
+            store = eval_cache.PredictionStore(cache)
+            digests, hashed = store.digests(paths)
+            self.assertEqual((hashed, eval_cache.infer_missing(detector, store, key, paths, digests)), (1, 1))
+            self.assertEqual(detector.images, ['a.png', 'b.png', 'b.png'])
+            self.assertEqual(store.get(key, digests[1])[0, 5], 2)
+            self.assertIsNone(store.get(eval_cache.settings_key('weights', 320, 0.7, 300), digests[0]))
+
+    def test_metrics(self):
+        """A perfect detection, a misclassification, a false positive and a miss."""
+        box = (0.1, 0.1, 0.5, 0.5)
+        predictions = [prediction(0, box, 0.9), prediction(1, box, 0.8),
+                       np.concatenate([prediction(0, box, 0.7), prediction(0, (0.6, 0.6, 0.9, 0.9), 0.6)]),
+                       np.zeros((0, 6), np.float32)]
+        labels = [label(0, box), label(2, box), label(0, box), label(1, box)]
+        metrics = eval_cache.evaluate(predictions, labels, NUM_CLASSES)
+
+        first = metrics['classes'][0]
+        self.assertEqual((first['images'], first['instances']), (2, 2))
+        self.assertAlmostEqual(first['precision'], 2 / 3)
+        self.assertEqual(first['recall'], 1.0)
+        self.assertEqual((first['map50'], first['map50_95']), (1.0, 1.0))
+        self.assertEqual(metrics['classes'][1]['recall'], 0.0)
+        self.assertEqual(metrics['classes'][2]['map50'], 0.0)
+        self.assertEqual(metrics['all']['instances'], 4)
+
+        expected = np.zeros((NUM_CLASSES + 1, NUM_CLASSES + 1), int)
+        expected[0, 0] = 2
+        expected[2, 1] = 1  # Misclassified
+        expected[NUM_CLASSES, 0] = 1  # False positive
+        expected[1, NUM_CLASSES] = 1  # Missed
+        np.testing.assert_array_equal(metrics['confusion'], expected)
+
+    def test_average_precision_ranks_by_confidence(self):
+        """A confident false positive ranked before the true positive halves the precision."""
+        box = (0.1, 0.1, 0.5, 0.5)
+        predictions = [np.concatenate([prediction(0, (0.6, 0.6, 0.9, 0.9), 0.9), prediction(0, box, 0.5)])]
+        metrics = eval_cache.evaluate(predictions, [label(0, box)], NUM_CLASSES)
+        self.assertAlmostEqual(metrics['classes'][0]['map50'], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
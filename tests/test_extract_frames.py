@@ -0,0 +1,111 @@
+"""
+Unit tests for the video frame extractor.
+
+Covers choosing frames by novelty and motion, and extracting the frames of
+a video in one or several segments.
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the src directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from extract_frames import FrameSampler, extract_segment, extract_videos, video_segments
+
+
+def scene(hand_x=None, hand_height=100):
+    """Gray 320x240 frame with a dark 'hand' rectangle."""
+    frame = np.full((240, 320, 3), 160, np.uint8)
+    if hand_x is not None:
+        cv2.rectangle(frame, (hand_x, 60), (hand_x + 80, 60 + hand_height), (30, 40, 50), -1)
+    return frame
+
+
+def write_video(path, frames):
+    """Write BGR frames to an MJPG video at 10 frames per second."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (320, 240))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+class TestExtractFrames(unittest.TestCase):
+    """Sample recorded videos into dataset images."""
+
+    OPTIONS = {'novelty': 0.02, 'max_motion': 0.01, 'min_gap': 0.5, 'extension': 'png', 'compression': None,
+               'writer_threads': 1, 'batch': 4, 'conf': 0.25, 'imgsz': 640}
+
+    def extract(self, video, segment_seconds, image_dir):
+        """Frame indices kept from a video cut into segments, analysing every third frame."""
+        with ThreadPoolExecutor(2) as executor, contextlib.redirect_stdout(io.StringIO()):
+            _, written = extract_videos(executor, video_segments(video, segment_seconds), image_dir,
+                                        self.OPTIONS, analyse_fps=10 / 3)
+        self.assertEqual(sorted(os.listdir(image_dir)), [Path(path).name for path in written])
+        return [int(Path(path).stem.split('_')[-1]) for path in written]
+
+    def test_static_moving_and_new_frames(self):
+        """A static scene gives one frame, moving frames are skipped and a settled new pose is kept."""
+        sampler = FrameSampler(novelty=0.02, max_motion=0.01, min_gap=0.5)
+        timeline = [(0.0, scene(), True), (0.1, scene(), False), (1.0, scene(), False),
+                    (1.1, scene(60), False),  # Hand moving in
+                    (1.2, scene(120), False),
+                    (1.3, scene(120), True),  # Settled
+                    (1.5, scene(120, 140), False),  # New pose, but too soon after the last kept frame
+                    (1.9, scene(120, 140), True),
+                    (2.5, scene(120, 140), False)]
+        for timestamp, frame, expected in timeline:
+            self.assertEqual(sampler.update(frame, timestamp), expected, timestamp)
+
+    def test_extract_segment(self):
+        """The frames of a segment are sampled and written with the video name and frame index."""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, 'session.avi')
+            writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*'MJPG'), 10, (320, 240))
+            for index in range(40):
+                writer.write(scene() if index < 20 else scene(120))
+            writer.release()
+
+            segments = video_segments(video, 2.0)
+            self.assertEqual([segment[1:3] for segment in segments], [(0, 20), (20, 40)])
+            options = {'novelty': 0.02, 'max_motion': 0.01, 'min_gap': 0.5, 'step': 2, 'extension': 'png',
+                       'compression': None, 'writer_threads': 2, 'batch': 4, 'conf': 0.25, 'imgsz': 640}
+            image_dir = os.path.join(tmp, 'images')
+            decoded, written, analysed = extract_segment(video, 0, 40, 10.0, image_dir, options)
+            self.assertEqual(decoded, 40)
+            self.assertEqual([index for index, _, _ in analysed], list(range(0, 40, 2)))
+            self.assertEqual([Path(path).name for path in written], ['session_0000000.png', 'session_0000022.png'])
+            self.assertEqual(sorted(os.listdir(image_dir)), ['session_0000000.png', 'session_0000022.png'])
+
+    def test_split_video_keeps_the_same_frames(self):
+        """Cutting a video into segments adds no frame at the segment boundaries."""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, 'session.avi')
+            write_video(video, (scene() if index < 45 else scene(120) for index in range(100)))
+
+            whole = self.extract(video, 100.0, os.path.join(tmp, 'whole'))
+            self.assertEqual(whole, [0, 48])
+            self.assertEqual(self.extract(video, 1.0, os.path.join(tmp, 'split')), whole)
+
+    def test_split_drifting_video_keeps_the_same_frames(self):
+        """A slowly drifting scene keeps the frames and the minimum gap of the unsplit video across segments."""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, 'drift.avi')
+            write_video(video, (scene(20 + index // 2) for index in range(200)))
+
+            whole = self.extract(video, 100.0, os.path.join(tmp, 'whole'))
+            self.assertGreater(len(whole), 10)
+            self.assertEqual(self.extract(video, 1.0, os.path.join(tmp, 'split')), whole)
+            self.assertTrue(all(b - a >= 5 for a, b in zip(whole, whole[1:])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the memory-mapped training image cache.
+
+Covers letterboxing, reading images and labels back from the cache,
+collating them into batches and detecting a stale cache.
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the src directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from image_cache import CachedDataset, ImageCache, build_cache, cache_is_current, find_images, letterbox, time_loading
+
+
+class TestImageCache(unittest.TestCase):
+    """Cache a few captures of different sizes."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.image_dir = os.path.join(tmp.name, 'images')
+        self.cache_dir = os.path.join(tmp.name, 'cache')
+        os.makedirs(self.image_dir)
+        os.makedirs(os.path.join(tmp.name, 'labels'))
+        rng = np.random.default_rng(0)
+        for name, (h, w) in (('a', (720, 1280)), ('b', (480, 480)), ('c', (300, 200))):
+            cv2.imwrite(os.path.join(self.image_dir, f'{name}.png'), rng.integers(0, 255, (h, w, 3), dtype=np.uint8))
+        # Box covering the right half of a
+        Path(tmp.name, 'labels', 'a.txt').write_text('2 0.75 0.5 0.5 1.0\n')
+        self.paths = find_images(self.image_dir)
+
+    def test_letterbox_pads_to_stride(self):
+        """The long side is imgsz and the short side is padded to a multiple of the stride."""
+        image, scale, pad_x, pad_y = letterbox(np.zeros((720, 1280, 3), np.uint8), 640, 32)
+        self.assertEqual(image.shape, (384, 640, 3))
+        self.assertEqual((scale, pad_x, pad_y), (0.5, 0, 12))
+        self.assertEqual(int(image[0, 0, 0]), 114)
+
+    def test_cached_images_and_labels(self):
+        """Images read from the cache equal letterboxed decodes, with labels mapped onto them."""
+        build_cache(self.paths, self.cache_dir, imgsz=320, workers=1)
+        dataset = CachedDataset(self.cache_dir)
+        self.assertEqual(len(dataset), 3)
+        for i, path in enumerate(self.paths):
+            image, _ = dataset[i]
+            np.testing.assert_array_equal(image, letterbox(cv2.imread(path), 320, 32)[0])
+            self.assertFalse(image.flags.writeable)
+
+        _, labels = dataset[0]  # a: 1280x720 -> 320x180, padded to 320x192
+        np.testing.assert_allclose(labels, [[2, 0.75, 0.5, 0.5, 180 / 192]], rtol=1e-6)
+        self.assertEqual(dataset[1][1].shape, (0, 5))
+        self.assertEqual(sum(len(images) for images, _ in dataset.batches(2)), 3)
+
+        image, orig_shape, shape = ImageCache(self.cache_dir).load_image(0)
+        self.assertEqual((image.shape[:2], orig_shape, shape), ((180, 320), (720, 1280), (180, 320)))
+        np.testing.assert_array_equal(image, dataset[0][0][6:186])
+
+    def test_collate_pads_images_and_rescales_labels(self):
+        """Images of different sizes are padded to one batch, labels follow with their image position."""
+        build_cache(self.paths, self.cache_dir, imgsz=320, workers=1)
+        dataset = CachedDataset(self.cache_dir)
+        images, labels = CachedDataset.collate([dataset[1], dataset[0], dataset[2]])
+        self.assertEqual(images.shape, (3, 320, 320, 3))
+        np.testing.assert_array_equal(images[1, :192], dataset[0][0])
+        self.assertTrue((images[1, 192:] == 114).all())
+        np.testing.assert_allclose(labels, [[1, 2, 0.75, 0.5 * 192 / 320, 0.5, 180 / 320]], rtol=1e-6)
+
+        timings = time_loading(self.paths, self.cache_dir, imgsz=320, batch_size=2, passes=1)
+        self.assertEqual([len(seconds) for seconds in timings.values()], [1, 1])
+
+    def test_stale_cache_is_detected(self):
+        """A changed image, image list or size makes the cache stale."""
+        build_cache(self.paths, self.cache_dir, imgsz=320, workers=1)
+        self.assertTrue(cache_is_current(self.cache_dir, self.paths, imgsz=320))
+        self.assertFalse(cache_is_current(self.cache_dir, self.paths, imgsz=640))
+        self.assertFalse(cache_is_current(self.cache_dir, self.paths[:2], imgsz=320))
+        cv2.imwrite(self.paths[1], np.zeros((10, 10, 3), np.uint8))
+        self.assertFalse(cache_is_current(self.cache_dir, self.paths, imgsz=320))
+
+
+if __name__ == '__main__':
+    unittest.main()
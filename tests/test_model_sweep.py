@@ -0,0 +1,59 @@
+"""
+Unit tests for the model sweep report.
+
+Covers the Pareto front of accuracy versus latency, the report table,
+naming grid points and detecting finished training runs.
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from model_sweep import checkpoint_finished, format_table, pareto_front, run_name, training_finished
+
+
+def row(name, map50_95, p95_ms):
+    return {'name': name, 'model': name.split('_')[0], 'imgsz': int(name.split('_')[1]),
+            'map50': map50_95 + 0.2, 'map50_95': map50_95, 'p50_ms': p95_ms * 0.8, 'p95_ms': p95_ms}
+
+
+class TestModelSweep(unittest.TestCase):
+    """Choose among trained grid points."""
+
+    def test_pareto_front(self):
+        """Points beaten on both accuracy and latency are left out."""
+        rows = [row('yolo11n_320', 0.60, 20), row('yolo11n_640', 0.70, 45), row('yolo11s_320', 0.68, 40),
+                row('yolo11s_640', 0.78, 110), row('yolo11m_320', 0.66, 90), row('yolo11m_640', 0.78, 260)]
+        front = pareto_front(rows)
+        self.assertEqual([r['name'] for r in front], ['yolo11n_320', 'yolo11s_320', 'yolo11n_640', 'yolo11s_640'])
+
+        table = format_table(rows, front).splitlines()
+        self.assertEqual(len(table), 8)
+        self.assertTrue(table[2].startswith('| yolo11n_320 |') and table[2].endswith('| * |'))
+        self.assertTrue(table[-1].startswith('| yolo11m_640 |') and table[-1].endswith('|  |'))
+
+    def test_run_name(self):
+        """Our own best.pt weights are named after their training run, so two of them do not collide."""
+        self.assertEqual(run_name('yolo11s.pt', 640), 'yolo11s_640')
+        self.assertEqual(run_name('model_backup/modelv7/weights/best.pt', 480), 'modelv7-best_480')
+        self.assertEqual(run_name('runs/sweep/yolo11n_320/weights/best.pt', 480), 'yolo11n_320-best_480')
+        self.assertEqual(run_name('best.pt', 320), 'best_320')
+
+    def test_training_finished(self):
+        """A checkpoint keeps its optimizer state until training ends, on the last epoch or on patience."""
+        self.assertFalse(checkpoint_finished({'epoch': 12, 'optimizer': {'state': {}}}))
+        self.assertTrue(checkpoint_finished({'epoch': -1, 'optimizer': None}))
+        with tempfile.TemporaryDirectory() as run_dir:
+            self.assertFalse(training_finished(run_dir))
+            os.makedirs(os.path.join(run_dir, 'weights'))
+            with open(os.path.join(run_dir, 'weights', 'best.pt'), 'wb'):
+                pass
+            self.assertFalse(training_finished(run_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Unit tests for the capture ROI threshold segmentation.
+
+Covers matching the previous array-per-step implementation and reusing
+the buffers across frames.
+"""
+import unittest
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the src directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from roi_threshold import ThresholdSegmenter
+
+
+def reference_segment(roi, background, threshold, color):
+    """The threshold step of generate-dataset before buffers were preallocated."""
+    diff = cv2.absdiff(cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY), cv2.cvtColor(background, cv2.COLOR_BGR2GRAY))
+    _, mask = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)
+    mask = cv2.erode(mask, np.ones((2, 2), np.uint8), iterations=1)
+    mask = cv2.dilate(mask, np.ones((5, 5), np.uint8), iterations=1)
+    mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+    return np.where(mask > 10, roi, np.ones_like(roi) * color).astype(np.uint8)
+
+
+class TestThresholdSegmenter(unittest.TestCase):
+    """Segment a hand-like blob against a background."""
+
+    def test_matches_reference_and_reuses_buffers(self):
+        """The output equals the previous implementation on frame views and is written in place."""
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+        background = frame[20:120, 30:130].copy()
+        segmenter = ThresholdSegmenter((200, 200, 200))
+
+        outputs = []
+        for radius in (10, 30):
+            cv2.circle(frame, (80, 70), radius, (90, 140, 220), -1)
+            roi = frame[20:120, 30:130]
+            output = segmenter.segment(roi, background, 20)
+            np.testing.assert_array_equal(output, reference_segment(roi, background, 20, (200, 200, 200)))
+            outputs.append(output)
+        self.assertIs(outputs[0], outputs[1])
+
+        # A new ROI size reallocates the buffers
+        roi = frame[0:50, 0:60]
+        output = segmenter.segment(roi, frame[0:50, 0:60].copy(), 20)
+        self.assertEqual(output.shape, (50, 60, 3))
+        self.assertTrue((output == 200).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
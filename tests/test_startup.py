@@ -0,0 +1,58 @@
+"""
+Startup tests for the game entry points.
+
+Covers that importing the entry points and printing the help load no heavy
+libraries and touch no files, and that logging is configured explicitly.
+"""
+import os
+import subprocess
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+GAME_DIR = Path(__file__).parent.parent / "src" / "rps-game"
+HEAVY_MODULES = ('cv2', 'numpy', 'torch', 'ultralytics')
+
+
+def run_python(args, cwd):
+    """Run a fresh interpreter with the game directory on the path."""
+    env = {**os.environ, 'PYTHONPATH': str(GAME_DIR)}
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+class TestStartup(unittest.TestCase):
+    """Import-time side effects of the entry points."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cwd = tmp.name
+
+    def test_imports_load_no_heavy_modules(self):
+        """The game loop and the simulation import without cv2, numpy or torch."""
+        code = ("import sys, main, game.simulation, game.rules, detection.hand_tracking; "
+                f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+        result = run_python(['-c', code], self.cwd)
+        self.assertEqual(result.stdout.strip(), '')
+        self.assertEqual(os.listdir(self.cwd), [])
+
+    def test_help_opens_no_log_file(self):
+        """--help prints the usage without configuring logging."""
+        result = run_python([str(GAME_DIR / 'main.py'), '--help'], self.cwd)
+        self.assertIn('--replay', result.stdout)
+        self.assertEqual(os.listdir(self.cwd), [])
+
+    def test_setup_logging_writes_log_file(self):
+        """setup_logging creates the log directory and writes through the queue."""
+        code = ("from config import log, setup_logging; "
+                "assert setup_logging('logs') is setup_logging(); "
+                "log.info('Round result: %s', 'Tie')")
+        run_python(['-c', code], self.cwd)
+        with open(os.path.join(self.cwd, 'logs', 'video-predict.log')) as f:
+            self.assertIn('Round result: Tie', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,104 @@
+"""
+Unit tests for the dataset split tool.
+
+Covers seeded stratified splits with train/val/test ratios, placing
+the files as hardlinks or YOLO list files and the ratio checks of main.
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add the src directory to the path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import train_val_split
+
+
+class TestTrainValSplit(unittest.TestCase):
+    """Split a small labelled dataset."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_path = Path(tmp.name)
+        (self.data_path / 'images').mkdir()
+        (self.data_path / 'labels').mkdir()
+        # 60 rocks, 30 papers, 10 backgrounds
+        for i in range(100):
+            (self.data_path / 'images' / f'img_{i:03d}.png').write_bytes(b'png')
+            if i < 90:
+                cls = 0 if i < 60 else 1
+                (self.data_path / 'labels' / f'img_{i:03d}.txt').write_text(f'{cls} 0.5 0.5 0.2 0.2\n')
+
+    def split(self, seed=0):
+        samples = train_val_split.find_samples(self.data_path)
+        return train_val_split.stratified_split(samples, (0.7, 0.2, 0.1), seed)[0]
+
+    def test_split_is_stratified_and_seeded(self):
+        """Every class is cut by the same ratios, and a seed always gives the same split."""
+        samples = train_val_split.find_samples(self.data_path)
+        splits, classes = train_val_split.stratified_split(samples, (0.7, 0.2, 0.1))
+        expected = ({0: 42, 1: 21, -1: 7}, {0: 12, 1: 6, -1: 2}, {0: 6, 1: 3, -1: 1})
+        for split, split_classes, split_expected in zip(splits, classes, expected):
+            counted = {}
+            for _, txt_path in split:
+                cls = train_val_split.main_class(txt_path)
+                counted[cls] = counted.get(cls, 0) + 1
+            self.assertEqual(counted, split_expected)
+            self.assertEqual(dict(split_classes), split_expected)
+
+        names = [[img.name for img, _ in split] for split in splits]
+        self.assertEqual(names, [[img.name for img, _ in split] for split in self.split()])
+        self.assertNotEqual(names, [[img.name for img, _ in split] for split in self.split(seed=1)])
+        self.assertEqual(sorted(sum(names, [])), sorted(p.name for p in (self.data_path / 'images').iterdir()))
+
+    def test_materialize_hardlinks_and_lists(self):
+        """Hardlinks share the original files, list files reference them."""
+        split_path = self.data_path / 'split'
+        train_val_split.materialize(self.split(), split_path, 'hardlink', workers=4)
+        train_files = list((split_path / 'train' / 'images').iterdir())
+        self.assertEqual(len(train_files), 70)
+        self.assertEqual(os.stat(train_files[0]).st_nlink, 2)
+        self.assertEqual(len(list((split_path / 'test' / 'labels').iterdir())), 9)
+
+        # Running again replaces the links
+        train_val_split.materialize(self.split(), split_path, 'hardlink')
+        self.assertEqual(os.stat(train_files[0]).st_nlink, 2)
+
+        train_val_split.materialize(self.split(), split_path, 'list')
+        lines = (split_path / 'validation.txt').read_text().splitlines()
+        self.assertEqual(len(lines), 20)
+        self.assertTrue(all(os.path.isabs(line) and os.path.exists(line) for line in lines))
+        self.assertFalse((split_path / 'train').exists())
+
+    def test_materialize_removes_files_of_an_earlier_split(self):
+        """A split made with another seed or ratio leaves no stale files."""
+        split_path = self.data_path / 'split'
+        train_val_split.materialize(self.split(), split_path, 'hardlink')
+        splits = train_val_split.stratified_split(train_val_split.find_samples(self.data_path), (0.8, 0.2, 0.0), 1)[0]
+        train_val_split.materialize(splits, split_path, 'hardlink')
+        for name, split in zip(train_val_split.SPLIT_NAMES, splits):
+            images = split_path / name / 'images'
+            self.assertEqual(sorted(os.listdir(images)) if images.exists() else [],
+                             sorted(img.name for img, _ in split))
+        self.assertFalse((split_path / 'test').exists())
+        self.assertEqual(len(list(self.data_path.glob('images/*'))), 100)
+
+    def test_ratios_summing_to_one_are_accepted(self):
+        """Train and test ratios summing to 1 up to rounding leave an empty validation split."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            train_val_split.main(['--datapath', str(self.data_path), '--train_pct', '.8', '--test_pct', '.2',
+                                  '--mode', 'list'])
+        self.assertNotIn('Invalid entry', output.getvalue())
+        self.assertIn('Images going to validation: 0 {}', output.getvalue())
+        self.assertEqual(len((self.data_path / 'split' / 'test.txt').read_text().splitlines()), 20)
+        self.assertFalse((self.data_path / 'split' / 'validation.txt').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()